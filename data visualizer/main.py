@@ -1,14 +1,24 @@
+import os
 import sys
+import time
+import heapq
+import math
 import random
+import shutil
+import tempfile
+import numpy as np
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QLabel, QListWidget, QWidget, QHBoxLayout, QVBoxLayout,
-    QPushButton, QInputDialog, QMessageBox, QGraphicsView, QGraphicsScene, QGraphicsItem, QGraphicsObject, QGraphicsSimpleTextItem, QStackedWidget, QSizePolicy, QCheckBox
+    QPushButton, QInputDialog, QMessageBox, QGraphicsView, QGraphicsScene, QGraphicsItem, QGraphicsObject, QGraphicsSimpleTextItem, QStackedWidget, QSizePolicy, QCheckBox, QFileDialog
 )
-from PyQt5.QtCore import QTimer, Qt, QRectF, QPropertyAnimation, QPointF, pyqtProperty, QEasingCurve, QLineF
+from PyQt5.QtCore import QTimer, Qt, QRectF, QPropertyAnimation, QPointF, pyqtProperty, pyqtSignal, QEasingCurve, QLineF, QThread
 from PyQt5.QtGui import QColor, QBrush, QPen, QFont, QPainter, QPolygonF
 import sip
 from typing import Optional
 import weakref
+from collections import namedtuple
 
 # Linked list node data structure for logic
 class LLNode:
@@ -23,6 +33,833 @@ class DLLNode:
         self.next: Optional['DLLNode'] = None
         self.prev: Optional['DLLNode'] = None
 
+_STALE = object()
+
+# Immutable cell of a step snapshot; edits copy the cells in front of them and share the rest
+SnapNode = namedtuple('SnapNode', 'value next')
+
+def snapshot_of(values):
+    head = None
+    for value in reversed(list(values)):
+        head = SnapNode(value, head)
+    return head
+
+def snapshot_edit(head, index, values=(), skip=0):
+    """Snapshot with skip cells at index replaced by values, copying only the index cells before them"""
+    prefix = []
+    node = head
+    for _ in range(index):
+        prefix.append(node.value)
+        node = node.next
+    for _ in range(skip):
+        node = node.next
+    for value in reversed(list(prefix) + list(values)):
+        node = SnapNode(value, node)
+    return node
+
+def snapshot_swap(head, i, j):
+    i, j = min(i, j), max(i, j)
+    node, values = head, []
+    for _ in range(j + 1):
+        values.append(node.value)
+        node = node.next
+    return snapshot_edit(snapshot_edit(head, j, [values[i]], 1), i, [values[j]], 1)
+
+class SinglyLinkedList:
+    """Chain of LLNode that keeps its head, tail and size, so append and len are O(1)"""
+    node_type = LLNode
+
+    def __init__(self, values=()):
+        self.head = None
+        self.tail = None
+        self.size = 0
+        # Persistent copy for animation steps, or _STALE until next asked for
+        self._snapshot = None
+        # Index the tail links back to, when a cycle was made on purpose
+        self.cycle_at = None
+        self.extend(values)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        # Counted, so a cycle through the tail still ends
+        node = self.head
+        for _ in range(self.size):
+            yield node.value
+            node = node.next
+
+    def make_cycle(self, index):
+        """Point the tail back at the node at index, for cycle detection"""
+        self.break_cycle()
+        self.tail.next = self.node_at(index)
+        self.cycle_at = index
+
+    def break_cycle(self):
+        if self.cycle_at is not None:
+            self.tail.next = None
+            self.cycle_at = None
+
+    def relinked(self, head, tail, size=None):
+        """Adopt a chain that an algorithm relinked outside the container"""
+        self.head = head
+        self.tail = tail
+        if size is not None:
+            self.size = size
+        self.cycle_at = None
+        self._snapshot = _STALE
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def snapshot(self):
+        """Immutable SnapNode chain of the current values, which later edits never change"""
+        if self._snapshot is _STALE:
+            self._snapshot = snapshot_of(self)
+        return self._snapshot
+
+    def _edit_snapshot(self, index, values=(), skip=0):
+        # Edits in the front half copy that prefix; later ones (appends
+        # above all) leave the snapshot to be rebuilt when next asked for
+        if self._snapshot is not _STALE and index <= self.size // 2:
+            self._snapshot = snapshot_edit(self._snapshot, index, values, skip)
+        else:
+            self._snapshot = _STALE
+
+    def node_at(self, index):
+        # O(index) walk from the head
+        node = self.head
+        for _ in range(index):
+            node = node.next
+        return node
+
+    def _link(self, prev, node):
+        # Links node after prev, or at the head when prev is None
+        self.break_cycle()
+        if prev is None:
+            node.next = self.head
+            self.head = node
+        else:
+            node.next = prev.next
+            prev.next = node
+        if node.next is None:
+            self.tail = node
+        self.size += 1
+        return node
+
+    def _unlink(self, prev, node):
+        self.break_cycle()
+        if prev is None:
+            self.head = node.next
+        else:
+            prev.next = node.next
+        if node is self.tail:
+            self.tail = prev
+        self.size -= 1
+
+    def append(self, value):
+        self._snapshot = _STALE
+        return self._link(self.tail, self.node_type(value))
+
+    def insert(self, index, value):
+        """Insert value before position index (0 to len): O(1) at either end, O(index) between"""
+        if not 0 <= index <= self.size:
+            raise IndexError('list index out of range')
+        self._edit_snapshot(index, [value])
+        prev = None if index == 0 else self.tail if index == self.size else self.node_at(index - 1)
+        return self._link(prev, self.node_type(value))
+
+    def replace(self, index, value):
+        """Set the value at index and return the old one"""
+        if not 0 <= index < self.size:
+            raise IndexError('list index out of range')
+        self._edit_snapshot(index, [value], 1)
+        node = self.node_at(index)
+        old, node.value = node.value, value
+        return old
+
+    def pop(self, index=None):
+        """Remove and return the value at index (the last one by default)"""
+        index = self.size - 1 if index is None else index
+        if not 0 <= index < self.size:
+            raise IndexError('pop index out of range')
+        self._edit_snapshot(index, skip=1)
+        prev = None if index == 0 else self.node_at(index - 1)
+        node = self.head if prev is None else prev.next
+        self._unlink(prev, node)
+        return node.value
+
+    def _swap_snapshot(self, i, j):
+        if self._snapshot is not _STALE and max(i, j) <= self.size // 2:
+            self._snapshot = snapshot_swap(self._snapshot, i, j)
+        else:
+            self._snapshot = _STALE
+
+    def swap(self, i, j):
+        """Swap the nodes at i and j by relinking them, not by copying values"""
+        if i == j:
+            return
+        i, j = min(i, j), max(i, j)
+        self.break_cycle()
+        self._swap_snapshot(i, j)
+        prev1 = None if i == 0 else self.node_at(i - 1)
+        node1 = self.head if prev1 is None else prev1.next
+        prev2 = node1
+        for _ in range(j - i - 1):
+            prev2 = prev2.next
+        node2 = prev2.next
+        if prev1 is None:
+            self.head = node2
+        else:
+            prev1.next = node2
+        if prev2 is node1:
+            node1.next, node2.next = node2.next, node1
+        else:
+            node1.next, node2.next = node2.next, node1.next
+            prev2.next = node1
+        if self.tail is node2:
+            self.tail = node1
+
+class DoublyLinkedList(SinglyLinkedList):
+    """Chain of DLLNode with head, tail and size; either end is reached in O(1)"""
+    node_type = DLLNode
+
+    def node_at(self, index):
+        # Walks from whichever end is closer
+        if index < self.size // 2:
+            return super().node_at(index)
+        node = self.tail
+        for _ in range(self.size - 1 - index):
+            node = node.prev
+        return node
+
+    def _link(self, prev, node):
+        super()._link(prev, node)
+        node.prev = prev
+        if node.next is not None:
+            node.next.prev = node
+        return node
+
+    def pop(self, index=None):
+        index = self.size - 1 if index is None else index
+        if not 0 <= index < self.size:
+            raise IndexError('pop index out of range')
+        self._edit_snapshot(index, skip=1)
+        node = self.node_at(index)
+        if node.next is not None:
+            node.next.prev = node.prev
+        self._unlink(node.prev, node)
+        return node.value
+
+    def swap(self, i, j):
+        # Values trade places; the nodes stay where they are
+        if i != j:
+            self._swap_snapshot(i, j)
+        node1, node2 = self.node_at(i), self.node_at(j)
+        node1.value, node2.value = node2.value, node1.value
+
+# --- Linked-list algorithms ---
+def _values_from(*heads):
+    for node in heads:
+        while node:
+            yield node.value
+            node = node.next
+
+def reverse_list(lst, steps=None):
+    """Reverse lst in place by turning every next pointer around: O(1) extra space"""
+    lst.break_cycle()
+    stats = {'pointer_writes': 0, 'nodes_visited': 0}
+    prev, node = None, lst.head
+    while node:
+        after = node.next
+        node.next = prev
+        stats['pointer_writes'] += 1
+        stats['nodes_visited'] += 1
+        prev, node = node, after
+        if steps is not None:
+            # Reversed part first, then what is still to be turned around
+            k = stats['nodes_visited']
+            steps.append((snapshot_of(_values_from(prev, node)), [k - 1],
+                          f"Node {prev.value}: save next, point it back at {'None' if k == 1 else 'the reversed part'}, move prev and curr on ({k} of {len(lst)})."))
+    lst.relinked(prev, lst.head)
+    return stats
+
+def middle_node(head, steps=None):
+    """(index of the middle node, or the second of two, and pointer moves), by a slow and a fast pointer"""
+    slow = fast = head
+    i = moves = 0
+    while fast and fast.next:
+        slow, fast = slow.next, fast.next.next
+        i += 1
+        moves += 3
+        if steps is not None:
+            steps.append((head, [i] + ([2 * i] if fast else []), f"Slow moves 1 to index {i}, fast moves 2 to {'index ' + str(2 * i) if fast else 'the end'}."))
+    return i, moves
+
+def detect_cycle(head, steps=None):
+    """Floyd's tortoise and hare: (index where the cycle starts or None, cycle length, pointer moves), O(1) space.
+
+    Recorded highlights are walk positions, which pass the list length once
+    the pointers go round a cycle.
+    """
+    slow = fast = head
+    s = f = moves = 0
+    while fast and fast.next:
+        slow, fast = slow.next, fast.next.next
+        s, f = s + 1, f + 2
+        moves += 3
+        if steps is not None:
+            steps.append((head, [s, f], f'Tortoise steps to position {s}, hare jumps to {f}.'))
+        if slow is fast:
+            break
+    else:
+        if steps is not None:
+            steps.append((head, [], 'The hare reached the end: there is no cycle.'))
+        return None, 0, moves
+    # From head and from the meeting point alike, the cycle start is the same distance away
+    slow, start = head, 0
+    while slow is not fast:
+        slow, fast = slow.next, fast.next
+        start += 1
+        moves += 2
+        if steps is not None:
+            steps.append((head, [start, f + start], f'Both pointers step once: tortoise from the head, hare from the meeting point.'))
+    length, node = 1, slow.next
+    while node is not slow:
+        node = node.next
+        length += 1
+        moves += 1
+    if steps is not None:
+        steps.append((head, [start], f'They meet at index {start}, where the cycle starts; going round it takes {length} steps.'))
+    return start, length, moves
+
+def _split(head, count, stats):
+    # Cuts the chain after count nodes and returns what follows
+    for _ in range(count - 1):
+        if head is None:
+            return None
+        head = head.next
+    if head is None:
+        return None
+    rest, head.next = head.next, None
+    stats['pointer_writes'] += 1
+    return rest
+
+def _merge(a, b, tail, stats):
+    # Appends the merge of runs a and b to tail; returns the new tail
+    while a and b:
+        stats['comparisons'] += 1
+        if b.value < a.value:
+            tail.next, b = b, b.next
+        else:
+            tail.next, a = a, a.next
+        tail = tail.next
+        stats['pointer_writes'] += 1
+    tail.next = a or b
+    stats['pointer_writes'] += 1
+    while tail.next:
+        tail = tail.next
+    return tail
+
+def merge_sort_list(lst, steps=None):
+    """Stable bottom-up merge sort that relinks nodes: O(n log n) comparisons, O(1) extra space.
+
+    Runs of width 1, 2, 4, ... are cut off the chain and merged pairwise, so
+    there is no recursion and no array of nodes.
+    """
+    lst.break_cycle()
+    n = len(lst)
+    stats = {'comparisons': 0, 'pointer_writes': 0, 'passes': 0}
+    dummy = LLNode(None)
+    dummy.next = lst.head
+    tail = lst.tail
+    width = 1
+    while width < n:
+        stats['passes'] += 1
+        tail, node, start = dummy, dummy.next, 0
+        while node:
+            left = node
+            right = _split(left, width, stats)
+            node = _split(right, width, stats)
+            tail = _merge(left, right, tail, stats)
+            # Reattach the rest so the chain stays whole between merges
+            tail.next = node
+            stats['pointer_writes'] += 1
+            if steps is not None:
+                end = min(n, start + 2 * width)
+                steps.append((snapshot_of(_values_from(dummy.next)), list(range(start, end)),
+                              f'Pass {stats["passes"]}: merged the runs of width {width} at {start} to {end - 1} into one sorted run.'))
+            start += 2 * width
+        width *= 2
+    lst.relinked(dummy.next, tail if n > 1 else lst.tail)
+    return stats
+
+def merge_k_lists(lists):
+    """Merge sorted lists into one by relinking their nodes, with a heap of the k front nodes.
+
+    Returns (merged SinglyLinkedList, stats); the inputs are left empty.
+    """
+    heap = [(lst.head.value, i, lst.head) for i, lst in enumerate(lists) if lst.head]
+    heapq.heapify(heap)
+    stats = {'heap_operations': len(heap), 'pointer_writes': 0}
+    dummy = tail = LLNode(None)
+    while heap:
+        _, i, node = heap[0]
+        tail.next = node
+        tail = node
+        stats['pointer_writes'] += 1
+        # (value, list index) is unique among the fronts, so nodes are never compared
+        if node.next:
+            heapq.heapreplace(heap, (node.next.value, i, node.next))
+        else:
+            heapq.heappop(heap)
+        stats['heap_operations'] += 1
+    merged = SinglyLinkedList()
+    merged.relinked(dummy.next, None if tail is dummy else tail, sum(len(lst) for lst in lists))
+    for lst in lists:
+        lst.relinked(None, None, 0)
+    return merged, stats
+
+# --- Skip list ---
+MAX_SKIP_LEVEL = 32
+
+class SkipNode:
+    __slots__ = ('value', 'next')
+
+    def __init__(self, value, height):
+        self.value = value
+        # next[lane] is the following node that reaches lane; lane 0 holds every node
+        self.next = [None] * height
+
+class SkipList:
+    """Sorted skip list: each node reaches the next lane up with probability p, so search is expected O(log n)"""
+    def __init__(self, values=(), p=0.5, seed=None):
+        self.p = p
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.head = SkipNode(None, MAX_SKIP_LEVEL)
+        self.level = 1
+        self.size = 0
+        self._build(sorted(values))
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        node = self.head.next[0]
+        while node:
+            yield node.value
+            node = node.next[0]
+
+    def random_height(self):
+        height = 1
+        while height < MAX_SKIP_LEVEL and self.rng.random() < self.p:
+            height += 1
+        return height
+
+    def _build(self, values):
+        # Sorted input is linked in one pass, keeping the last node of every lane
+        last = [self.head] * MAX_SKIP_LEVEL
+        for value in values:
+            node = SkipNode(value, self.random_height())
+            for lane in range(len(node.next)):
+                last[lane].next[lane] = node
+                last[lane] = node
+            self.level = max(self.level, len(node.next))
+        self.size += len(values)
+
+    def nodes(self):
+        node = self.head.next[0]
+        while node:
+            yield node
+            node = node.next[0]
+
+    def _find(self, value, path=None):
+        # Rightmost node before value in every lane, and the comparisons made.
+        # path gets (lane, node, moved) for every node compared against value
+        update = [self.head] * MAX_SKIP_LEVEL
+        node = self.head
+        comparisons = 0
+        for lane in range(self.level - 1, -1, -1):
+            after = node.next[lane]
+            while after is not None:
+                comparisons += 1
+                moved = after.value < value
+                if path is not None:
+                    path.append((lane, after, moved))
+                if not moved:
+                    break
+                node, after = after, after.next[lane]
+            update[lane] = node
+        return update, comparisons
+
+    def search(self, value, path=None):
+        """(found, comparisons): drop down a lane whenever the next node is not smaller"""
+        update, comparisons = self._find(value, path)
+        node = update[0].next[0]
+        return node is not None and node.value == value, comparisons
+
+    def insert(self, value, path=None):
+        """(new node, comparisons); equal values go in front of those already there"""
+        update, comparisons = self._find(value, path)
+        node = SkipNode(value, self.random_height())
+        self.level = max(self.level, len(node.next))
+        for lane in range(len(node.next)):
+            node.next[lane] = update[lane].next[lane]
+            update[lane].next[lane] = node
+        self.size += 1
+        return node, comparisons
+
+    def remove(self, value, path=None):
+        """(removed, comparisons), unlinking the first node equal to value from each of its lanes"""
+        update, comparisons = self._find(value, path)
+        node = update[0].next[0]
+        if node is None or node.value != value:
+            return False, comparisons
+        for lane in range(len(node.next)):
+            update[lane].next[lane] = node.next[lane]
+        while self.level > 1 and self.head.next[self.level - 1] is None:
+            self.level -= 1
+        self.size -= 1
+        return True, comparisons
+
+    def expected_comparisons(self):
+        # About log_{1/p} n lanes with 1/p nodes compared in each
+        if self.size < 2:
+            return 1.0
+        return float(np.log(self.size) / np.log(1 / self.p) / self.p)
+
+def sorted_list_search(head, value):
+    """(found, comparisons) walking a sorted chain until a value not smaller than value"""
+    comparisons = 0
+    node = head
+    while node is not None:
+        comparisons += 1
+        if node.value >= value:
+            return node.value == value, comparisons
+        node = node.next
+    return False, comparisons
+
+def sorted_list_insert(lst, value):
+    """Link value into the sorted SinglyLinkedList lst in front of equal values; returns comparisons"""
+    comparisons = 0
+    prev, node = None, lst.head
+    while node is not None:
+        comparisons += 1
+        if node.value >= value:
+            break
+        prev, node = node, node.next
+    lst._snapshot = _STALE
+    lst._link(prev, lst.node_type(value))
+    return comparisons
+
+class RedBlackTree:
+    """Left-leaning red-black tree of TreeNode: height stays below 2 log2 n by rotations"""
+    def __init__(self, values=()):
+        self.root = None
+        self.size = 0
+        self.comparisons = 0
+        for value in values:
+            self.insert(value)
+
+    @staticmethod
+    def _red(node):
+        return node is not None and node.color == 'R'
+
+    @staticmethod
+    def _rotate(node, left):
+        child = node.right if left else node.left
+        if left:
+            node.right, child.left = child.left, node
+        else:
+            node.left, child.right = child.right, node
+        child.color, node.color = node.color, 'R'
+        return child
+
+    def search(self, value):
+        node, comparisons = self.root, 0
+        while node is not None:
+            comparisons += 1
+            if value == node.value:
+                return True, comparisons
+            node = node.left if value < node.value else node.right
+        return False, comparisons
+
+    def insert(self, value):
+        """Insert value and return the comparisons made on the way down"""
+        self.comparisons = 0
+        self.root = self._insert(self.root, value)
+        self.root.color = 'B'
+        self.size += 1
+        return self.comparisons
+
+    def _insert(self, node, value):
+        if node is None:
+            return TreeNode(value, color='R')
+        self.comparisons += 1
+        if value < node.value:
+            node.left = self._insert(node.left, value)
+        else:
+            node.right = self._insert(node.right, value)
+        if self._red(node.right) and not self._red(node.left):
+            node = self._rotate(node, True)
+        if self._red(node.left) and self._red(node.left.left):
+            node = self._rotate(node, False)
+        if self._red(node.left) and self._red(node.right):
+            node.color = 'R'
+            node.left.color = node.right.color = 'B'
+        return node
+
+def benchmark_ordered_structures(n, queries, p=0.5, seed=0):
+    """Build a sorted linked list, a skip list and a red-black tree of n values and time searches and inserts.
+
+    Returns rows of (name, build ms, search comparisons, search us, insert comparisons, insert us),
+    costs averaged over the given number of random queries.
+    """
+    rng = np.random.default_rng(seed)
+    values = rng.integers(0, 10 * n, n).tolist()
+    probes = rng.integers(0, 10 * n, queries).tolist()
+    inserts = rng.integers(0, 10 * n, queries).tolist()
+    rows = []
+    t0 = time.perf_counter()
+    linked = SinglyLinkedList(sorted(values))
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    found = sum(sorted_list_search(linked.head, v)[1] for v in probes)
+    search = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    added = sum(sorted_list_insert(linked, v) for v in inserts)
+    rows.append(('Sorted linked list', build, found, search, added, time.perf_counter() - t0))
+    skip = SkipList(p=p, seed=seed)
+    t0 = time.perf_counter()
+    for v in values:
+        skip.insert(v)
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    found = sum(skip.search(v)[1] for v in probes)
+    search = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    added = sum(skip.insert(v)[1] for v in inserts)
+    rows.append((f'Skip list (p = {p:g})', build, found, search, added, time.perf_counter() - t0))
+    tree = RedBlackTree()
+    t0 = time.perf_counter()
+    for v in values:
+        tree.insert(v)
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    found = sum(tree.search(v)[1] for v in probes)
+    search = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    added = sum(tree.insert(v) for v in inserts)
+    rows.append(('Red-black tree', build, found, search, added, time.perf_counter() - t0))
+    q = max(1, queries)
+    return [(name, 1000 * b, fc / q, 1e6 * fs / q, ac / q, 1e6 * a / q) for name, b, fc, fs, ac, a in rows]
+
+# --- Unrolled linked list ---
+UNROLLED_CAPACITY = 8
+MAX_DRAWN_CAPACITY = 16
+# Modeled C layout: every heap block has an allocator header, pointers and values are words
+HEAP_HEADER_BYTES = 16
+WORD_BYTES = 8
+
+class UnrolledNode:
+    __slots__ = ('values', 'next')
+
+    def __init__(self, values=None):
+        self.values = values if values is not None else []
+        self.next = None
+
+    @property
+    def value(self):
+        # What the list scene draws: the filled slots
+        return tuple(self.values)
+
+class UnrolledLinkedList:
+    """Chain of UnrolledNode blocks of up to capacity values each.
+
+    A full node splits in half on insert; a node that drops below half full on
+    delete takes values from the next one, or absorbs it when both fit.
+    """
+    def __init__(self, values=(), capacity=UNROLLED_CAPACITY):
+        self.capacity = max(2, capacity)
+        self.head = None
+        self.tail = None
+        self.size = 0
+        self.node_count = 0
+        self.extend(values)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for node in self.nodes():
+            yield from node.values
+
+    def nodes(self):
+        node = self.head
+        while node:
+            yield node
+            node = node.next
+
+    def _link(self, prev, node):
+        if prev is None:
+            node.next = self.head
+            self.head = node
+        else:
+            node.next = prev.next
+            prev.next = node
+        if node.next is None:
+            self.tail = node
+        self.node_count += 1
+        return node
+
+    def _unlink(self, prev, node):
+        if prev is None:
+            self.head = node.next
+        else:
+            prev.next = node.next
+        if node is self.tail:
+            self.tail = prev
+        self.node_count -= 1
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def append(self, value):
+        # Appends fill the tail node completely before starting another
+        if self.tail is None or len(self.tail.values) == self.capacity:
+            self._link(self.tail, UnrolledNode())
+        self.tail.values.append(value)
+        self.size += 1
+
+    def _find(self, index, inserting=False):
+        # (node number, previous node, node, offset in it) of position index;
+        # an insert position at the end of a node stays in that node
+        k, prev, node = 0, None, self.head
+        while node is not None and (index > len(node.values) if inserting else index >= len(node.values)):
+            index -= len(node.values)
+            k, prev, node = k + 1, node, node.next
+        return k, prev, node, index
+
+    def insert(self, index, value):
+        """Insert value before position index; returns (number of the node it was aimed at, whether that node split)"""
+        if not 0 <= index <= self.size:
+            raise IndexError('list index out of range')
+        k, prev, node, offset = self._find(index, True)
+        if node is None:
+            node = self._link(None, UnrolledNode())
+        split = len(node.values) == self.capacity
+        if split:
+            # The back half moves to a new node right after this one
+            half = self.capacity // 2
+            rest = self._link(node, UnrolledNode(node.values[half:]))
+            del node.values[half:]
+            if offset > half:
+                node, offset = rest, offset - half
+        node.values.insert(offset, value)
+        self.size += 1
+        return k, split
+
+    def pop(self, index=None):
+        """Remove the value at index; returns (value, node number, 'merged', 'borrowed', 'emptied' or None)"""
+        index = self.size - 1 if index is None else index
+        if not 0 <= index < self.size:
+            raise IndexError('pop index out of range')
+        k, prev, node, offset = self._find(index)
+        value = node.values.pop(offset)
+        self.size -= 1
+        action = None
+        half = self.capacity // 2
+        after = node.next
+        if not node.values and after is None:
+            self._unlink(prev, node)
+            action = 'emptied'
+        elif len(node.values) < half and after is not None:
+            if len(node.values) + len(after.values) <= self.capacity:
+                node.values.extend(after.values)
+                self._unlink(node, after)
+                action = 'merged'
+            else:
+                # The next node keeps at least half, since both did not fit in one
+                take = half - len(node.values)
+                node.values.extend(after.values[:take])
+                del after.values[:take]
+                action = 'borrowed'
+        return value, k, action
+
+    def snapshot(self):
+        """Immutable SnapNode chain of the node contents, for animation steps"""
+        return snapshot_of(node.value for node in self.nodes())
+
+def node_block_bytes(capacity=None):
+    """Modeled bytes of one heap block: an LLNode (value, next) or an unrolled node (next, count, capacity slots)"""
+    if capacity is None:
+        return HEAP_HEADER_BYTES + 2 * WORD_BYTES
+    return HEAP_HEADER_BYTES + (2 + capacity) * WORD_BYTES
+
+def traversal_trace(counts, block_bytes, value_offset, next_offset, scattered=False, seed=0):
+    """CacheSimulator trace (byte address << 1, all reads) of walking blocks holding counts[k] values each.
+
+    Each block's values are read in order, then its next pointer. Blocks sit back
+    to back in list order, or at seeded random slots for a heap that churn has shuffled.
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    m = len(counts)
+    slots = np.random.default_rng(seed).permutation(m) if scattered else np.arange(m)
+    reads = counts + 1
+    owner = np.repeat(np.arange(m), reads)
+    j = np.arange(int(reads.sum())) - np.repeat(np.cumsum(reads) - reads, reads)
+    offsets = np.where(j < counts[owner], value_offset + WORD_BYTES * j, next_offset)
+    return (slots[owner] * block_bytes + offsets) << 1
+
+def traversal_locality(trace, levels, line_size=64):
+    """Cache lines touched (changes of line between reads), L1 misses and memory fetches of one traversal"""
+    sim = CacheSimulator(levels, line_size)
+    served = sim.run(trace, itemsize=1)
+    lines = (trace >> 1) // line_size
+    return {
+        'reads': len(trace),
+        'line_touches': int(np.count_nonzero(lines[1:] != lines[:-1])) + 1 if len(trace) else 0,
+        'l1_misses': int(np.count_nonzero(served)),
+        'memory_fetches': int(np.count_nonzero(served == len(levels))),
+    }
+
+def _nodes_of(head):
+    while head:
+        yield head
+        head = head.next
+
+def _walk_ms(lst):
+    t0 = time.perf_counter()
+    for _ in lst:
+        pass
+    return 1000 * (time.perf_counter() - t0)
+
+def compare_list_locality(unrolled, scattered=False, seed=0, levels=None):
+    """Memory per element and traversal cache behavior of unrolled next to a plain LLNode list of the same values.
+
+    Returns {name: stats} with modeled bytes, CPython bytes measured with
+    sys.getsizeof (value objects excluded) and Python traversal time.
+    """
+    levels = levels or parse_cache_levels(DEFAULT_CACHE_SPEC)
+    plain = SinglyLinkedList(unrolled)
+    n = max(1, len(unrolled))
+    counts = [len(node.values) for node in unrolled.nodes()]
+    results = {}
+    block = node_block_bytes()
+    trace = traversal_trace(np.ones(len(plain), dtype=np.int64), block, HEAP_HEADER_BYTES, HEAP_HEADER_BYTES + WORD_BYTES, scattered, seed)
+    results['LLNode list'] = dict(
+        traversal_locality(trace, levels), nodes=len(plain), modeled_bytes=len(plain) * block / n, walk_ms=_walk_ms(plain),
+        python_bytes=sum(sys.getsizeof(node) + sys.getsizeof(node.__dict__) for node in _nodes_of(plain.head)) / n)
+    block = node_block_bytes(unrolled.capacity)
+    trace = traversal_trace(counts, block, HEAP_HEADER_BYTES + 2 * WORD_BYTES, HEAP_HEADER_BYTES, scattered, seed)
+    results[f'Unrolled (capacity {unrolled.capacity})'] = dict(
+        traversal_locality(trace, levels), nodes=len(counts), modeled_bytes=len(counts) * block / n, walk_ms=_walk_ms(unrolled),
+        python_bytes=sum(sys.getsizeof(node) + sys.getsizeof(node.values) for node in unrolled.nodes()) / n)
+    return results
+
 # Modern color palette
 PRIMARY_BG = "#18181b"
 CARD_BG = "#23232a"
@@ -43,6 +880,101 @@ STACK_BOX_WIDTH = 140
 STACK_BOX_HEIGHT = 36
 STACK_BOX_SPACING = 18
 
+# --- Workload generation ---
+WORKLOAD_SHAPES = [
+    'Uniform', 'Sorted', 'Reversed', 'Nearly Sorted', 'Few Unique',
+    'Organ Pipe', 'Sawtooth', 'Zipf', 'Quicksort Killer',
+]
+# Largest workload the box-per-value scenes can still draw
+MAX_DRAWN_WORKLOAD = 64
+# Sorting runs on much larger inputs than it draws
+MAX_SORT_WORKLOAD = 10_000_000
+SORT_PREVIEW_LIMIT = 40
+# Linked lists hold large workloads but draw only their first nodes
+MAX_LIST_WORKLOAD = 100_000
+LIST_PREVIEW_LIMIT = 40
+
+class WorkloadGenerator:
+    """Seeded, vectorized input generator for the visualizers and benchmarks"""
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+    def generate(self, shape, n, high=None, swaps=None, unique=8, teeth=4, zipf_a=1.3):
+        # Returns an int64 array of n values shaped by one of WORKLOAD_SHAPES
+        n = max(0, int(n))
+        high = high if high is not None else max(100, n)
+        rng = self.rng
+        if shape == 'Uniform':
+            return rng.integers(0, high, n, dtype=np.int64)
+        if shape == 'Sorted':
+            return np.sort(rng.integers(0, high, n, dtype=np.int64))
+        if shape == 'Reversed':
+            return np.sort(rng.integers(0, high, n, dtype=np.int64))[::-1].copy()
+        if shape == 'Nearly Sorted':
+            arr = np.sort(rng.integers(0, high, n, dtype=np.int64))
+            k = max(1, n // 100) if swaps is None else swaps
+            k = min(k, n // 2)
+            if k > 0:
+                # 2k distinct positions paired up, so exactly k disjoint swaps
+                idx = rng.choice(n, 2 * k, replace=False)
+                a, b = idx[:k], idx[k:]
+                arr[a], arr[b] = arr[b], arr[a].copy()
+            return arr
+        if shape == 'Few Unique':
+            unique = max(1, min(unique, high))
+            return rng.integers(0, unique, n, dtype=np.int64) * (high // unique)
+        if shape == 'Organ Pipe':
+            s = np.sort(rng.integers(0, high, n, dtype=np.int64))
+            return np.concatenate([s[::2], s[1::2][::-1]])
+        if shape == 'Sawtooth':
+            period = max(1, -(-n // max(1, teeth)))
+            return (np.arange(n, dtype=np.int64) % period) * high // period
+        if shape == 'Zipf':
+            # Key k in [1, high] appears with frequency ~ 1/k^a (inverse CDF sampling)
+            cdf = np.cumsum(1.0 / np.arange(1, high + 1, dtype=np.float64) ** zipf_a)
+            return np.searchsorted(cdf, rng.random(n) * cdf[-1]).astype(np.int64) + 1
+        if shape == 'Quicksort Killer':
+            return self.quicksort_killer(n)
+        raise ValueError(f'Unknown workload shape: {shape}')
+
+    def quicksort_killer(self, n):
+        # Adversary for the last-element (Lomuto) pivot used by quick_sort: every
+        # pivot is the smallest or largest value left, so each partition peels off
+        # one element and the sort does n(n-1)/2 comparisons.
+        # Simulating the partitions: the pivot slot is refilled from the right end
+        # after a "largest" pivot and from the left end after a "smallest" one,
+        # which lets the whole trace be laid out with cumulative sums.
+        if n == 0:
+            return np.zeros(0, dtype=np.int64)
+        take_min = self.rng.random(n) < 0.5
+        from_left = np.concatenate([[False], take_min[:-1]])
+        left_rank = np.cumsum(from_left) - 1
+        right_rank = np.cumsum(~from_left) - 1
+        labels = np.where(from_left, left_rank, n - 1 - right_rank)
+        values = np.where(take_min, np.cumsum(take_min) - 1, n - np.cumsum(~take_min))
+        arr = np.empty(n, dtype=np.int64)
+        arr[labels] = values
+        return arr
+
+def ask_workload(parent, max_size=MAX_DRAWN_WORKLOAD, default_size=10):
+    """Prompt for shape, size and seed; returns a list of values or None"""
+    shape, ok = QInputDialog.getItem(parent, 'Workload', 'Shape:', WORKLOAD_SHAPES, 0, False)
+    if not ok:
+        return None
+    n, ok = QInputDialog.getInt(parent, 'Workload', f'Size (1 to {max_size}):', min(default_size, max_size), 1, max_size)
+    if not ok:
+        return None
+    seed, ok = QInputDialog.getInt(parent, 'Workload', 'Seed (same seed, same input):', 42, 0, 2**31 - 1)
+    if not ok:
+        return None
+    swaps = None
+    if shape == 'Nearly Sorted':
+        swaps, ok = QInputDialog.getInt(parent, 'Workload', f'Number of swaps k (0 to {n // 2}):', max(1, n // 100), 0, max(0, n // 2))
+        if not ok:
+            return None
+    return WorkloadGenerator(seed).generate(shape, n, swaps=swaps).tolist()
+
 class BaseBox(QGraphicsObject):
     """Base class for all box-like graphics objects"""
     def __init__(self, value, color=QColor(240,240,240)):
@@ -333,6 +1265,9 @@ class ArrayVisualizer(QWidget):
         self.btn_create = QPushButton('Create Your Own')
         self.btn_create.clicked.connect(self.create_own_array)
         btn_layout.addWidget(self.btn_create)
+        self.btn_workload = QPushButton('Workload')
+        self.btn_workload.clicked.connect(self.generate_workload)
+        btn_layout.addWidget(self.btn_workload)
         self.btn_add = QPushButton('Add Number')
         self.btn_add.clicked.connect(self.add_number)
         btn_layout.addWidget(self.btn_add)
@@ -406,6 +1341,15 @@ class ArrayVisualizer(QWidget):
             except ValueError:
                 QMessageBox.warning(self, 'Invalid Input', 'Please enter only numbers separated by commas.')
 
+    def generate_workload(self):
+        values = ask_workload(self)
+        if values is None:
+            return
+        self.array = values
+        self.scene.set_values(self.array)
+        self.show_feedback(f'Workload of {len(values)} values generated.')
+        self.step_explanation.setText('')
+
     def set_animations_enabled(self, enabled):
         self.animations_enabled = enabled
 
@@ -520,23 +1464,22 @@ class ArrayVisualizer(QWidget):
             self.step_explanation.setText('')
             self.scene.reset_all_colors()
             return
-        arr = self.array.copy()
+        # Snapshots are copies, so the real list is only relinked in finalize
+        before = SinglyLinkedList(self.list)
+        after = SinglyLinkedList(self.list)
+        after.swap(idx1, idx2)
         steps = []
-        steps.append((arr.copy(), [idx1, idx2], f"Step 1: Highlight indices {idx1} and {idx2} to swap."))
-        steps.append((arr.copy(), [idx1], f"Step 2: Store value {arr[idx1]} from index {idx1} in temp variable."))
-        arr[idx1] = arr[idx2]
-        steps.append((arr.copy(), [idx1, idx2], f"Step 3: Assign value from index {idx2} ({arr[idx2]}) to index {idx1}."))
-        arr[idx2] = arr[idx1]
-        steps.append((arr.copy(), [idx2], f"Step 4: Assign temp value ({arr[idx2]}) to index {idx2}."))
-        steps.append((arr.copy(), [], f"Step 5: Done. Array after swap."))
+        steps.append((before.head, [idx1, idx2], f"Step 1: Highlight nodes {idx1} and {idx2} to swap."))
+        steps.append((after.head, [idx1, idx2], f"Step 2: Relink the next pointers around nodes {idx1} and {idx2} so they trade places."))
+        steps.append((after.head, [], f"Step 3: Done. List after swap."))
         def finalize():
             if sip.isdeleted(self):
                 return
-            self.array[idx1], self.array[idx2] = self.array[idx2], self.array[idx1]
-            self.scene.set_values(self.array)
-            self.show_feedback(f'Swapped index {idx1} and {idx2}.')
+            self.list.swap(idx1, idx2)
+            self.show_list()
+            self.show_feedback(f'Swapped nodes {idx1} and {idx2}.')
             self.scene.reset_all_colors()
-        self.play_steps_auto_with_temp(steps, finalize, delay=2500, temp_value=arr[idx1], temp_steps=[1, 2, 3])
+        self.play_steps(steps, finalize)
 
     def play_steps_auto_with_temp(self, steps, finalize_callback=None, delay=2500, temp_value=None, temp_steps=None):
         self._stopped = False
@@ -648,6 +1591,12 @@ class LinkedListScene(QGraphicsScene):
         self.lines = []
         self.arrows = []
         self.head_label = None
+        # Index the last drawn node links back to, if the list has a cycle
+        self.cycle_to = None
+        self.box_width = BOX_WIDTH
+
+    def make_box(self, value):
+        return LinkedListNodeBox(value)
 
     def clear_scene(self):
         for node in self.nodes:
@@ -667,7 +1616,7 @@ class LinkedListScene(QGraphicsScene):
     def layout_nodes(self):
         n = len(self.nodes)
         node_spacing = BOX_WIDTH + BOX_SPACING
-        total_width = n * BOX_WIDTH + (n-1) * node_spacing if n > 0 else 0
+        total_width = n * self.box_width + (n-1) * node_spacing if n > 0 else 0
         # Expand scene rect to fit all nodes (min width 900)
         scene_width = max(900, total_width + 40)
         self.setSceneRect(0, 0, scene_width, 250)
@@ -675,7 +1624,7 @@ class LinkedListScene(QGraphicsScene):
         y = 80
         for i, node in enumerate(self.nodes):
             node.set_index_label(i)
-            target = QPointF(start_x + i * (BOX_WIDTH + node_spacing), y)
+            target = QPointF(start_x + i * (self.box_width + node_spacing), y)
             anim = QPropertyAnimation(node, b'pos')
             anim.setDuration(900)
             anim.setEasingCurve(QEasingCurve.InOutCubic)
@@ -684,7 +1633,7 @@ class LinkedListScene(QGraphicsScene):
             anim.start()
             self.animations.append(anim)
         if n > 0 and self.head_label:
-            head_x = start_x + BOX_WIDTH // 2 - 20
+            head_x = start_x + self.box_width // 2 - 20
             self.head_label.setPos(head_x, y - 30)
         QTimer.singleShot(950, self.update_arrows)
 
@@ -696,7 +1645,7 @@ class LinkedListScene(QGraphicsScene):
             n1 = self.nodes[i]
             n2 = self.nodes[i+1]
             # Draw from center-right of n1 to center-left of n2
-            x1 = n1.pos.x() + BOX_WIDTH
+            x1 = n1.pos.x() + self.box_width
             y1 = n1.pos.y() + BOX_HEIGHT / 2
             x2 = n2.pos.x()
             y2 = n2.pos.y() + BOX_HEIGHT / 2
@@ -705,14 +1654,19 @@ class LinkedListScene(QGraphicsScene):
                 line.setZValue(0)
             self.lines.append(line)
 
-    def set_from_head(self, head, animate=True):
+    def set_from_head(self, head, animate=True, cycle_to=None):
         # Only add/remove nodes as needed, and animate movement
-        # Update existing nodes
+        # Update existing nodes; only the first LIST_PREVIEW_LIMIT are drawn,
+        # and a node met a second time closes a cycle instead. A snapshot
+        # cannot loop, so cycle_to gives the index its last node links back to
         n = 0
         node = head
-        while node:
+        seen = {}
+        while node and n < LIST_PREVIEW_LIMIT and id(node) not in seen:
+            seen[id(node)] = n
             n += 1
             node = node.next
+        self.cycle_to = seen.get(id(node)) if node is not None else cycle_to
         
         # Remove extra nodes
         while len(self.nodes) > n:
@@ -723,9 +1677,9 @@ class LinkedListScene(QGraphicsScene):
         node = head
         i = 0
         prev_box = None
-        while node:
+        while node and i < n:
             if i >= len(self.nodes):
-                box = LinkedListNodeBox(node.value)
+                box = self.make_box(node.value)
                 box.set_index_label(i)
                 self.addItem(box)
                 self.nodes.append(box)
@@ -753,17 +1707,19 @@ class LinkedListScene(QGraphicsScene):
         else:
             # Set positions without animation
             node_spacing = BOX_WIDTH + BOX_SPACING  # Restore reasonable spacing
-            total_width = n * BOX_WIDTH + (n-1) * node_spacing if n > 0 else 0
-            start_x = max(20, (900 - total_width) // 2)
+            total_width = n * self.box_width + (n-1) * node_spacing if n > 0 else 0
+            scene_width = max(900, total_width + 40)
+            self.setSceneRect(0, 0, scene_width, 250)
+            start_x = max(20, (scene_width - total_width) // 2)
             y = 80
             for i, node in enumerate(self.nodes):
                 node.set_index_label(i)
-                target = QPointF(start_x + i * (BOX_WIDTH + node_spacing), y)
+                target = QPointF(start_x + i * (self.box_width + node_spacing), y)
                 node.set_pos(target)
             
             # Position head label
             if n > 0 and self.head_label:
-                head_x = start_x + BOX_WIDTH // 2 - 20
+                head_x = start_x + self.box_width // 2 - 20
                 self.head_label.setPos(head_x, y - 30)
             
             # Update arrows immediately since no animation
@@ -785,7 +1741,7 @@ class LinkedListScene(QGraphicsScene):
             n1 = self.nodes[i]
             n2 = self.nodes[i+1]
             # Draw from center-right of n1 to center-left of n2
-            x1 = n1.pos.x() + BOX_WIDTH
+            x1 = n1.pos.x() + self.box_width
             y1 = n1.pos.y() + BOX_HEIGHT / 2
             x2 = n2.pos.x()
             y2 = n2.pos.y() + BOX_HEIGHT / 2
@@ -802,36 +1758,37 @@ class LinkedListScene(QGraphicsScene):
             if arrow_item:
                 arrow_item.setZValue(1)
             self.arrows.append(arrow_item)
-        # Draw prev arrows (left)
-        for i, node in enumerate(self.nodes):
-            if node.prev_node is not None:
-                n1 = node
-                n2 = node.prev_node
-                x1 = n1.pos.x()
-                y1 = n1.pos.y() + BOX_HEIGHT / 2
-                x2 = n2.pos.x() + BOX_WIDTH
-                y2 = n2.pos.y() + BOX_HEIGHT / 2
-                line = self.addLine(x1, y1, x2, y2, QPen(QColor(80, 180, 255), 3, Qt.DashLine))
-                if line:
-                    line.setZValue(0)
+        if self.cycle_to is not None and self.cycle_to < len(self.nodes):
+            # Back link from the last node: down, left under the list, up into the target
+            n1 = self.nodes[-1]
+            n2 = self.nodes[self.cycle_to]
+            x1 = n1.pos.x() + self.box_width / 2
+            x2 = n2.pos.x() + self.box_width / 2
+            y1 = n1.pos.y() + BOX_HEIGHT + 22
+            y2 = y1 + 30
+            pen = QPen(ARROW_COLOR, 3, Qt.DashLine)
+            for segment in ((x1, y1, x1, y2), (x1, y2, x2, y2), (x2, y2, x2, y1)):
+                line = self.addLine(*segment, pen)
+                line.setZValue(0)
                 self.arrows.append(line)
-                # Arrowhead
-                arrow_size = 12
-                arrow_p1 = QPointF(x2, y2) + QPointF(arrow_size * 0.7, -arrow_size * 0.5)
-                arrow_p2 = QPointF(x2, y2) + QPointF(arrow_size * 0.7, arrow_size * 0.5)
-                arrow_head = QPolygonF([QPointF(x2, y2), arrow_p1, arrow_p2])
-                arrow_item = self.addPolygon(arrow_head, QPen(QColor(80, 180, 255)), QBrush(QColor(80, 180, 255)))
-            if arrow_item:
-                arrow_item.setZValue(1)
+            arrow_size = 12
+            tip = QPointF(x2, y1)
+            arrow_head = QPolygonF([tip, tip + QPointF(-arrow_size * 0.5, arrow_size * 0.7), tip + QPointF(arrow_size * 0.5, arrow_size * 0.7)])
+            arrow_item = self.addPolygon(arrow_head, QPen(ARROW_COLOR), QBrush(ARROW_COLOR))
+            arrow_item.setZValue(1)
             self.arrows.append(arrow_item)
 
 class LinkedListVisualizer(QWidget):
+    title = 'Linked List Visualizer'
+    list_type = SinglyLinkedList
+    scene_type = LinkedListScene
+
     def __init__(self):
         super().__init__()
         self._stopped = False
         self.animations_enabled = True
-        self.head = None  # Head node of the linked list
-        self.scene = LinkedListScene()
+        self.list = self.list_type()
+        self.scene = self.scene_type()
         self.view = QGraphicsView(self.scene)
         self.view.setRenderHint(QPainter.Antialiasing)
         self.view.setStyleSheet('background: #f8f8ff; border: none;')
@@ -850,7 +1807,7 @@ class LinkedListVisualizer(QWidget):
 
     def init_ui(self):
         main_layout = QVBoxLayout()
-        title = QLabel('Linked List Visualizer')
+        title = QLabel(self.title)
         title.setStyleSheet('font-size: 22px; font-weight: bold; margin: 8px;')
         main_layout.addWidget(title)
         main_layout.addWidget(self.view)
@@ -858,32 +1815,41 @@ class LinkedListVisualizer(QWidget):
         main_layout.addWidget(self.step_explanation)
         main_layout.addWidget(self.btn_next_step)
         main_layout.addStretch(1)
-        btn_layout = QHBoxLayout()
-        self.btn_random = QPushButton('Random List')
-        self.btn_random.clicked.connect(self.generate_random_list)
-        btn_layout.addWidget(self.btn_random)
-        self.btn_create = QPushButton('Create Your Own')
-        self.btn_create.clicked.connect(self.create_own_list)
-        btn_layout.addWidget(self.btn_create)
-        self.btn_add = QPushButton('Add Node')
-        self.btn_add.clicked.connect(self.add_node)
-        btn_layout.addWidget(self.btn_add)
-        self.btn_insert = QPushButton('Insert at Index')
-        self.btn_insert.clicked.connect(self.insert_at_index)
-        btn_layout.addWidget(self.btn_insert)
-        self.btn_remove = QPushButton('Remove Node')
-        self.btn_remove.clicked.connect(self.remove_node)
-        btn_layout.addWidget(self.btn_remove)
-        self.btn_swap = QPushButton('Swap Nodes')
-        self.btn_swap.clicked.connect(self.swap_nodes)
-        btn_layout.addWidget(self.btn_swap)
-        main_layout.addLayout(btn_layout)
+        for row in self.button_rows():
+            btn_layout = QHBoxLayout()
+            for label, slot in row:
+                btn = QPushButton(label)
+                btn.clicked.connect(slot)
+                btn_layout.addWidget(btn)
+            main_layout.addLayout(btn_layout)
         self.setLayout(main_layout)
         self.setMinimumHeight(350)
         self.setMinimumWidth(900)
         self.step_explanation.setVisible(True)
         self.btn_next_step.setVisible(False)
 
+    def button_rows(self):
+        # Rows of (label, slot); subclasses swap in their own operations
+        return [
+            [('Random List', self.generate_random_list), ('Create Your Own', self.create_own_list),
+             ('Workload', self.generate_workload), ('Add Node', self.add_node),
+             ('Insert at Index', self.insert_at_index), ('Remove Node', self.remove_node),
+             ('Swap Nodes', self.swap_nodes)],
+            # Pointer algorithms
+            [('Reverse', self.reverse_nodes), ('Find Middle', self.find_middle),
+             ('Create Cycle', self.create_cycle), ('Detect Cycle', self.find_cycle),
+             ('Merge Sort', self.merge_sort_nodes), ('Merge k Lists', self.merge_sorted_lists)],
+        ]
+
+    @property
+    def head(self):
+        return self.list.head
+
+    def show_list(self, animate=True):
+        self.scene.set_from_head(self.list.head, animate=animate)
+        if len(self.list) > LIST_PREVIEW_LIMIT:
+            self.step_explanation.setText(f'Showing the first {LIST_PREVIEW_LIMIT} of {len(self.list)} nodes.')
+
     def show_feedback(self, text):
         self.feedback.setText(text)
         QTimer.singleShot(1200, lambda: self.feedback.setText(''))
@@ -909,8 +1875,9 @@ class LinkedListVisualizer(QWidget):
             self.current_step += 1
             QTimer.singleShot(3500, lambda: (not getattr(self, '_stopped', True) and not sip.isdeleted(self) and self._play_next_step(finalize_callback), None)[-1])
         else:
-            head, highlight, explanation = step
-            self.scene.set_from_head(head, animate=True)
+            # An optional fourth item is the index a snapshot's tail links back to
+            head, highlight, explanation = step[:3]
+            self.scene.set_from_head(head, animate=True, cycle_to=step[3] if len(step) > 3 else None)
             self.scene.reset_all_colors()
             for idx in highlight:
                 self.scene.set_box_color(idx, QColor(255, 215, 0))
@@ -928,188 +1895,86 @@ class LinkedListVisualizer(QWidget):
             node = node.next
         return arr
 
-    def clone_list(self, head):
-        # Returns a new head, and a mapping from old node to new node
-        if not head:
-            return None, {}
-        old_to_new = {}
-        new_head = LLNode(head.value)
-        old_to_new[head] = new_head
-        prev_new = new_head
-        prev_old = head
-        curr_old = head.next
-        while curr_old:
-            curr_new = LLNode(curr_old.value)
-            old_to_new[curr_old] = curr_new
-            prev_new.next = curr_new
-            prev_new = curr_new
-            prev_old = curr_old
-            curr_old = curr_old.next
-        return new_head, old_to_new
-
-    def set_head(self, head):
-        self.head = head
-        self.scene.set_from_head(self.head)
+    def set_list(self, values):
+        self.list = self.list_type(values)
+        self.step_explanation.setText('')
+        self.show_list()
 
     def generate_random_list(self):
         values = [random.randint(0, 99) for _ in range(random.randint(4, 8))]
-        self.head = None
-        prev = None
-        for v in values:
-            node = LLNode(v)
-            if self.head is None:
-                self.head = node
-            if prev:
-                prev.next = node
-            prev = node
-        self.scene.set_from_head(self.head)
+        self.set_list(values)
         self.show_feedback('Random linked list generated.')
-        self.step_explanation.setText('')
 
     def create_own_list(self):
         text, ok = QInputDialog.getText(self, 'Create Linked List', 'Enter numbers separated by commas:')
         if ok:
             try:
                 nums = [int(x.strip()) for x in text.split(',') if x.strip()]
-                self.head = None
-                prev = None
-                for v in nums:
-                    node = LLNode(v)
-                    if self.head is None:
-                        self.head = node
-                    if prev:
-                        prev.next = node
-                    prev = node
-                self.scene.set_from_head(self.head)
+                self.set_list(nums)
                 self.show_feedback('Custom linked list created.')
-                self.step_explanation.setText('')
             except ValueError:
                 QMessageBox.warning(self, 'Invalid Input', 'Please enter only numbers separated by commas.')
 
+    def generate_workload(self):
+        values = ask_workload(self, max_size=MAX_LIST_WORKLOAD)
+        if values is None:
+            return
+        self.set_list(values)
+        self.show_feedback(f'Workload of {len(values)} nodes generated.')
+
     def set_animations_enabled(self, enabled):
         self.animations_enabled = enabled
 
     def add_node(self):
         num, ok = QInputDialog.getInt(self, 'Add Node', 'Enter a number to add:')
         if ok:
-            if not self.animations_enabled:
-                if not self.head:
-                    self.head = LLNode(num)
-                else:
-                    node = self.head
-                    while node.next:
-                        node = node.next
-                    node.next = LLNode(num)
-                self.scene.set_from_head(self.head, animate=False)
-                self.show_feedback(f'Added {num} to the end.')
-                self.step_explanation.setText('')
-                return
-            # Add to end
-            if not self.head:
-                self.head = LLNode(num)
-            else:
-                node = self.head
-                while node.next:
-                    node = node.next
-                node.next = LLNode(num)
-            self.scene.set_from_head(self.head)
-            self.show_feedback(f'Added {num} to the end.')
+            # Add to end: the tail pointer makes this O(1)
+            self.list.append(num)
             self.step_explanation.setText('')
+            self.show_list(animate=self.animations_enabled)
+            self.show_feedback(f'Added {num} to the end.')
 
     def insert_at_index(self):
-        idx, ok = QInputDialog.getInt(self, 'Insert at Index', f'Enter index (0 to {self.length()}):', min=0, max=self.length())
+        n = len(self.list)
+        idx, ok = QInputDialog.getInt(self, 'Insert at Index', f'Enter index (0 to {n}):', min=0, max=n)
         if not ok:
             return
         num, ok = QInputDialog.getInt(self, 'Insert at Index', 'Enter a number to insert:')
         if not ok:
             return
         if not self.animations_enabled:
-            if idx == 0:
-                new_node = LLNode(num)
-                new_node.next = self.head
-                if self.head:
-                    self.head.prev = new_node
-                self.head = new_node
-            else:
-                curr = self.head
-                for i in range(idx - 1):
-                    if curr is None:
-                        break
-                    curr = curr.next
-                if curr is not None:
-                    new_node = LLNode(num)
-                    new_node.next = curr.next
-                    new_node.prev = curr
-                    if curr.next:
-                        curr.next.prev = new_node
-                    curr.next = new_node
-            self.scene.set_from_head(self.head, animate=False)
+            self.list.insert(idx, num)
+            self.show_list(animate=False)
             self.show_feedback(f'Inserted {num} at index {idx}.')
             self.step_explanation.setText('')
             self.scene.reset_all_colors()
             return
-        # Create a copy of the list for animation
-        head_copy, old_to_new = self.clone_list(self.head)
+        # Steps show immutable snapshots: the one after the insert copies
+        # only the idx nodes before it and shares the rest
+        before = self.list.snapshot()
+        after = snapshot_edit(before, idx, [num])
         steps = []
         
         # Step 1: Highlight where to insert
         if idx == 0:
-            steps.append((head_copy, [idx], f"Step 1: Highlight position for new head node."))
+            steps.append((before, [idx], f"Step 1: Highlight position for new head node."))
         else:
-            steps.append((head_copy, [idx], f"Step 1: Highlight index {idx} for insertion."))
-        
-        # Step 2: Traverse to the node before insertion point
-        curr = head_copy
-        prev = None
-        for i in range(idx):
-            if curr is None:
-                break
-            prev = curr
-            curr = curr.next
+            steps.append((before, [idx], f"Step 1: Highlight index {idx} for insertion."))
         
-        # Step 3: Create new node and update pointers
-        new_node = LLNode(num)
-        if prev is None:
-            # Inserting at head
-            new_node.next = head_copy
-            new_head = new_node
-            steps.append((new_head, [0], f"Step 2: Create new node with value {num} and make it the new head."))
+        # Step 2: Create new node and update pointers
+        if idx == 0:
+            steps.append((after, [0], f"Step 2: Create new node with value {num} and make it the new head."))
         else:
-            # Inserting in middle or end
-            new_node.next = curr
-            prev.next = new_node
-            new_head = head_copy
-            steps.append((new_head, [idx], f"Step 2: Create new node with value {num} and update pointers."))
+            steps.append((after, [idx], f"Step 2: Create new node with value {num} and update pointers."))
         
-        steps.append((new_head, [], f"Step 3: Done. List after insertion."))
+        steps.append((after, [], f"Step 3: Done. List after insertion (this step's snapshot copied {idx} nodes and shares {n - idx})."))
         
         def finalize():
             if sip.isdeleted(self):
                 return
             # Actually insert in real list
-            if idx == 0:
-                # Insert at head
-                new_node = LLNode(num)
-                new_node.next = self.head
-                if self.head:
-                    self.head.prev = new_node
-                self.head = new_node
-            else:
-                # Insert in middle or end
-                curr = self.head
-                for i in range(idx - 1):
-                    if curr is None:
-                        break
-                    curr = curr.next
-                if curr is not None:
-                    new_node = LLNode(num)
-                    new_node.next = curr.next
-                    new_node.prev = curr
-                    if curr.next:
-                        curr.next.prev = new_node
-                    curr.next = new_node
-            
-            self.scene.set_from_head(self.head)
+            self.list.insert(idx, num)
+            self.show_list()
             self.show_feedback(f'Inserted {num} at index {idx}.')
             # Reset all colors
             self.scene.reset_all_colors()
@@ -1120,81 +1985,45 @@ class LinkedListVisualizer(QWidget):
         if not self.head:
             QMessageBox.warning(self, 'Empty List', 'List is already empty!')
             return
-        idx, ok = QInputDialog.getInt(self, 'Remove Node', f'Enter index to remove (0 to {self.length()-1}):', min=0, max=max(0, self.length()-1))
+        n = len(self.list)
+        idx, ok = QInputDialog.getInt(self, 'Remove Node', f'Enter index to remove (0 to {n-1}):', min=0, max=max(0, n-1))
         if not ok:
             return
         if not self.animations_enabled:
-            if idx == 0:
-                if self.head:
-                    self.head = self.head.next
-            else:
-                curr = self.head
-                for i in range(idx - 1):
-                    if curr is None:
-                        break
-                    curr = curr.next
-                if curr and curr.next:
-                    curr.next = curr.next.next
-            self.scene.set_from_head(self.head, animate=False)
+            self.list.pop(idx)
+            self.show_list(animate=False)
             self.show_feedback(f'Node at index {idx} removed.')
             self.step_explanation.setText('')
             self.scene.reset_all_colors()
             return
-        # Create a copy of the list for animation
-        head_copy, old_to_new = self.clone_list(self.head)
+        # Immutable snapshots: the one after the removal copies only the idx nodes before it
+        before = self.list.snapshot()
+        after = snapshot_edit(before, idx, skip=1)
         steps = []
         
         # Step 1: Highlight node to remove
         if idx == 0:
-            steps.append((head_copy, [idx], f"Step 1: Highlight head node to remove."))
+            steps.append((before, [idx], f"Step 1: Highlight head node to remove."))
         else:
-            steps.append((head_copy, [idx], f"Step 1: Highlight node {idx} to remove."))
+            steps.append((before, [idx], f"Step 1: Highlight node {idx} to remove."))
         
-        # Step 2: Traverse to the node before the one to remove
-        curr = head_copy
-        prev = None
-        for i in range(idx):
-            if curr is None:
-                break
-            prev = curr
-            curr = curr.next
-        
-        # Step 3: Update pointers to skip the removed node
-        if prev is None:
-            # Removing head
-            new_head = curr.next if curr else None
-            if new_head:
-                steps.append((new_head, [0], f"Step 2: Update head pointer to next node."))
+        # Step 2: Update pointers to skip the removed node
+        if idx == 0:
+            if after:
+                steps.append((after, [0], f"Step 2: Update head pointer to next node."))
             else:
-                steps.append((new_head, [], f"Step 2: List becomes empty (no head)."))
+                steps.append((after, [], f"Step 2: List becomes empty (no head)."))
         else:
-            # Removing from middle or end
-            if curr:
-                prev.next = curr.next
-            new_head = head_copy
-            steps.append((new_head, [idx-1] if prev else [], f"Step 2: Update pointer to skip node {idx}."))
+            steps.append((after, [idx-1], f"Step 2: Update pointer to skip node {idx}."))
         
-        steps.append((new_head, [], f"Step 3: Done. List after removal."))
+        steps.append((after, [], f"Step 3: Done. List after removal (this step's snapshot copied {idx} nodes and shares {n - idx - 1})."))
         
         def finalize():
             if sip.isdeleted(self):
                 return
             # Actually remove from real list
-            if idx == 0:
-                # Remove head
-                if self.head:
-                    self.head = self.head.next
-            else:
-                # Remove from middle or end
-                curr = self.head
-                for i in range(idx - 1):
-                    if curr is None:
-                        break
-                    curr = curr.next
-                if curr and curr.next:
-                    curr.next = curr.next.next
-            
-            self.scene.set_from_head(self.head)
+            self.list.pop(idx)
+            self.show_list()
             self.show_feedback(f'Node at index {idx} removed.')
             # Reset all colors
             self.scene.reset_all_colors()
@@ -1202,15 +2031,150 @@ class LinkedListVisualizer(QWidget):
         self.play_steps(steps, finalize)
 
     def length(self):
-        count = 0
-        node = self.head
-        while node:
-            count += 1
-            node = node.next
-        return count
+        return len(self.list)
+
+    def can_animate(self):
+        return self.animations_enabled and len(self.list) <= LIST_PREVIEW_LIMIT
+
+    def finish_algorithm(self, steps, text, feedback):
+        # Plays the recorded steps and then the result, or shows the result at once
+        def finalize():
+            if sip.isdeleted(self):
+                return
+            self.show_list()
+            self.step_explanation.setText(text)
+            self.show_feedback(feedback)
+            self.scene.reset_all_colors()
+        if steps:
+            self.play_steps(steps, finalize)
+        else:
+            finalize()
+
+    def reverse_nodes(self):
+        if not self.list.head:
+            QMessageBox.warning(self, 'Empty List', 'List is empty!')
+            return
+        steps = [] if self.can_animate() else None
+        t0 = time.perf_counter()
+        stats = reverse_list(self.list, steps)
+        elapsed = time.perf_counter() - t0
+        text = (f'Reversed {len(self.list):,} nodes in place: {stats["pointer_writes"]:,} pointer writes, '
+                f'three pointers (prev, curr, next) of extra space, {1000 * elapsed:.2f} ms.')
+        self.finish_algorithm(steps, text, 'List reversed.')
+
+    def find_middle(self):
+        if not self.list.head:
+            QMessageBox.warning(self, 'Empty List', 'List is empty!')
+            return
+        if self.list.cycle_at is not None:
+            QMessageBox.warning(self, 'Cycle', 'A list with a cycle has no middle; detect the cycle first.')
+            return
+        steps = [] if self.can_animate() else None
+        head = self.list.snapshot() if steps is not None else self.list.head
+        t0 = time.perf_counter()
+        index, moves = middle_node(head, steps)
+        elapsed = time.perf_counter() - t0
+        text = (f'Middle of {len(self.list):,} nodes: index {index} (value {self.list.node_at(index).value}), found in one pass '
+                f'with {moves:,} pointer moves in {1000 * elapsed:.2f} ms; slow was there when fast ran out.')
+        if steps is not None:
+            steps.append((head, [index], text))
+        self.finish_algorithm(steps, text, 'Middle found.')
+
+    def create_cycle(self):
+        n = len(self.list)
+        if n == 0:
+            QMessageBox.warning(self, 'Empty List', 'List is empty!')
+            return
+        idx, ok = QInputDialog.getInt(self, 'Create Cycle', f'Index the tail links back to (0 to {n-1}):', 0, 0, n - 1)
+        if not ok:
+            return
+        self.list.make_cycle(idx)
+        self.step_explanation.setText('')
+        self.show_list(animate=False)
+        self.step_explanation.setText(f'The tail ({self.list.tail.value}) now points back at index {idx}, so following next never reaches None. '
+                                      'Any other edit breaks the cycle again.')
+        self.show_feedback('Cycle created.')
+
+    def find_cycle(self):
+        if not self.list.head:
+            QMessageBox.warning(self, 'Empty List', 'List is empty!')
+            return
+        n, entry = len(self.list), self.list.cycle_at
+        steps = [] if self.can_animate() else None
+        t0 = time.perf_counter()
+        start, length, moves = detect_cycle(self.list.head, steps)
+        elapsed = time.perf_counter() - t0
+        if steps is not None:
+            # Frames show the immutable snapshot, not the live nodes the walk went
+            # round, and walk positions past the tail wrap round the cycle
+            snapshot = self.list.snapshot()
+            fold = (lambda p: p) if entry is None else (lambda p: p if p < n else entry + (p - entry) % (n - entry))
+            steps = [(snapshot, [fold(p) for p in highlight], explanation, entry) for _, highlight, explanation in steps]
+        if start is None:
+            text = f'No cycle in {n:,} nodes: the hare reached None after {moves:,} pointer moves ({1000 * elapsed:.2f} ms).'
+        else:
+            text = (f'Cycle found by Floyd\'s tortoise and hare: it starts at index {start} and is {length} nodes long '
+                    f'({moves:,} pointer moves, O(1) extra space, {1000 * elapsed:.2f} ms).')
+        self.finish_algorithm(steps, text, 'Cycle detection complete.')
+
+    def merge_sort_nodes(self):
+        n = len(self.list)
+        if n == 0:
+            QMessageBox.warning(self, 'Empty List', 'List is empty!')
+            return
+        steps = [] if self.can_animate() else None
+        values = list(self.list)
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            t0 = time.perf_counter()
+            stats = merge_sort_list(self.list, steps)
+            elapsed = time.perf_counter() - t0
+            # The array merge sort of the Sorting Visualizer on the same values
+            costs = dict(predict_sort_cost('Merge Sort', values))
+            t0 = time.perf_counter()
+            sorted(values)
+            builtin = time.perf_counter() - t0
+        finally:
+            QApplication.restoreOverrideCursor()
+        text = (f'Bottom-up merge sort on {n:,} nodes: {stats["comparisons"]:,} comparisons and {stats["pointer_writes"]:,} pointer writes '
+                f'in {stats["passes"]} passes, O(1) extra space, {1000 * elapsed:.1f} ms.\n'
+                f'The array Merge Sort makes {costs["comparisons"]:,} comparisons and {costs["writes"]:,} value writes through an O(n) buffer; '
+                f'Python\'s sorted() on the array takes {1000 * builtin:.1f} ms.')
+        self.finish_algorithm(steps, text, 'List sorted.')
+
+    def merge_sorted_lists(self):
+        k, ok = QInputDialog.getInt(self, 'Merge k Lists', 'Number of sorted lists k:', 8, 2, 1000)
+        if not ok:
+            return
+        n, ok = QInputDialog.getInt(self, 'Merge k Lists', f'Total nodes ({k} to {MAX_LIST_WORKLOAD}):', max(k, 10000), k, MAX_LIST_WORKLOAD)
+        if not ok:
+            return
+        seed, ok = QInputDialog.getInt(self, 'Merge k Lists', 'Seed (same seed, same input):', 42, 0, 2**31 - 1)
+        if not ok:
+            return
+        runs = [np.sort(run).tolist() for run in np.array_split(WorkloadGenerator(seed).generate('Uniform', n), k)]
+        lists = [SinglyLinkedList(run) for run in runs]
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            t0 = time.perf_counter()
+            merged, stats = merge_k_lists(lists)
+            elapsed = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            list(heapq.merge(*runs))
+            arrays = time.perf_counter() - t0
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.list = merged
+        self.step_explanation.setText('')
+        self.show_list()
+        self.step_explanation.setText(
+            f'Merged {k} sorted lists of {n:,} nodes by relinking: {stats["pointer_writes"]:,} pointer writes and '
+            f'{stats["heap_operations"]:,} operations on a heap of at most {k} fronts (about log2 k = {np.log2(k):.1f} comparisons each), '
+            f'{1000 * elapsed:.1f} ms. heapq.merge over the same runs as arrays: {1000 * arrays:.1f} ms.')
+        self.show_feedback('Lists merged.')
 
     def swap_nodes(self):
-        n = self.length()
+        n = len(self.list)
         if n < 2:
             QMessageBox.warning(self, 'Too Small', 'Need at least 2 nodes to swap.')
             return
@@ -1221,116 +2185,27 @@ class LinkedListVisualizer(QWidget):
         if not ok2 or idx1 == idx2:
             return
         if not self.animations_enabled:
-            if idx1 == idx2:
-                return
-            node1 = self.head
-            prev1 = None
-            for _ in range(idx1):
-                if node1:
-                    prev1 = node1
-                    node1 = node1.next
-            node2 = self.head
-            prev2 = None
-            for _ in range(idx2):
-                if node2:
-                    prev2 = node2
-                    node2 = node2.next
-            if node1 and node2:
-                next1 = node1.next
-                next2 = node2.next
-                if prev1 is None:
-                    self.head = node2
-                else:
-                    prev1.next = node2
-                if prev2 is None:
-                    self.head = node1
-                else:
-                    prev2.next = node1
-                if node1 == next2:
-                    node1.next = node2
-                    node2.next = next1
-                elif node2 == next1:
-                    node2.next = node1
-                    node1.next = next2
-                else:
-                    node1.next = next2
-                    node2.next = next1
-            self.scene.set_from_head(self.head, animate=False)
+            self.list.swap(idx1, idx2)
+            self.show_list(animate=False)
             self.show_feedback(f'Swapped nodes {idx1} and {idx2}.')
             self.step_explanation.setText('')
             self.scene.reset_all_colors()
             return
-        arr = self.array.copy()
+        # Snapshots are immutable, so the real list is only relinked in finalize
+        before = self.list.snapshot()
+        after = snapshot_swap(before, idx1, idx2)
         steps = []
-        steps.append((arr.copy(), [idx1, idx2], f"Step 1: Highlight indices {idx1} and {idx2} to swap."))
-        steps.append((arr.copy(), [idx1], f"Step 2: Store value {arr[idx1]} from index {idx1} in temp variable."))
-        arr[idx1] = arr[idx2]
-        steps.append((arr.copy(), [idx1, idx2], f"Step 3: Assign value from index {idx2} ({arr[idx2]}) to index {idx1}."))
-        arr[idx2] = arr[idx1]
-        steps.append((arr.copy(), [idx2], f"Step 4: Assign temp value ({arr[idx2]}) to index {idx2}."))
-        steps.append((arr.copy(), [], f"Step 5: Done. Array after swap."))
+        steps.append((before, [idx1, idx2], f"Step 1: Highlight nodes {idx1} and {idx2} to swap."))
+        steps.append((after, [idx1, idx2], f"Step 2: Relink the next pointers around nodes {idx1} and {idx2} so they trade places."))
+        steps.append((after, [], f"Step 3: Done. List after swap."))
         def finalize():
             if sip.isdeleted(self):
                 return
-            self.array[idx1], self.array[idx2] = self.array[idx2], self.array[idx1]
-            self.scene.set_values(self.array)
-            self.show_feedback(f'Swapped index {idx1} and {idx2}.')
+            self.list.swap(idx1, idx2)
+            self.show_list()
+            self.show_feedback(f'Swapped nodes {idx1} and {idx2}.')
             self.scene.reset_all_colors()
-        self.play_steps_auto_with_temp(steps, finalize, delay=2500, temp_value=arr[idx1], temp_steps=[1, 2, 3])
-
-    def play_steps_auto_with_temp(self, steps, finalize_callback=None, delay=2500, temp_value=None, temp_steps=None):
-        self._stopped = False
-        self.steps = steps
-        self.current_step = 0
-        self.animating = True
-        self.temp_value = temp_value
-        self.temp_steps = temp_steps or []
-        self.temp_box = None
-        self.temp_label = None
-        self._play_next_step_auto_with_temp(finalize_callback, delay)
-
-    def _play_next_step_auto_with_temp(self, finalize_callback=None, delay=2500):
-        if getattr(self, '_stopped', False) or sip.isdeleted(self):
-            return
-        if self.current_step >= len(self.steps):
-            self.animating = False
-            if self.temp_box and self.temp_label:
-                self.scene.remove_temp_box(self.temp_box, self.temp_label)
-            if finalize_callback:
-                finalize_callback()
-            return
-        step = self.steps[self.current_step]
-        arr, highlight, explanation = step
-        if self.current_step in self.temp_steps:
-            if self.temp_box is None:
-                # Create temp box to the right of the array
-                n = len(arr)
-                total_width = n * BOX_WIDTH + (n-1) * BOX_SPACING
-                start_x = max(20, (800 - total_width) // 2)
-                temp_x = start_x + total_width + BOX_SPACING * 2  # Position to the right with extra spacing
-                temp_y = 80  # Same y-level as the array
-                temp_pos = QPointF(temp_x, temp_y)
-                self.temp_box, self.temp_label = self.scene.show_temp_box(self.temp_value, temp_pos)
-                # Style the temp label with better formatting
-                self.temp_label.setFont(QFont('Arial', 12, QFont.Bold))
-                self.temp_label.setBrush(QBrush(QColor(255, 60, 80)))  # Use accent color
-        else:
-            # Remove temp box if it exists
-            if self.temp_box and self.temp_label:
-                self.scene.remove_temp_box(self.temp_box, self.temp_label)
-                self.temp_box = None
-                self.temp_label = None
-        
-        self.scene.set_values(arr)
-        # Reset all colors first, then highlight only the relevant ones
-        self.scene.reset_all_colors()
-        for idx in highlight:
-            self.scene.set_box_color(idx, QColor(255, 215, 0))
-        if not sip.isdeleted(self.step_explanation):
-            self.step_explanation.setText(explanation)
-        self.feedback.setText('')
-        self.current_step += 1
-        QTimer.singleShot(delay, lambda: (not getattr(self, '_stopped', True) and not sip.isdeleted(self) and self._play_next_step_auto_with_temp(finalize_callback, delay), None)[-1])
+        self.play_steps(steps, finalize)
 
     def next_step(self):
         if self.current_step < len(self.steps):
@@ -1360,6 +2235,182 @@ class LinkedListVisualizer(QWidget):
                 anim.stop()
             self.scene.animations.clear()
 
+UNROLLED_SLOT_WIDTH = 40
+HEAP_LAYOUTS = ['Back to back (freshly allocated)', 'Scattered (heap after churn)']
+
+class UnrolledNodeBox(LinkedListNodeBox):
+    """Unrolled node drawn as its row of slots, the filled ones in color, with its fill level below"""
+    def __init__(self, values, capacity):
+        super().__init__(values)
+        self.capacity = capacity
+        self.rect = QRectF(0, 0, capacity * UNROLLED_SLOT_WIDTH, BOX_HEIGHT)
+
+    def paint(self, painter, option, widget=None):
+        if painter is None:
+            return
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setBrush(QBrush(QColor(235, 235, 240)))
+        painter.setPen(QPen(Qt.black, 2))
+        painter.drawRoundedRect(self.rect, 10, 10)
+        painter.setFont(QFont('Arial', 11, QFont.Bold))
+        for i in range(self.capacity):
+            slot = QRectF(i * UNROLLED_SLOT_WIDTH + 3, 3, UNROLLED_SLOT_WIDTH - 6, BOX_HEIGHT - 6)
+            if i < len(self.value):
+                painter.setBrush(QBrush(self.color))
+                painter.setPen(QPen(Qt.black, 1))
+                painter.drawRoundedRect(slot, 6, 6)
+                painter.drawText(slot, Qt.AlignCenter, str(self.value[i]))
+            else:
+                painter.setBrush(Qt.NoBrush)
+                painter.setPen(QPen(Qt.lightGray, 1, Qt.DashLine))
+                painter.drawRoundedRect(slot, 6, 6)
+        painter.setFont(QFont('Arial', 10))
+        painter.setPen(QPen(Qt.darkGray))
+        label = f'{len(self.value)}/{self.capacity}'
+        if self.index_label is not None:
+            label = f'[{self.index_label}]  {label}'
+        painter.drawText(QRectF(0, BOX_HEIGHT, self.rect.width(), 20), Qt.AlignCenter, label)
+
+class UnrolledListScene(LinkedListScene):
+    def __init__(self, parent=None, capacity=UNROLLED_CAPACITY):
+        super().__init__(parent)
+        self.set_capacity(capacity)
+
+    def set_capacity(self, capacity):
+        # Boxes are as wide as their slots, so a new capacity redraws every node
+        self.capacity = capacity
+        self.box_width = capacity * UNROLLED_SLOT_WIDTH
+        self.clear_scene()
+
+    def make_box(self, value):
+        return UnrolledNodeBox(value, self.capacity)
+
+class UnrolledListVisualizer(LinkedListVisualizer):
+    title = 'Unrolled Linked List Visualizer'
+    list_type = UnrolledLinkedList
+    scene_type = UnrolledListScene
+
+    def button_rows(self):
+        return [[('Random List', self.generate_random_list), ('Create Your Own', self.create_own_list),
+                 ('Workload', self.generate_workload), ('Add Value', self.add_node),
+                 ('Insert at Index', self.insert_at_index), ('Remove at Index', self.remove_node),
+                 ('Node Capacity', self.set_capacity), ('Locality', self.compare_locality)]]
+
+    def show_list(self, animate=True):
+        self.scene.set_from_head(self.list.head, animate=animate)
+        nodes, capacity = self.list.node_count, self.list.capacity
+        fill = len(self.list) / max(1, nodes)
+        text = (f'{len(self.list):,} values in {nodes:,} nodes of capacity {capacity}: '
+                f'{fill:.1f} values per node ({fill / capacity:.0%} full).')
+        if nodes > LIST_PREVIEW_LIMIT:
+            text = f'Showing the first {LIST_PREVIEW_LIMIT} of {nodes:,} nodes. ' + text
+        self.step_explanation.setText(text)
+
+    def set_list(self, values, capacity=None):
+        capacity = capacity or self.list.capacity
+        if capacity != self.scene.capacity:
+            self.scene.set_capacity(capacity)
+        self.list = UnrolledLinkedList(values, capacity)
+        self.show_list()
+
+    def can_animate(self):
+        return self.animations_enabled and self.list.node_count <= LIST_PREVIEW_LIMIT
+
+    def finish_edit(self, steps, text, feedback):
+        def finalize():
+            if sip.isdeleted(self):
+                return
+            self.show_list(animate=self.animations_enabled)
+            self.step_explanation.setText(f'{text}\n{self.step_explanation.text()}')
+            self.show_feedback(feedback)
+            self.scene.reset_all_colors()
+        if steps:
+            self.play_steps(steps, finalize)
+        else:
+            finalize()
+
+    def add_node(self):
+        num, ok = QInputDialog.getInt(self, 'Add Value', 'Enter a number to add:')
+        if ok:
+            # The tail node takes it, or a new node once the tail is full
+            self.list.append(num)
+            self.show_list(animate=self.animations_enabled)
+            self.show_feedback(f'Added {num} to the end.')
+
+    def insert_at_index(self):
+        n = len(self.list)
+        idx, ok = QInputDialog.getInt(self, 'Insert at Index', f'Enter index (0 to {n}):', min=0, max=n)
+        if not ok:
+            return
+        num, ok = QInputDialog.getInt(self, 'Insert at Index', 'Enter a number to insert:')
+        if not ok:
+            return
+        animate = self.can_animate()
+        before = self.list.snapshot() if animate else None
+        k, split = self.list.insert(idx, num)
+        if split:
+            text = (f'Node {k} was full, so its back half moved into a new node {k + 1} '
+                    f'and {num} went into whichever half holds index {idx}.')
+        else:
+            text = f'Node {k} had a free slot: {num} was shifted into it at index {idx} without touching a pointer.'
+        steps = None
+        if animate:
+            steps = [(before, [k], f'Step 1: Skip whole nodes by their counts to node {k}, which holds index {idx}.'),
+                     (self.list.snapshot(), [k, k + 1] if split else [k], f'Step 2: {text}')]
+        self.finish_edit(steps, text, f'Inserted {num} at index {idx}.')
+
+    def remove_node(self):
+        n = len(self.list)
+        if n == 0:
+            QMessageBox.warning(self, 'Empty List', 'List is already empty!')
+            return
+        idx, ok = QInputDialog.getInt(self, 'Remove at Index', f'Enter index to remove (0 to {n-1}):', min=0, max=n - 1)
+        if not ok:
+            return
+        animate = self.can_animate()
+        before = self.list.snapshot() if animate else None
+        value, k, action = self.list.pop(idx)
+        text = {
+            None: f'Removed {value} from node {k}, which is still at least half full.',
+            'borrowed': f'Removed {value}; node {k} fell below half full, so it took values from the front of node {k + 1}.',
+            'merged': f'Removed {value}; node {k} fell below half full and node {k + 1} fit into it, so the two merged.',
+            'emptied': f'Removed {value}; the last node became empty and was unlinked.',
+        }[action]
+        steps = None
+        if animate:
+            after = [] if action == 'emptied' else [k, k + 1] if action == 'borrowed' else [k]
+            steps = [(before, [k], f'Step 1: Skip whole nodes by their counts to node {k}, which holds index {idx}.'),
+                     (self.list.snapshot(), after, f'Step 2: {text}')]
+        self.finish_edit(steps, text, f'Removed index {idx}.')
+
+    def set_capacity(self):
+        capacity, ok = QInputDialog.getInt(self, 'Node Capacity', f'Values per node (2 to {MAX_DRAWN_CAPACITY}):',
+                                           self.list.capacity, 2, MAX_DRAWN_CAPACITY)
+        if ok:
+            self.set_list(list(self.list), capacity)
+            self.show_feedback(f'Rebuilt with {capacity} values per node.')
+
+    def compare_locality(self):
+        if not len(self.list):
+            QMessageBox.warning(self, 'Empty List', 'List is empty!')
+            return
+        layout, ok = QInputDialog.getItem(self, 'Locality', 'Where the nodes sit in memory:', HEAP_LAYOUTS, 0, False)
+        if not ok:
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            results = compare_list_locality(self.list, scattered=layout == HEAP_LAYOUTS[1])
+        finally:
+            QApplication.restoreOverrideCursor()
+        n = len(self.list)
+        lines = [f'One traversal of {n:,} values, nodes {layout.split(" (")[0].lower()}, through {DEFAULT_CACHE_SPEC} caches with 64-byte lines:']
+        for name, s in results.items():
+            lines.append(f'{name}: {s["nodes"]:,} nodes, {s["modeled_bytes"]:.1f} B per value as C structs ({s["python_bytes"]:.0f} B in CPython); '
+                         f'{s["line_touches"] / n:.2f} cache lines touched per value, {s["l1_misses"]:,} L1 misses, '
+                         f'{s["memory_fetches"]:,} memory fetches; walked in {s["walk_ms"]:.1f} ms')
+        self.step_explanation.setText('\n'.join(lines))
+        self.show_feedback('Locality compared.')
+
 class DoublyLinkedListNodeBox(BaseBox):
     def __init__(self, value, color=QColor(200,255,200)):
         super().__init__(value, color)
@@ -1391,6 +2442,7 @@ class DoublyLinkedListScene(QGraphicsScene):
         self.arrows = []
         self.head_label = None
         self.tail_label = None
+        self.truncated = False
 
     def clear_scene(self):
         for node in self.nodes:
@@ -1445,16 +2497,19 @@ class DoublyLinkedListScene(QGraphicsScene):
                 self.addItem(self.tail_label)
             tail_x = start_x + (n-1) * (BOX_WIDTH + node_spacing) + BOX_WIDTH // 2 - 20
             self.tail_label.setPos(tail_x, y + BOX_HEIGHT + 10)
+            self.tail_label.setVisible(not self.truncated)
         QTimer.singleShot(950, self.update_arrows)
 
     def set_from_head(self, head, animate=True):
-        # Build node list from head
+        # Build node list from head, up to the LIST_PREVIEW_LIMIT drawn
         nodes = []
         node = head
-        while node:
+        while node and len(nodes) < LIST_PREVIEW_LIMIT:
             nodes.append(node)
             node = node.next
         n = len(nodes)
+        # A cut-off list has no tail in view
+        self.truncated = node is not None
         # Remove extra boxes
         while len(self.nodes) > n:
             node = self.nodes.pop()
@@ -1463,7 +2518,7 @@ class DoublyLinkedListScene(QGraphicsScene):
         node = head
         i = 0
         prev_box = None
-        while node:
+        while node and i < n:
             if i >= len(self.nodes):
                 box = DoublyLinkedListNodeBox(node.value)
                 box.set_index_label(i)
@@ -1499,6 +2554,7 @@ class DoublyLinkedListScene(QGraphicsScene):
             if n > 0 and self.tail_label:
                 tail_x = start_x + (n-1) * (BOX_WIDTH + node_spacing) + BOX_WIDTH // 2 - 20
                 self.tail_label.setPos(tail_x, y + BOX_HEIGHT + 10)
+                self.tail_label.setVisible(not self.truncated)
             self.update_arrows()
 
     def set_box_color(self, index, color):
@@ -1563,7 +2619,7 @@ class DoublyLinkedListVisualizer(QWidget):
         super().__init__()
         self._stopped = False
         self.animations_enabled = True
-        self.head = None  # Head node of the doubly linked list
+        self.list = DoublyLinkedList()
         self.scene = DoublyLinkedListScene()
         self.view = QGraphicsView(self.scene)
         self.view.setRenderHint(QPainter.Antialiasing)
@@ -1598,6 +2654,9 @@ class DoublyLinkedListVisualizer(QWidget):
         self.btn_create = QPushButton('Create Your Own')
         self.btn_create.clicked.connect(self.create_own_list)
         btn_layout.addWidget(self.btn_create)
+        self.btn_workload = QPushButton('Workload')
+        self.btn_workload.clicked.connect(self.generate_workload)
+        btn_layout.addWidget(self.btn_workload)
         self.btn_add = QPushButton('Add Node')
         self.btn_add.clicked.connect(self.add_node)
         btn_layout.addWidget(self.btn_add)
@@ -1620,6 +2679,15 @@ class DoublyLinkedListVisualizer(QWidget):
         self.step_explanation.setVisible(True)
         self.btn_next_step.setVisible(False)
 
+    @property
+    def head(self):
+        return self.list.head
+
+    def show_list(self, animate=True):
+        self.scene.set_from_head(self.list.head, animate=animate)
+        if len(self.list) > LIST_PREVIEW_LIMIT:
+            self.step_explanation.setText(f'Showing the first {LIST_PREVIEW_LIMIT} of {len(self.list)} nodes.')
+
     def show_feedback(self, text):
         self.feedback.setText(text)
         QTimer.singleShot(1200, lambda: self.feedback.setText(''))
@@ -1664,195 +2732,86 @@ class DoublyLinkedListVisualizer(QWidget):
             node = node.next
         return arr
 
-    def clone_list(self, head):
-        # Returns a new head, and a mapping from old node to new node
-        if not head:
-            return None, {}
-        old_to_new = {}
-        new_head = DLLNode(head.value)
-        old_to_new[head] = new_head
-        prev_new = new_head
-        prev_old = head
-        curr_old = head.next
-        while curr_old:
-            curr_new = DLLNode(curr_old.value)
-            old_to_new[curr_old] = curr_new
-            prev_new.next = curr_new
-            curr_new.prev = prev_new
-            prev_new = curr_new
-            prev_old = curr_old
-            curr_old = curr_old.next
-        return new_head, old_to_new
-
-    def set_head(self, head):
-        self.head = head
-        self.scene.set_from_head(self.head)
+    def set_list(self, values):
+        self.list = DoublyLinkedList(values)
+        self.step_explanation.setText('')
+        self.show_list()
 
     def generate_random_list(self):
         values = [random.randint(0, 99) for _ in range(random.randint(4, 8))]
-        self.head = None
-        prev = None
-        for v in values:
-            node = DLLNode(v)
-            if self.head is None:
-                self.head = node
-            if prev:
-                prev.next = node
-                node.prev = prev
-            prev = node
-        self.scene.set_from_head(self.head)
+        self.set_list(values)
         self.show_feedback('Random doubly linked list generated.')
-        self.step_explanation.setText('')
 
     def create_own_list(self):
         text, ok = QInputDialog.getText(self, 'Create Doubly Linked List', 'Enter numbers separated by commas:')
         if ok:
             try:
                 nums = [int(x.strip()) for x in text.split(',') if x.strip()]
-                self.head = None
-                prev = None
-                for v in nums:
-                    node = DLLNode(v)
-                    if self.head is None:
-                        self.head = node
-                    if prev:
-                        prev.next = node
-                        node.prev = prev
-                    prev = node
-                self.scene.set_from_head(self.head)
+                self.set_list(nums)
                 self.show_feedback('Custom doubly linked list created.')
-                self.step_explanation.setText('')
             except ValueError:
                 QMessageBox.warning(self, 'Invalid Input', 'Please enter only numbers separated by commas.')
 
+    def generate_workload(self):
+        values = ask_workload(self, max_size=MAX_LIST_WORKLOAD)
+        if values is None:
+            return
+        self.set_list(values)
+        self.show_feedback(f'Workload of {len(values)} nodes generated.')
+
     def set_animations_enabled(self, enabled):
         self.animations_enabled = enabled
 
     def add_node(self):
         num, ok = QInputDialog.getInt(self, 'Add Node', 'Enter a number to add:')
         if ok:
-            if not self.animations_enabled:
-                if not self.head:
-                    self.head = DLLNode(num)
-                else:
-                    node = self.head
-                    while node.next:
-                        node = node.next
-                    new_node = DLLNode(num)
-                    node.next = new_node
-                    new_node.prev = node
-                self.scene.set_from_head(self.head, animate=False)
-                self.show_feedback(f'Added {num} to the end.')
-                self.step_explanation.setText('')
-                return
-            # Add to end
-            if not self.head:
-                self.head = DLLNode(num)
-            else:
-                node = self.head
-                while node.next:
-                    node = node.next
-                new_node = DLLNode(num)
-                node.next = new_node
-                new_node.prev = node
-            self.scene.set_from_head(self.head)
-            self.show_feedback(f'Added {num} to the end.')
+            # Add to end: the tail pointer makes this O(1)
+            self.list.append(num)
             self.step_explanation.setText('')
+            self.show_list(animate=self.animations_enabled)
+            self.show_feedback(f'Added {num} to the end.')
 
     def insert_at_index(self):
-        idx, ok = QInputDialog.getInt(self, 'Insert at Index', f'Enter index (0 to {self.length()}):', min=0, max=self.length())
+        n = len(self.list)
+        idx, ok = QInputDialog.getInt(self, 'Insert at Index', f'Enter index (0 to {n}):', min=0, max=n)
         if not ok:
             return
         num, ok = QInputDialog.getInt(self, 'Insert at Index', 'Enter a number to insert:')
         if not ok:
             return
         if not self.animations_enabled:
-            if idx == 0:
-                new_node = DLLNode(num)
-                new_node.next = self.head
-                if self.head:
-                    self.head.prev = new_node
-                self.head = new_node
-            else:
-                curr = self.head
-                for i in range(idx - 1):
-                    if curr is None:
-                        break
-                    curr = curr.next
-                if curr is not None:
-                    new_node = DLLNode(num)
-                    new_node.next = curr.next
-                    new_node.prev = curr
-                    if curr.next:
-                        curr.next.prev = new_node
-                    curr.next = new_node
-            self.scene.set_from_head(self.head, animate=False)
+            self.list.insert(idx, num)
+            self.show_list(animate=False)
             self.show_feedback(f'Inserted {num} at index {idx}.')
             self.step_explanation.setText('')
             self.scene.reset_all_colors()
             return
-        # Create a copy of the list for animation
-        head_copy, old_to_new = self.clone_list(self.head)
+        # Steps show immutable snapshots: the one after the insert copies
+        # only the idx nodes before it and shares the rest
+        before = self.list.snapshot()
+        after = snapshot_edit(before, idx, [num])
         steps = []
         
         # Step 1: Highlight where to insert
         if idx == 0:
-            steps.append((head_copy, [idx], f"Step 1: Highlight position for new head node."))
+            steps.append((before, [idx], f"Step 1: Highlight position for new head node."))
         else:
-            steps.append((head_copy, [idx], f"Step 1: Highlight index {idx} for insertion."))
-        
-        # Step 2: Traverse to the node before insertion point
-        curr = head_copy
-        prev = None
-        for i in range(idx):
-            if curr is None:
-                break
-            prev = curr
-            curr = curr.next
+            steps.append((before, [idx], f"Step 1: Highlight index {idx} for insertion."))
         
-        # Step 3: Create new node and update pointers
-        new_node = DLLNode(num)
-        if prev is None:
-            # Inserting at head
-            new_node.next = head_copy
-            new_head = new_node
-            steps.append((new_head, [0], f"Step 2: Create new node with value {num} and make it the new head."))
+        # Step 2: Create new node and update pointers
+        if idx == 0:
+            steps.append((after, [0], f"Step 2: Create new node with value {num} and make it the new head."))
         else:
-            # Inserting in middle or end
-            new_node.next = curr
-            prev.next = new_node
-            new_head = head_copy
-            steps.append((new_head, [idx], f"Step 2: Create new node with value {num} and update pointers."))
+            steps.append((after, [idx], f"Step 2: Create new node with value {num} and update pointers."))
         
-        steps.append((new_head, [], f"Step 3: Done. List after insertion."))
+        steps.append((after, [], f"Step 3: Done. List after insertion (this step's snapshot copied {idx} nodes and shares {n - idx})."))
         
         def finalize():
             if sip.isdeleted(self):
                 return
             # Actually insert in real list
-            if idx == 0:
-                # Insert at head
-                new_node = DLLNode(num)
-                new_node.next = self.head
-                if self.head:
-                    self.head.prev = new_node
-                self.head = new_node
-            else:
-                # Insert in middle or end
-                curr = self.head
-                for i in range(idx - 1):
-                    if curr is None:
-                        break
-                    curr = curr.next
-                if curr is not None:
-                    new_node = DLLNode(num)
-                    new_node.next = curr.next
-                    new_node.prev = curr
-                    if curr.next:
-                        curr.next.prev = new_node
-                    curr.next = new_node
-            
-            self.scene.set_from_head(self.head)
+            self.list.insert(idx, num)
+            self.show_list()
             self.show_feedback(f'Inserted {num} at index {idx}.')
             # Reset all colors
             self.scene.reset_all_colors()
@@ -1863,60 +2822,35 @@ class DoublyLinkedListVisualizer(QWidget):
         if not self.head:
             QMessageBox.warning(self, 'Empty List', 'List is already empty!')
             return
-        idx, ok = QInputDialog.getInt(self, 'Remove Node', f'Enter index to remove (0 to {self.length()-1}):', min=0, max=max(0, self.length()-1))
+        n = len(self.list)
+        idx, ok = QInputDialog.getInt(self, 'Remove Node', f'Enter index to remove (0 to {n-1}):', min=0, max=max(0, n-1))
         if not ok:
             return
         if not self.animations_enabled:
-            curr = self.head
-            prev = None
-            for i in range(idx):
-                prev = curr
-                curr = curr.next if curr else None
-            if curr is None:
-                return
-            if prev is None:
-                self.head = curr.next
-                if self.head:
-                    self.head.prev = None
-            else:
-                prev.next = curr.next
-                if curr.next:
-                    curr.next.prev = prev
-            self.scene.set_from_head(self.head, animate=False)
+            self.list.pop(idx)
+            self.show_list(animate=False)
             self.show_feedback(f'Node at index {idx} removed.')
             self.step_explanation.setText('')
             self.scene.reset_all_colors()
             return
+        # Immutable snapshots; the list itself changes in finalize
+        before = self.list.snapshot()
+        after = snapshot_edit(before, idx, skip=1)
         steps = []
-        steps.append((self.head, [idx], f"Step 1: Highlight index {idx} to remove."))
-        curr = self.head
-        prev = None
-        for i in range(idx):
-            if curr is None:
-                break
-            prev = curr
-            curr = curr.next if curr else None
-        if curr is None:
-            return
-        if prev is None:
-            # Remove head
-            self.head = curr.next
-            if self.head:
-                self.head.prev = None
-        else:
-            prev.next = curr.next
-            if curr.next:
-                curr.next.prev = prev
-        steps.append((self.head, [], f"Step 2: Node at index {idx} removed."))
-        steps.append((self.head, [], f"Step 3: Done. List after removal."))
+        steps.append((before, [idx], f"Step 1: Highlight index {idx} to remove."))
+        steps.append((after, [], f"Step 2: Node at index {idx} removed."))
+        steps.append((after, [], f"Step 3: Done. List after removal (this step's snapshot copied {idx} nodes and shares {n - idx - 1})."))
         def finalize():
-            self.scene.set_from_head(self.head)
+            if sip.isdeleted(self):
+                return
+            self.list.pop(idx)
+            self.show_list()
             self.show_feedback(f'Node at index {idx} removed.')
             self.scene.reset_all_colors()
         self.play_steps(steps, finalize)
 
     def swap_nodes(self):
-        n = self.length()
+        n = len(self.list)
         if n < 2:
             QMessageBox.warning(self, 'Too Small', 'Need at least 2 nodes to swap.')
             return
@@ -1929,39 +2863,30 @@ class DoublyLinkedListVisualizer(QWidget):
         if idx1 > idx2:
             idx1, idx2 = idx2, idx1
         if not self.animations_enabled:
-            node1 = self.head
-            for _ in range(idx1):
-                node1 = node1.next
-            node2 = self.head
-            for _ in range(idx2):
-                node2 = node2.next
-            node1.value, node2.value = node2.value, node1.value
-            self.scene.set_from_head(self.head, animate=False)
+            self.list.swap(idx1, idx2)
+            self.show_list(animate=False)
             self.show_feedback(f'Swapped nodes {idx1} and {idx2}.')
             self.step_explanation.setText('')
             self.scene.reset_all_colors()
             return
+        before = self.list.snapshot()
+        after = snapshot_swap(before, idx1, idx2)
         steps = []
-        steps.append((self.head, [idx1, idx2], f"Step 1: Highlight nodes {idx1} and {idx2} to swap."))
-        # Find nodes
-        node1 = self.head
-        for _ in range(idx1):
-            node1 = node1.next
-        node2 = self.head
-        for _ in range(idx2):
-            node2 = node2.next
-        # Swap values (not nodes)
-        node1.value, node2.value = node2.value, node1.value
-        steps.append((self.head, [idx1, idx2], f"Step 2: Swap values at indices {idx1} and {idx2}."))
-        steps.append((self.head, [], f"Step 3: Done. List after swap."))
+        steps.append((before, [idx1, idx2], f"Step 1: Highlight nodes {idx1} and {idx2} to swap."))
+        steps.append((after, [idx1, idx2], f"Step 2: Swap values at indices {idx1} and {idx2}."))
+        steps.append((after, [], f"Step 3: Done. List after swap."))
         def finalize():
-            self.scene.set_from_head(self.head)
+            if sip.isdeleted(self):
+                return
+            # Swap values (not nodes)
+            self.list.swap(idx1, idx2)
+            self.show_list()
             self.show_feedback(f'Swapped nodes {idx1} and {idx2}.')
             self.scene.reset_all_colors()
         self.play_steps(steps, finalize)
 
     def replace_node_value(self):
-        n = self.length()
+        n = len(self.list)
         if n == 0:
             QMessageBox.warning(self, 'Empty List', 'List is empty!')
             return
@@ -1971,28 +2896,24 @@ class DoublyLinkedListVisualizer(QWidget):
         value, ok = QInputDialog.getInt(self, 'Replace Node Value', 'New value:')
         if not ok:
             return
+        before = self.list.snapshot()
+        after = snapshot_edit(before, idx, [value], 1)
+        old_value = self.list.node_at(idx).value
         steps = []
-        steps.append((self.head, [idx], f"Step 1: Highlight node {idx} to replace value."))
-        node = self.head
-        for _ in range(idx):
-            node = node.next
-        old_value = node.value
-        node.value = value
-        steps.append((self.head, [idx], f"Step 2: Replace value {old_value} with {value} at index {idx}."))
-        steps.append((self.head, [], f"Step 3: Done. List after replacement."))
+        steps.append((before, [idx], f"Step 1: Highlight node {idx} to replace value."))
+        steps.append((after, [idx], f"Step 2: Replace value {old_value} with {value} at index {idx}."))
+        steps.append((after, [], f"Step 3: Done. List after replacement."))
         def finalize():
-            self.scene.set_from_head(self.head)
+            if sip.isdeleted(self):
+                return
+            self.list.replace(idx, value)
+            self.show_list()
             self.show_feedback(f'Replaced value at index {idx} with {value}.')
             self.scene.reset_all_colors()
         self.play_steps(steps, finalize)
 
     def length(self):
-        count = 0
-        node = self.head
-        while node:
-            count += 1
-            node = node.next
-        return count
+        return len(self.list)
 
     def next_step(self):
         if self.current_step < len(self.steps):
@@ -2020,6 +2941,338 @@ class DoublyLinkedListVisualizer(QWidget):
                 anim.stop()
             self.scene.animations.clear()
 
+SKIP_LANE_HEIGHT = 46
+SKIP_PATH_COLOR = QColor(255, 215, 0)
+SKIP_PROBE_COLOR = QColor(255, 140, 120)
+
+def skip_layout(skip):
+    """Immutable drawing of a skip list for animation steps: (lanes, ((value, height), ...) of the drawn nodes, size)"""
+    columns = []
+    for node in skip.nodes():
+        if len(columns) == LIST_PREVIEW_LIMIT:
+            break
+        columns.append((node.value, len(node.next)))
+    return skip.level, tuple(columns), len(skip)
+
+class SkipListBox(BaseBox):
+    def __init__(self, value, index=None, color=QColor(200,240,255)):
+        super().__init__(value, color)
+        self.rect = QRectF(0, 0, BOX_WIDTH, SKIP_LANE_HEIGHT - 12)
+        self.index_label = index
+
+    def paint(self, painter, option, widget=None):
+        if painter is None:
+            return
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setBrush(QBrush(self.color))
+        painter.setPen(QPen(Qt.black, 2))
+        painter.drawRoundedRect(self.rect, 8, 8)
+        painter.setFont(QFont('Arial', 14, QFont.Bold))
+        painter.drawText(self.rect, Qt.AlignCenter, self.text)
+        if self.index_label is not None:
+            painter.setFont(QFont('Arial', 10))
+            painter.setPen(QPen(Qt.darkGray))
+            painter.drawText(0, int(self.rect.height()), BOX_WIDTH, 20, Qt.AlignCenter, f'[{self.index_label}]')
+
+class SkipListScene(QGraphicsScene):
+    """Skip list drawn as towers of LinkedListScene boxes, one lane of next arrows per level"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSceneRect(0, 0, 900, 250)
+        # (column, lane) -> box; column -1 is the head tower
+        self.boxes = {}
+
+    def set_layout(self, layout, path=(), probe=()):
+        lanes, columns, size = layout
+        self.clear()
+        self.boxes = {}
+        step = BOX_WIDTH + BOX_SPACING
+        width = max(900, (len(columns) + 2) * step + 40)
+        height = max(250, lanes * SKIP_LANE_HEIGHT + 110)
+        self.setSceneRect(0, 0, width, height)
+        x0, bottom = 20, height - 60
+        for column in range(-1, len(columns)):
+            value, tower = ('', lanes) if column < 0 else columns[column]
+            x = x0 + (column + 1) * step
+            for lane in range(tower):
+                box = SkipListBox(value, column if lane == 0 and column >= 0 else None,
+                                  QColor(230, 230, 240) if column < 0 else QColor(200, 240, 255))
+                box.set_pos(QPointF(x, bottom - SKIP_LANE_HEIGHT * (lane + 1)))
+                self.addItem(box)
+                self.boxes[column, lane] = box
+        label = QGraphicsSimpleTextItem('head')
+        label.setFont(QFont('Arial', 14, QFont.Bold))
+        label.setBrush(QBrush(ARROW_COLOR))
+        label.setPos(x0 + 8, bottom - SKIP_LANE_HEIGHT * (lanes + 1) + 8)
+        self.addItem(label)
+        for cells, color in ((path, SKIP_PATH_COLOR), (probe, SKIP_PROBE_COLOR)):
+            for cell in cells:
+                if cell in self.boxes:
+                    self.boxes[cell].set_box_color(color)
+        self.draw_lanes(lanes, columns, size > len(columns), x0 + (len(columns) + 1) * step)
+
+    def draw_lanes(self, lanes, columns, truncated, end_x):
+        # Each box points at the next tower tall enough to reach its lane
+        pen = QPen(ARROW_COLOR, 3, Qt.SolidLine, Qt.RoundCap)
+        for lane in range(lanes):
+            source = self.boxes[-1, lane]
+            for column in range(len(columns)):
+                if columns[column][1] > lane:
+                    self.draw_arrow(source, self.boxes[column, lane].pos.x(), pen)
+                    source = self.boxes[column, lane]
+            if truncated:
+                # Links into the nodes that are not drawn
+                self.draw_arrow(source, end_x, QPen(ARROW_COLOR, 3, Qt.DashLine))
+
+    def draw_arrow(self, source, x2, pen):
+        x1 = source.pos.x() + BOX_WIDTH
+        y = source.pos.y() + source.rect.height() / 2
+        line = self.addLine(x1, y, x2, y, pen)
+        line.setZValue(0)
+        size = 12
+        head = QPolygonF([QPointF(x2, y), QPointF(x2 - size * 0.7, y - size * 0.5), QPointF(x2 - size * 0.7, y + size * 0.5)])
+        self.addPolygon(head, QPen(ARROW_COLOR), QBrush(ARROW_COLOR)).setZValue(1)
+
+class SkipListVisualizer(QWidget):
+    def __init__(self):
+        super().__init__()
+        self._stopped = False
+        self.animations_enabled = True
+        self.skip = SkipList(seed=42)
+        self.scene = SkipListScene()
+        self.view = QGraphicsView(self.scene)
+        self.view.setRenderHint(QPainter.Antialiasing)
+        self.view.setStyleSheet('background: #f8f8ff; border: none;')
+        self.view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.feedback = QLabel('')
+        self.feedback.setStyleSheet('font-size: 16px; color: #333; margin: 8px;')
+        self.steps = []
+        self.current_step = 0
+        self.step_explanation = QLabel('')
+        self.step_explanation.setWordWrap(True)
+        self.step_explanation.setStyleSheet('font-size: 20px; color: #222; background: #e0e7ef; border-radius: 8px; padding: 12px; margin: 12px; font-family: Arial, Helvetica, sans-serif;')
+        self.init_ui()
+        self.show_list()
+
+    def init_ui(self):
+        main_layout = QVBoxLayout()
+        title = QLabel('Skip List Visualizer')
+        title.setStyleSheet('font-size: 22px; font-weight: bold; margin: 8px;')
+        main_layout.addWidget(title)
+        main_layout.addWidget(self.view)
+        main_layout.addWidget(self.feedback)
+        main_layout.addWidget(self.step_explanation)
+        main_layout.addStretch(1)
+        btn_layout = QHBoxLayout()
+        self.btn_random = QPushButton('Random List')
+        self.btn_random.clicked.connect(self.generate_random_list)
+        btn_layout.addWidget(self.btn_random)
+        self.btn_create = QPushButton('Create Your Own')
+        self.btn_create.clicked.connect(self.create_own_list)
+        btn_layout.addWidget(self.btn_create)
+        self.btn_workload = QPushButton('Workload')
+        self.btn_workload.clicked.connect(self.generate_workload)
+        btn_layout.addWidget(self.btn_workload)
+        self.btn_search = QPushButton('Search')
+        self.btn_search.clicked.connect(self.search_value)
+        btn_layout.addWidget(self.btn_search)
+        self.btn_insert = QPushButton('Insert')
+        self.btn_insert.clicked.connect(self.insert_value)
+        btn_layout.addWidget(self.btn_insert)
+        self.btn_remove = QPushButton('Remove')
+        self.btn_remove.clicked.connect(self.remove_value)
+        btn_layout.addWidget(self.btn_remove)
+        self.btn_settings = QPushButton('Promotion')
+        self.btn_settings.clicked.connect(self.set_promotion)
+        btn_layout.addWidget(self.btn_settings)
+        self.btn_benchmark = QPushButton('Benchmark')
+        self.btn_benchmark.clicked.connect(self.benchmark)
+        btn_layout.addWidget(self.btn_benchmark)
+        main_layout.addLayout(btn_layout)
+        self.setLayout(main_layout)
+        self.setMinimumHeight(350)
+        self.setMinimumWidth(900)
+
+    def show_list(self):
+        self.scene.set_layout(skip_layout(self.skip))
+        if len(self.skip) > LIST_PREVIEW_LIMIT:
+            self.step_explanation.setText(f'Showing the first {LIST_PREVIEW_LIMIT} of {len(self.skip)} nodes ({self.skip.level} lanes).')
+
+    def show_feedback(self, text):
+        self.feedback.setText(text)
+        QTimer.singleShot(1200, lambda: self.feedback.setText(''))
+
+    def set_animations_enabled(self, enabled):
+        self.animations_enabled = enabled
+
+    def stop_animations(self):
+        self._stopped = True
+
+    def play_steps(self, steps, finalize_callback=None):
+        self._stopped = False
+        self.steps = steps
+        self.current_step = 0
+        self._play_next_step(finalize_callback)
+
+    def _play_next_step(self, finalize_callback=None):
+        if self._stopped or sip.isdeleted(self):
+            return
+        if self.current_step >= len(self.steps):
+            if finalize_callback:
+                finalize_callback()
+            return
+        layout, path, probe, explanation = self.steps[self.current_step]
+        self.scene.set_layout(layout, path, probe)
+        self.step_explanation.setText(explanation)
+        self.current_step += 1
+        QTimer.singleShot(3500, lambda: (not self._stopped and not sip.isdeleted(self) and self._play_next_step(finalize_callback), None)[-1])
+
+    def set_list(self, values, p=None, seed=None):
+        p = self.skip.p if p is None else p
+        seed = self.skip.seed if seed is None else seed
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            self.skip = SkipList(values, p, seed)
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.step_explanation.setText('')
+        self.show_list()
+
+    def generate_random_list(self):
+        self.set_list([random.randint(0, 99) for _ in range(random.randint(6, 12))])
+        self.show_feedback('Random skip list generated.')
+
+    def create_own_list(self):
+        text, ok = QInputDialog.getText(self, 'Create Skip List', 'Enter numbers separated by commas:')
+        if ok:
+            try:
+                nums = [int(x.strip()) for x in text.split(',') if x.strip()]
+                self.set_list(nums)
+                self.show_feedback('Custom skip list created.')
+            except ValueError:
+                QMessageBox.warning(self, 'Invalid Input', 'Please enter only numbers separated by commas.')
+
+    def generate_workload(self):
+        values = ask_workload(self, max_size=MAX_LIST_WORKLOAD)
+        if values is None:
+            return
+        self.set_list(values)
+        self.show_feedback(f'Workload of {len(values)} nodes generated.')
+
+    def set_promotion(self):
+        p, ok = QInputDialog.getDouble(self, 'Promotion', 'Probability a node reaches the next lane up:', self.skip.p, 0.05, 0.95, 2)
+        if not ok:
+            return
+        seed, ok = QInputDialog.getInt(self, 'Promotion', 'Seed for the coin flips:', self.skip.seed or 0, 0, 2**31 - 1)
+        if not ok:
+            return
+        self.set_list(list(self.skip), p, seed)
+        self.show_feedback(f'Rebuilt with p = {p:g} and seed {seed}.')
+
+    def benchmark(self):
+        n, ok = QInputDialog.getInt(self, 'Benchmark', f'Values in each structure (1000 to {MAX_LIST_WORKLOAD}):', MAX_LIST_WORKLOAD, 1000, MAX_LIST_WORKLOAD)
+        if not ok:
+            return
+        queries, ok = QInputDialog.getInt(self, 'Benchmark', 'Random searches and inserts on each (the linked list walks n/2 per query):', 200, 10, 1000)
+        if not ok:
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            rows = benchmark_ordered_structures(n, queries, self.skip.p, self.skip.seed or 0)
+        finally:
+            QApplication.restoreOverrideCursor()
+        lines = [f'{n:,} random values, {queries} searches and {queries} inserts on each:']
+        for name, build, search_cmp, search_us, insert_cmp, insert_us in rows:
+            lines.append(f'{name}: built in {build:.0f} ms; search {search_cmp:.1f} comparisons, {search_us:.1f} µs; '
+                         f'insert {insert_cmp:.1f} comparisons, {insert_us:.1f} µs')
+        self.step_explanation.setText('\n'.join(lines))
+        self.show_feedback('Benchmark complete.')
+
+    def drawn_columns(self):
+        # Column of every drawn node, taken before an edit moves them; None when not animating
+        if not self.animations_enabled or len(self.skip) > LIST_PREVIEW_LIMIT:
+            return None
+        return {id(node): i for i, node in enumerate(self.skip.nodes())}
+
+    def search_steps(self, layout, columns, path, value, verb):
+        # One step per lane: the nodes passed and the one that sent the search down
+        steps, passed, done, current = [], [], 0, -1
+        for lane in range(layout[0] - 1, -1, -1):
+            moves = [(columns.get(id(node)), moved) for l, node, moved in path if l == lane]
+            passed.append((current, lane))
+            passed += [(c, lane) for c, moved in moves if moved and c is not None]
+            current = passed[-1][0]
+            probe = [(c, lane) for c, moved in moves if not moved and c is not None]
+            done += len(moves)
+            if not moves:
+                text = f'Lane {lane}: nothing follows here, ' + ('drop down.' if lane else f'so {value} {verb} at the end.')
+            elif moves[-1][1]:
+                text = f'Lane {lane}: passed {len(moves)} smaller node(s) to the end of the lane, ' + ('drop down.' if lane else f'so {value} {verb} at the end.')
+            else:
+                stop = path[done - 1][1].value
+                text = f'Lane {lane}: passed {len(moves) - 1} smaller node(s); {stop} is not smaller than {value}, drop down.' if lane else \
+                       f'Lane 0: passed {len(moves) - 1} smaller node(s) and stopped at {stop}; this is where {value} {verb}.'
+            steps.append((layout, list(passed), probe, f'{text} ({done} comparisons so far)'))
+        return steps
+
+    def search_value(self):
+        value, ok = QInputDialog.getInt(self, 'Search', 'Value to find:')
+        if not ok:
+            return
+        path, columns, layout = [], self.drawn_columns(), skip_layout(self.skip)
+        t0 = time.perf_counter()
+        found, comparisons = self.skip.search(value, path)
+        elapsed = time.perf_counter() - t0
+        text = (f'{value} {"found" if found else "not found"} with {comparisons} comparisons (expected about '
+                f'{self.skip.expected_comparisons():.1f} for n = {len(self.skip):,}, p = {self.skip.p:g}; a sorted linked list averages n/2), '
+                f'{1e6 * elapsed:.1f} µs.')
+        self.finish(path, columns, layout, value, 'would be' if not found else 'is', text, 'Search complete.')
+
+    def insert_value(self):
+        value, ok = QInputDialog.getInt(self, 'Insert', 'Value to insert:')
+        if not ok:
+            return
+        path, columns, layout = [], self.drawn_columns(), skip_layout(self.skip)
+        node, comparisons = self.skip.insert(value, path)
+        height = len(node.next)
+        text = (f'Inserted {value}: {comparisons} comparisons to find its place, then {height - 1} coin flip(s) came up heads, '
+                f'so it reaches {height} lane(s) and {height} pointer(s) were relinked.')
+        self.finish(path, columns, layout, value, 'goes', text, f'Inserted {value}.', node)
+
+    def remove_value(self):
+        if not len(self.skip):
+            QMessageBox.warning(self, 'Empty List', 'Skip list is empty!')
+            return
+        value, ok = QInputDialog.getInt(self, 'Remove', 'Value to remove:')
+        if not ok:
+            return
+        path, columns, layout = [], self.drawn_columns(), skip_layout(self.skip)
+        removed, comparisons = self.skip.remove(value, path)
+        if not removed:
+            QMessageBox.warning(self, 'Not Found', f'{value} is not in the skip list ({comparisons} comparisons).')
+            return
+        text = f'Removed {value} after {comparisons} comparisons, relinking the node before it in every lane it reached.'
+        self.finish(path, columns, layout, value, 'was', text, f'Removed {value}.')
+
+    def finish(self, path, columns, layout, value, verb, text, feedback, node=None):
+        # Plays the search path lane by lane on the list as it was, then shows the result
+        steps = []
+        if columns is not None:
+            steps = self.search_steps(layout, columns, path, value, verb)
+            if node is not None:
+                column = next(i for i, n in enumerate(self.skip.nodes()) if n is node)
+                steps.append((skip_layout(self.skip), [], [(column, lane) for lane in range(len(node.next))], text))
+        def finalize():
+            if sip.isdeleted(self):
+                return
+            self.show_list()
+            self.step_explanation.setText(text)
+            self.show_feedback(feedback)
+        if steps:
+            self.play_steps(steps, finalize)
+        else:
+            finalize()
+
 class StackBox(BaseBox):
     def __init__(self, value, index, color=QColor(240,240,240)):
         super().__init__(value, color)
@@ -2173,6 +3426,9 @@ class StackVisualizer(QWidget):
         self.btn_create = QPushButton('Create Your Own')
         self.btn_create.clicked.connect(self.create_own_stack)
         btn_layout.addWidget(self.btn_create)
+        self.btn_workload = QPushButton('Workload')
+        self.btn_workload.clicked.connect(self.generate_workload)
+        btn_layout.addWidget(self.btn_workload)
         self.btn_push = QPushButton('Push')
         self.btn_push.clicked.connect(self.push_value)
         btn_layout.addWidget(self.btn_push)
@@ -2243,6 +3499,15 @@ class StackVisualizer(QWidget):
             except ValueError:
                 QMessageBox.warning(self, 'Invalid Input', 'Please enter only numbers separated by commas.')
 
+    def generate_workload(self):
+        values = ask_workload(self)
+        if values is None:
+            return
+        self.stack = values
+        self.scene.set_values(self.stack)
+        self.show_feedback(f'Workload of {len(values)} values generated.')
+        self.step_explanation.setText('')
+
     def set_animations_enabled(self, enabled):
         self.animations_enabled = enabled
 
@@ -2491,6 +3756,9 @@ class QueueVisualizer(QWidget):
         self.btn_create = QPushButton('Create Your Own')
         self.btn_create.clicked.connect(self.create_own_queue)
         btn_layout.addWidget(self.btn_create)
+        self.btn_workload = QPushButton('Workload')
+        self.btn_workload.clicked.connect(self.generate_workload)
+        btn_layout.addWidget(self.btn_workload)
         self.btn_enqueue = QPushButton('Enqueue')
         self.btn_enqueue.clicked.connect(self.enqueue_value)
         btn_layout.addWidget(self.btn_enqueue)
@@ -2563,6 +3831,15 @@ class QueueVisualizer(QWidget):
             except ValueError:
                 QMessageBox.warning(self, 'Invalid Input', 'Please enter only numbers separated by commas.')
 
+    def generate_workload(self):
+        values = ask_workload(self)
+        if values is None:
+            return
+        self.queue = values
+        self.scene.set_values(self.queue)
+        self.show_feedback(f'Workload of {len(values)} values generated.')
+        self.step_explanation.setText('')
+
     def set_animations_enabled(self, enabled):
         self.animations_enabled = enabled
 
@@ -2774,6 +4051,10 @@ class VisualizerArea(QWidget):
             self.current_widget = LinkedListVisualizer()
         elif structure_name == 'Doubly Linked List':
             self.current_widget = DoublyLinkedListVisualizer()
+        elif structure_name == 'Skip List':
+            self.current_widget = SkipListVisualizer()
+        elif structure_name == 'Unrolled Linked List':
+            self.current_widget = UnrolledListVisualizer()
         elif structure_name == 'Stack':
             self.current_widget = StackVisualizer()
         elif structure_name == 'Queue':
@@ -2804,6 +4085,8 @@ class MainMenu(QWidget):
             ("Array Visualizer", 'Array'),
             ("Singly Linked List Visualizer", 'Singly Linked List'),
             ("Doubly Linked List Visualizer", 'Doubly Linked List'),
+            ("Skip List Visualizer", 'Skip List'),
+            ("Unrolled Linked List Visualizer", 'Unrolled Linked List'),
             ("Stack Visualizer (Bookshelf)", 'Stack'),
             ("Queue Visualizer", 'Queue'),
             ("Sorting Visualizer", 'Sorting'),
@@ -2877,6 +4160,8 @@ class ModernMainWindow(QMainWindow):
             'Array': ArrayVisualizer,
             'Singly Linked List': LinkedListVisualizer,
             'Doubly Linked List': DoublyLinkedListVisualizer,
+            'Skip List': SkipListVisualizer,
+            'Unrolled Linked List': UnrolledListVisualizer,
             'Stack': StackVisualizer,
             'Queue': QueueVisualizer,
             'Sorting': SortingVisualizer
@@ -2935,6 +4220,3584 @@ class ModernMainWindow(QMainWindow):
         self.stacked.addWidget(card)
         self.stacked.setCurrentWidget(card)
 
+# --- Parallel sorting (process pool over shared memory) ---
+class SharedArray:
+    """1-D NumPy array in named shared memory that pool workers can attach to"""
+    def __init__(self, n, dtype, name=None):
+        self.n = int(n)
+        self.dtype = np.dtype(dtype)
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(1, self.n * self.dtype.itemsize))
+        else:
+            self.shm = self._attach_untracked(name)
+        self.name = self.shm.name
+        self.array = np.ndarray((self.n,), dtype=self.dtype, buffer=self.shm.buf)
+
+    @staticmethod
+    def _attach_untracked(name):
+        # Before 3.13 attaching also registers the segment with the resource
+        # tracker, which then warns about and unlinks memory the creator still owns
+        if sys.version_info >= (3, 13):
+            return shared_memory.SharedMemory(name=name, track=False)
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+    @classmethod
+    def from_array(cls, arr):
+        shared = cls(len(arr), arr.dtype)
+        shared.array[:] = arr
+        return shared
+
+    @classmethod
+    def attach(cls, spec):
+        name, n, dtype = spec
+        return cls(n, dtype, name=name)
+
+    def spec(self):
+        # Picklable handle passed to workers instead of the data itself
+        return (self.name, self.n, self.dtype.str)
+
+    def close(self):
+        # Views must be dropped before the mapping can be closed
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+def _noop_task(_):
+    return os.getpid()
+
+def _sort_segment_task(spec, lo, hi, phase='sort'):
+    t0 = time.perf_counter()
+    shared = SharedArray.attach(spec)
+    shared.array[lo:hi].sort()
+    shared.close()
+    return (os.getpid(), phase, lo, hi, t0, time.perf_counter())
+
+def _merge_scatter_task(src_spec, dst_spec, out_lo, run_lo, lo, hi, other_lo, other_hi, right_side):
+    # Writes src[lo:hi] (part of the run starting at run_lo) to its final place in
+    # the merged output: own offset plus its rank in the other run. Ties go to the
+    # left run first, so the merge is stable and slices never collide.
+    t0 = time.perf_counter()
+    src = SharedArray.attach(src_spec)
+    dst = SharedArray.attach(dst_spec)
+    part = src.array[lo:hi]
+    other = src.array[other_lo:other_hi]
+    rank = np.searchsorted(other, part, side='right' if right_side else 'left')
+    dst.array[out_lo + (lo - run_lo) + np.arange(hi - lo) + rank] = part
+    del part, other
+    src.close()
+    dst.close()
+    return (os.getpid(), 'merge', lo, hi, t0, time.perf_counter())
+
+def _bucket_count_task(spec, lo, hi, splitters):
+    t0 = time.perf_counter()
+    shared = SharedArray.attach(spec)
+    buckets = np.searchsorted(splitters, shared.array[lo:hi], side='right')
+    counts = np.bincount(buckets, minlength=len(splitters) + 1)
+    shared.close()
+    return counts, (os.getpid(), 'count', lo, hi, t0, time.perf_counter())
+
+def _bucket_scatter_task(src_spec, dst_spec, lo, hi, splitters, offsets):
+    # Moves one input block into its reserved slot of every bucket
+    t0 = time.perf_counter()
+    src = SharedArray.attach(src_spec)
+    dst = SharedArray.attach(dst_spec)
+    block = src.array[lo:hi]
+    buckets = np.searchsorted(splitters, block, side='right')
+    order = np.argsort(buckets, kind='stable')
+    grouped = block[order]
+    counts = np.bincount(buckets, minlength=len(splitters) + 1)
+    start = 0
+    for b, count in enumerate(counts):
+        if count:
+            dst.array[offsets[b]:offsets[b] + count] = grouped[start:start + count]
+            start += count
+    del block
+    src.close()
+    dst.close()
+    return (os.getpid(), 'scatter', lo, hi, t0, time.perf_counter())
+
+def _even_bounds(lo, hi, parts):
+    # parts+1 boundaries splitting [lo, hi) into nearly equal slices
+    return [lo + (hi - lo) * k // parts for k in range(parts + 1)]
+
+def parallel_merge_sort(arr, pool, workers):
+    """Sorts arr with p sorted runs plus log2(p) parallel merge passes.
+
+    Returns the sorted array and the task timeline (pid, phase, lo, hi, t0, t1).
+    """
+    n = len(arr)
+    src = SharedArray.from_array(arr)
+    dst = SharedArray(n, arr.dtype)
+    timeline = []
+    try:
+        bounds = _even_bounds(0, n, workers)
+        runs = [(bounds[k], bounds[k + 1]) for k in range(workers) if bounds[k] < bounds[k + 1]]
+        futures = [pool.submit(_sort_segment_task, src.spec(), lo, hi) for lo, hi in runs]
+        timeline += [f.result() for f in futures]
+        while len(runs) > 1:
+            futures = []
+            merged = []
+            for k in range(0, len(runs), 2):
+                if k + 1 == len(runs):
+                    # Odd run out is carried into the next pass unchanged
+                    lo, hi = runs[k]
+                    dst.array[lo:hi] = src.array[lo:hi]
+                    merged.append(runs[k])
+                    continue
+                (a_lo, a_hi), (b_lo, b_hi) = runs[k], runs[k + 1]
+                # Split both runs so every worker gets a share of this merge
+                share = max(1, workers * (b_hi - a_lo) // n)
+                for run_lo, run_hi, other_lo, other_hi, right_side in ((a_lo, a_hi, b_lo, b_hi, False), (b_lo, b_hi, a_lo, a_hi, True)):
+                    cuts = _even_bounds(run_lo, run_hi, share)
+                    for lo, hi in zip(cuts, cuts[1:]):
+                        if lo < hi:
+                            futures.append(pool.submit(_merge_scatter_task, src.spec(), dst.spec(), a_lo, run_lo, lo, hi, other_lo, other_hi, right_side))
+                merged.append((a_lo, b_hi))
+            timeline += [f.result() for f in futures]
+            runs = merged
+            src, dst = dst, src
+        result = src.array.copy()
+    finally:
+        src.close()
+        dst.close()
+    return result, timeline
+
+def parallel_sample_sort(arr, pool, workers, oversample=32):
+    """Sorts arr by splitting it into p value ranges chosen from a random sample.
+
+    Returns the sorted array and the task timeline (pid, phase, lo, hi, t0, t1).
+    """
+    n = len(arr)
+    rng = np.random.default_rng(0)
+    sample = np.sort(arr[rng.integers(0, n, workers * oversample)]) if n else arr[:0]
+    splitters = sample[oversample::oversample][:workers - 1]
+    src = SharedArray.from_array(arr)
+    dst = SharedArray(n, arr.dtype)
+    timeline = []
+    try:
+        bounds = _even_bounds(0, n, workers)
+        blocks = [(bounds[k], bounds[k + 1]) for k in range(workers)]
+        futures = [pool.submit(_bucket_count_task, src.spec(), lo, hi, splitters) for lo, hi in blocks]
+        counts = []
+        for f in futures:
+            block_counts, event = f.result()
+            counts.append(block_counts)
+            timeline.append(event)
+        counts = np.array(counts)
+        # Bucket b starts after all smaller buckets; block k writes after blocks < k
+        bucket_start = np.concatenate([[0], np.cumsum(counts.sum(axis=0))[:-1]])
+        offsets = bucket_start + np.cumsum(counts, axis=0) - counts
+        futures = [pool.submit(_bucket_scatter_task, src.spec(), dst.spec(), lo, hi, splitters, offsets[k]) for k, (lo, hi) in enumerate(blocks)]
+        timeline += [f.result() for f in futures]
+        bucket_end = bucket_start + counts.sum(axis=0)
+        futures = [pool.submit(_sort_segment_task, dst.spec(), int(lo), int(hi)) for lo, hi in zip(bucket_start, bucket_end) if lo < hi]
+        timeline += [f.result() for f in futures]
+        result = dst.array.copy()
+    finally:
+        src.close()
+        dst.close()
+    return result, timeline
+
+PARALLEL_SORTS = {
+    'Parallel Merge Sort': parallel_merge_sort,
+    'Sample Sort': parallel_sample_sort,
+}
+
+def benchmark_parallel_sort(arr, algorithm, max_workers):
+    """Times algorithm for 1..max_workers against a sequential np.sort.
+
+    Pool start-up and the copy into shared memory are not timed. Returns
+    (sorted array, timeline of the max_workers run, rows of (workers, seconds, speedup)).
+    """
+    arr = np.asarray(arr)
+    t0 = time.perf_counter()
+    expected = np.sort(arr)
+    sequential = time.perf_counter() - t0
+    sort = PARALLEL_SORTS[algorithm]
+    rows = [(0, sequential, 1.0)]
+    result, timeline = expected, []
+    for workers in range(1, max_workers + 1):
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_noop_task, range(workers)))
+            t0 = time.perf_counter()
+            result, timeline = sort(arr, pool, workers)
+            elapsed = time.perf_counter() - t0
+        if not np.array_equal(result, expected):
+            raise RuntimeError(f'{algorithm} with {workers} workers produced an unsorted result')
+        rows.append((workers, elapsed, sequential / elapsed if elapsed else float('inf')))
+    return result, timeline, rows
+
+WORKER_COLORS = [
+    QColor(255, 60, 80), QColor(80, 180, 255), QColor(120, 220, 120), QColor(255, 200, 60),
+    QColor(190, 120, 255), QColor(255, 140, 60), QColor(60, 210, 200), QColor(240, 120, 200),
+]
+
+class WorkerLaneScene(QGraphicsScene):
+    """Array segments and per-worker timelines of a parallel sort"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSceneRect(0, 0, 860, 400)
+        self.animations = []
+
+    def show_timeline(self, timeline, n, title):
+        self.clear()
+        width = 760
+        left = 80
+        header = self.addSimpleText(title, QFont('Arial', 14, QFont.Bold))
+        header.setPos(left, 4)
+        if not timeline:
+            return
+        lanes = {}
+        for pid, *_ in timeline:
+            lanes.setdefault(pid, len(lanes))
+        # Array bar: the segment each worker sorted
+        self.addSimpleText('array', QFont('Arial', 11)).setPos(10, 40)
+        for pid, phase, lo, hi, t0, t1 in timeline:
+            if phase == 'sort' and n:
+                color = WORKER_COLORS[lanes[pid] % len(WORKER_COLORS)]
+                self.addRect(left + width * lo / n, 36, max(1, width * (hi - lo) / n), 24, QPen(Qt.black, 1), QBrush(color))
+        # One lane per worker; box length is wall time, lighter boxes are merge/scatter work
+        start = min(e[4] for e in timeline)
+        span = max(e[5] for e in timeline) - start or 1
+        lane_h = 28
+        for pid, lane in lanes.items():
+            y = 80 + lane * (lane_h + 8)
+            self.addSimpleText(f'W{lane}', QFont('Arial', 11, QFont.Bold)).setPos(10, y + 5)
+            self.addRect(left, y, width, lane_h, QPen(QColor(220, 220, 220)), QBrush(QColor(245, 245, 250)))
+        for pid, phase, lo, hi, t0, t1 in timeline:
+            y = 80 + lanes[pid] * (lane_h + 8)
+            color = QColor(WORKER_COLORS[lanes[pid] % len(WORKER_COLORS)])
+            if phase != 'sort':
+                color = color.lighter(140)
+            rect = self.addRect(left + width * (t0 - start) / span, y + 2, max(1, width * (t1 - t0) / span), lane_h - 4, QPen(Qt.black, 1), QBrush(color))
+            rect.setToolTip(f'{phase} [{lo}:{hi}] {1000 * (t1 - t0):.2f} ms')
+        bottom = 80 + len(lanes) * (lane_h + 8)
+        self.addSimpleText('0 ms', QFont('Arial', 10)).setPos(left, bottom)
+        self.addSimpleText(f'{1000 * span:.1f} ms', QFont('Arial', 10)).setPos(left + width - 50, bottom)
+        self.setSceneRect(0, 0, 860, max(400, bottom + 30))
+
+# --- External merge sort ---
+# Smallest read/write buffer the merge will use per run
+EXTERNAL_MIN_BLOCK_BYTES = 64 * 1024
+
+class ExternalMergeSort:
+    """Sorts a file larger than memory: sorted runs spilled to disk, then heap k-way merges.
+
+    Input is raw binary (int64 unless given), .npy, or CSV/text numbers. The
+    output is raw binary of the same dtype. I/O is counted in bytes, and every
+    run and merge is recorded in self.events for the visualizer.
+    """
+    def __init__(self, path, memory_budget, out_path=None, dtype=np.int64, tmp_dir=None):
+        self.path = path
+        self.memory_budget = int(memory_budget)
+        self.out_path = out_path or path + '.sorted.bin'
+        self.dtype = np.dtype(dtype)
+        self.tmp_dir = tmp_dir
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.passes = 0
+        self.runs = 0
+        self.fan_in = 0
+        self.n = 0
+        self.events = []
+
+    def _chunks(self, chunk_elems):
+        # Yields numpy chunks of at most chunk_elems values from the input file
+        ext = os.path.splitext(self.path)[1].lower()
+        if ext == '.npy':
+            data = np.load(self.path, mmap_mode='r')
+            self.dtype = data.dtype
+            data = data.reshape(-1)
+            for lo in range(0, len(data), chunk_elems):
+                chunk = np.array(data[lo:lo + chunk_elems])
+                self.bytes_read += chunk.nbytes
+                yield chunk
+        elif ext in ('.csv', '.txt'):
+            # Text is read in byte blocks cut at the last separator. Every value
+            # takes at least two bytes with its separator, so a block parses to
+            # at most chunk_elems values; leftovers wait for the next chunk.
+            block = max(1024, 2 * chunk_elems)
+            carry = b''
+            pending = np.zeros(0, self.dtype)
+            header = None
+            with open(self.path, 'rb') as f:
+                while True:
+                    data = f.read(block)
+                    self.bytes_read += len(data)
+                    text = carry + data
+                    carry = b''
+                    if header is None:
+                        # A first line containing letters is a header, skipped up to its newline
+                        line_end = text.find(b'\n')
+                        first_line = text if line_end < 0 else text[:line_end]
+                        header = any(c.isalpha() for c in first_line.decode(errors='ignore'))
+                    if header is True:
+                        line_end = text.find(b'\n')
+                        if line_end < 0:
+                            if not data:
+                                break
+                            continue
+                        text = text[line_end + 1:]
+                        header = False
+                    if data:
+                        cut = max(text.rfind(sep) for sep in (b',', b'\n', b' ', b'\t', b'\r')) + 1
+                        text, carry = text[:cut], text[cut:]
+                    if text.strip():
+                        values = np.fromstring(text.decode().replace(',', ' '), dtype=self.dtype, sep=' ')
+                        pending = np.concatenate((pending, values))
+                    while len(pending) >= chunk_elems:
+                        yield pending[:chunk_elems]
+                        pending = pending[chunk_elems:]
+                    if not data:
+                        break
+            if len(pending):
+                yield pending
+        else:
+            with open(self.path, 'rb') as f:
+                while True:
+                    chunk = np.fromfile(f, dtype=self.dtype, count=chunk_elems)
+                    if len(chunk) == 0:
+                        break
+                    self.bytes_read += chunk.nbytes
+                    yield chunk
+
+    def run(self):
+        tmp = tempfile.mkdtemp(prefix='extsort_', dir=self.tmp_dir)
+        try:
+            runs = self._form_runs(tmp)
+            self.runs = len(runs)
+            self.passes = 1
+            # Every input run and the output get an equal share of the budget
+            self.fan_in = max(2, self.memory_budget // EXTERNAL_MIN_BLOCK_BYTES - 1)
+            merge_pass = 0
+            while len(runs) > 1:
+                merge_pass += 1
+                self.passes += 1
+                merged = []
+                for k in range(0, len(runs), self.fan_in):
+                    group = runs[k:k + self.fan_in]
+                    if len(group) == 1:
+                        # A lone run is carried into the next pass without I/O
+                        self.events.append(('carry', merge_pass, len(merged), group[0][1], group[0][2], 1))
+                        merged.append(group[0])
+                        continue
+                    out = os.path.join(tmp, f'pass{merge_pass}_run{len(merged)}.bin')
+                    lo, hi = group[0][1], group[-1][2]
+                    self._merge(group, out)
+                    self.events.append(('merge', merge_pass, len(merged), lo, hi, len(group)))
+                    merged.append((out, lo, hi))
+                    for path, _, _ in group:
+                        os.remove(path)
+                runs = merged
+            if runs:
+                shutil.move(runs[0][0], self.out_path)
+            else:
+                open(self.out_path, 'wb').close()
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        return self
+
+    def _form_runs(self, tmp):
+        # Pass 0: fill the budget, sort in memory, spill as a run
+        chunk_elems = max(1, self.memory_budget // self.dtype.itemsize)
+        runs = []
+        for chunk in self._chunks(chunk_elems):
+            chunk = np.sort(chunk)
+            path = os.path.join(tmp, f'pass0_run{len(runs)}.bin')
+            chunk.tofile(path)
+            self.bytes_written += chunk.nbytes
+            lo = self.n
+            self.n += len(chunk)
+            runs.append((path, lo, self.n))
+            self.events.append(('run', 0, len(runs) - 1, lo, self.n, 1))
+        return runs
+
+    def _merge(self, group, out_path):
+        # Heap of (last value in buffer, run, generation): the smallest buffered
+        # tail bounds what every run can safely emit this round.
+        k = len(group)
+        block = max(1, self.memory_budget // ((k + 1) * self.dtype.itemsize))
+        maps = [np.memmap(path, dtype=self.dtype, mode='r') if hi > lo else np.zeros(0, self.dtype) for path, lo, hi in group]
+        pos = [0] * k
+        bufs = [None] * k
+        gen = [0] * k
+        heap = []
+
+        def refill(r):
+            bufs[r] = np.array(maps[r][pos[r]:pos[r] + block])
+            pos[r] += len(bufs[r])
+            self.bytes_read += bufs[r].nbytes
+            gen[r] += 1
+            if len(bufs[r]):
+                heapq.heappush(heap, (bufs[r][-1], r, gen[r]))
+
+        for r in range(k):
+            refill(r)
+        with open(out_path, 'wb') as out:
+            while heap:
+                bound, r, g = heapq.heappop(heap)
+                if g != gen[r]:
+                    continue
+                pieces = []
+                for s in range(k):
+                    if len(bufs[s]):
+                        cut = np.searchsorted(bufs[s], bound, side='right')
+                        if cut:
+                            pieces.append(bufs[s][:cut])
+                            bufs[s] = bufs[s][cut:]
+                            if not len(bufs[s]):
+                                refill(s)
+                # Pieces are sorted runs, so the stable sort is a linear merge
+                chunk = np.sort(np.concatenate(pieces), kind='stable')
+                chunk.tofile(out)
+                self.bytes_written += chunk.nbytes
+        del maps
+
+class ExternalSortScene(QGraphicsScene):
+    """Run formation and merge passes of an external sort, one row per pass"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSceneRect(0, 0, 860, 400)
+        self.animations = []
+
+    def show_events(self, events, n, upto=None):
+        self.clear()
+        left, width, row_h = 90, 740, 46
+        events = events if upto is None else events[:upto]
+        passes = {}
+        for kind, p, index, lo, hi, inputs in events:
+            y = 20 + p * row_h
+            if p not in passes:
+                passes[p] = True
+                label = 'runs' if p == 0 else f'merge {p}'
+                self.addSimpleText(label, QFont('Arial', 11, QFont.Bold)).setPos(10, y + 6)
+            color = WORKER_COLORS[index % len(WORKER_COLORS)]
+            if kind != 'run':
+                color = color.lighter(120)
+            x = left + (width * lo / n if n else 0)
+            w = max(1, width * (hi - lo) / n) if n else width
+            brush = QBrush(color, Qt.Dense4Pattern) if kind == 'carry' else QBrush(color)
+            rect = self.addRect(x, y, w, 30, QPen(Qt.black, 1), brush)
+            rect.setToolTip(f'{kind} [{lo}:{hi}] from {inputs} run(s)')
+            if w > 40:
+                text = self.addSimpleText(f'{hi - lo}', QFont('Arial', 9))
+                text.setPos(x + 4, y + 8)
+        self.setSceneRect(0, 0, 860, max(400, 40 + (max(passes) + 1 if passes else 1) * row_h))
+
+# --- CPU cache simulation ---
+CACHE_TRACE_SORTS = ['Bubble Sort', 'Selection Sort', 'Insertion Sort', 'Merge Sort', 'Quick Sort']
+# Traces stop recording after this many accesses; quadratic sorts (and quick
+# sort on sorted or adversarial input) would otherwise make n^2 of them
+CACHE_TRACE_BUDGET = 2_000_000
+DEFAULT_CACHE_SPEC = '32K/8, 256K/8, 8M/16'
+
+class TraceBudgetSpent(Exception):
+    pass
+
+def sort_access_trace(name, values, budget=CACHE_TRACE_BUDGET):
+    """Element reads and writes the SortingVisualizer sort `name` makes on values.
+
+    Returns (trace, complete): an int64 array where entry >> 1 is the slot
+    touched and entry & 1 marks a write, and False when the sort was stopped
+    after `budget` accesses. Slots 0..n-1 are the array; merge sort's buffer
+    follows at n..2n-1.
+    """
+    arr = list(values)
+    n = len(arr)
+    trace = []
+    budget = budget or float('inf')
+
+    def rd(i):
+        if len(trace) >= budget:
+            raise TraceBudgetSpent
+        trace.append(i << 1)
+
+    def wr(i):
+        if len(trace) >= budget:
+            raise TraceBudgetSpent
+        trace.append((i << 1) | 1)
+    try:
+        trace_sort(name, arr, rd, wr)
+    except TraceBudgetSpent:
+        return np.array(trace, dtype=np.int64), False
+    return np.array(trace, dtype=np.int64), True
+
+def trace_sort(name, arr, rd, wr):
+    # Runs sort `name` on arr in place, reporting every element access to rd/wr
+    n = len(arr)
+    if name == 'Bubble Sort':
+        for i in range(n):
+            for j in range(0, n - i - 1):
+                rd(j); rd(j + 1)
+                if arr[j] > arr[j + 1]:
+                    arr[j], arr[j + 1] = arr[j + 1], arr[j]
+                    wr(j); wr(j + 1)
+    elif name == 'Selection Sort':
+        for i in range(n):
+            min_idx = i
+            for j in range(i + 1, n):
+                rd(min_idx); rd(j)
+                if arr[j] < arr[min_idx]:
+                    min_idx = j
+            if min_idx != i:
+                rd(i); rd(min_idx)
+                arr[i], arr[min_idx] = arr[min_idx], arr[i]
+                wr(i); wr(min_idx)
+    elif name == 'Insertion Sort':
+        for i in range(1, n):
+            rd(i)
+            key = arr[i]
+            j = i - 1
+            while j >= 0:
+                rd(j)
+                if arr[j] <= key:
+                    break
+                arr[j + 1] = arr[j]
+                wr(j + 1)
+                j -= 1
+            arr[j + 1] = key
+            wr(j + 1)
+    elif name == 'Merge Sort':
+        # Same top-down split as merge_sort; the halves are copied to the buffer
+        stack = [(0, n - 1, False)]
+        while stack:
+            l, r, merging = stack.pop()
+            if l >= r:
+                continue
+            m = (l + r) // 2
+            if not merging:
+                stack += [(l, r, True), (m + 1, r, False), (l, m, False)]
+                continue
+            for k in range(l, r + 1):
+                rd(k); wr(n + k)
+            left, right = arr[l:m + 1], arr[m + 1:r + 1]
+            i, li, ri = l, 0, 0
+            while li < len(left) and ri < len(right):
+                rd(n + l + li); rd(n + m + 1 + ri)
+                if left[li] <= right[ri]:
+                    arr[i] = left[li]
+                    li += 1
+                else:
+                    arr[i] = right[ri]
+                    ri += 1
+                wr(i)
+                i += 1
+            while li < len(left):
+                rd(n + l + li); arr[i] = left[li]; wr(i)
+                li += 1
+                i += 1
+            while ri < len(right):
+                rd(n + m + 1 + ri); arr[i] = right[ri]; wr(i)
+                ri += 1
+                i += 1
+    elif name == 'Quick Sort':
+        # Lomuto partition around the last element, as in quick_sort
+        stack = [(0, n - 1)]
+        while stack:
+            l, r = stack.pop()
+            if l >= r:
+                continue
+            rd(r)
+            pivot = arr[r]
+            i = l
+            for j in range(l, r):
+                rd(j)
+                if arr[j] < pivot:
+                    rd(i)
+                    arr[i], arr[j] = arr[j], arr[i]
+                    wr(i); wr(j)
+                    i += 1
+            rd(i)
+            arr[i], arr[r] = arr[r], arr[i]
+            wr(i); wr(r)
+            stack += [(i + 1, r), (l, i - 1)]
+    else:
+        raise ValueError(f'No access trace for {name}')
+
+def parse_cache_levels(spec):
+    # "32K/8, 256K/8" -> [(32768, 8), (262144, 8)]: size and ways per level
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    levels = []
+    for part in spec.split(','):
+        size, _, ways = part.strip().partition('/')
+        size = size.strip().upper().rstrip('B')
+        scale = units.get(size[-1:], 1)
+        levels.append((int(float(size.rstrip('KMG')) * scale), int(ways or 1)))
+    return levels
+
+class CacheLevel:
+    """One set-associative, write-back, write-allocate LRU cache level"""
+    def __init__(self, name, size, associativity, line_size=64):
+        self.name = name
+        self.size = size
+        self.associativity = max(1, associativity)
+        self.num_sets = max(1, size // (line_size * self.associativity))
+        # Per set: line -> dirty flag, in LRU order (least recent first)
+        self.sets = [dict() for _ in range(self.num_sets)]
+        self.hits = 0
+        self.misses = 0
+        self.writebacks = 0
+
+    def access(self, line, write):
+        s = self.sets[line % self.num_sets]
+        if line in s:
+            s[line] = s.pop(line) or write
+            self.hits += 1
+            return True
+        self.misses += 1
+        if len(s) >= self.associativity:
+            victim = next(iter(s))
+            if s.pop(victim):
+                self.writebacks += 1
+        s[line] = write
+        return False
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 1.0
+
+class CacheSimulator:
+    """Multi-level cache hierarchy fed with element-slot traces"""
+    def __init__(self, levels, line_size=64):
+        self.line_size = line_size
+        self.levels = [CacheLevel(f'L{k + 1}', size, ways, line_size) for k, (size, ways) in enumerate(levels)]
+
+    def run(self, trace, itemsize=8, base=0):
+        # Returns, per access, the level that served it (len(levels) = memory)
+        slots = trace >> 1
+        writes = (trace & 1).astype(bool)
+        lines = ((base + slots * itemsize) // self.line_size).tolist()
+        served = np.zeros(len(trace), dtype=np.uint8)
+        first = self.levels[0]
+        last_line = None
+        last_dirty = False
+        for k, (line, write) in enumerate(zip(lines, writes.tolist())):
+            if line == last_line:
+                # Re-touching the MRU line of L1 is always a hit and changes no LRU order
+                first.hits += 1
+                if write and not last_dirty:
+                    first.sets[line % first.num_sets][line] = last_dirty = True
+                continue
+            last_line = line
+            level = 0
+            for cache in self.levels:
+                if cache.access(line, write):
+                    break
+                level += 1
+            if level:
+                served[k] = level
+            last_dirty = first.sets[line % first.num_sets][line]
+        return served
+
+def simulate_sort_cache(name, values, levels, line_size=64, itemsize=8, bins=200):
+    """Traces one sort, runs it through a fresh cache and bins L1 misses over the array"""
+    n = len(values)
+    trace, complete = sort_access_trace(name, values)
+    sim = CacheSimulator(levels, line_size)
+    served = sim.run(trace, itemsize=itemsize)
+    # Buffer accesses are charged to the array position they shadow
+    slots = trace >> 1
+    positions = np.where(slots >= n, slots - n, slots)
+    # Bins hold whole cache lines so every bin sees its share of line fills
+    per_line = max(1, line_size // itemsize)
+    n_lines = max(1, -(-n // per_line))
+    bins = max(1, min(bins, n_lines))
+    bucket = (positions // per_line) * bins // n_lines
+    accesses = np.bincount(bucket, minlength=bins)
+    l1_misses = np.bincount(bucket, weights=served > 0, minlength=bins)
+    memory = np.bincount(bucket, weights=served == len(levels), minlength=bins)
+    return {
+        'name': name,
+        'accesses': len(trace),
+        'complete': complete,
+        'levels': [(c.name, c.hits, c.misses, c.writebacks) for c in sim.levels],
+        'miss_rate': np.divide(l1_misses, accesses, out=np.zeros(bins), where=accesses > 0),
+        'memory_misses': memory,
+    }
+
+class CacheHeatmapScene(QGraphicsScene):
+    """One row per sort: L1 miss rate over array positions plus hit rates per level"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSceneRect(0, 0, 860, 400)
+        self.animations = []
+
+    def show_results(self, results, n):
+        self.clear()
+        left, width, row_h = 140, 690, 64
+        # Colors are scaled to the worst bin so low miss rates stay readable
+        peak = max([r['miss_rate'].max() for r in results if len(r['miss_rate'])] + [1e-9])
+        title = self.addSimpleText(f'L1 miss rate over the array (n = {n}, white = 0%, red = {100 * peak:.1f}%)', QFont('Arial', 12, QFont.Bold))
+        title.setPos(left, 4)
+        for row, result in enumerate(results):
+            y = 32 + row * row_h
+            self.addSimpleText(result['name'], QFont('Arial', 11, QFont.Bold)).setPos(10, y + 4)
+            rates = result['miss_rate']
+            cell = width / len(rates)
+            for b, rate in enumerate(rates):
+                shade = int(255 * (1 - min(1.0, rate / peak)))
+                rect = self.addRect(left + b * cell, y, cell + 0.5, 26, QPen(Qt.NoPen), QBrush(QColor(255, shade, shade)))
+                rect.setToolTip(f'{100 * rate:.1f}% L1 misses, {int(result["memory_misses"][b])} memory accesses')
+            self.addRect(left, y, width, 26, QPen(Qt.black, 1))
+            summary = '   '.join(f'{name} {100 * hits / max(1, hits + misses):.1f}%' for name, hits, misses, _ in result['levels'])
+            traced = f'{result["accesses"]} accesses' if result['complete'] else f'first {result["accesses"]} accesses (trace budget hit)'
+            text = self.addSimpleText(f'{traced}   hit rate: {summary}', QFont('Arial', 10))
+            text.setPos(left, y + 30)
+        self.setSceneRect(0, 0, 860, max(400, 40 + len(results) * row_h))
+
+# --- Analytic sort costs ---
+# Counts with no closed form are replayed in plain Python up to this size
+ANALYTIC_SIMULATION_LIMIT = 1_000_000
+# Quick sort is quadratic on sorted and adversarial inputs, so its replay is capped by work
+QUICK_SORT_REPLAY_COMPARISONS = 5_000_000
+
+def value_ranks(values):
+    """Ranks where equal values share a rank, plus where each rank starts in sorted order"""
+    values = np.asarray(values)
+    if values.dtype.kind in 'iub' and len(values) and int(values.max()) - int(values.min()) < 4 * len(values):
+        # Small integer ranges skip the sort; unused values are squeezed out so
+        # few distinct values mean few rank bits
+        offsets = (values - values.min()).astype(np.int32)
+        counts = np.bincount(offsets)
+        present = counts > 0
+        ranks = (np.cumsum(present, dtype=np.int32) - 1)[offsets]
+        counts = counts[present]
+    else:
+        _, ranks, counts = np.unique(values, return_inverse=True, return_counts=True)
+        ranks = ranks.astype(np.int32).ravel()
+    starts = np.zeros(len(counts) + 1, dtype=np.int32)
+    np.cumsum(counts, out=starts[1:])
+    return ranks, starts
+
+def count_inversions(values):
+    """Pairs i < j with values[i] > values[j], in O(n log n) without a Python loop per element"""
+    n = len(values)
+    if n < 2:
+        return 0
+    values = np.asarray(values)
+    if not (values[1:] < values[:-1]).any():
+        return 0
+    ranks, starts = value_ranks(values)
+    top = len(starts) - 1
+    positions = np.arange(n, dtype=np.int32)
+    total = 0
+    # From the top rank bit down, stably split every group sharing the higher bits
+    # into its 0s and then its 1s; each 0 inverts with the 1s ahead of it in its group
+    for shift in range(max(1, top - 1).bit_length() - 1, -1, -1):
+        high = ranks >> shift
+        bits = (high & 1).astype(bool)
+        ones_before = np.cumsum(bits, dtype=np.int32)
+        ones_before -= bits
+        half_start = starts[::1 << shift]
+        group_base = ones_before[np.minimum(half_start[0::2], n - 1)]
+        ones_in_group = ones_before - group_base[high >> 1]
+        total += int(ones_in_group.sum(where=~bits, dtype=np.int64))
+        target = np.where(bits, half_start[high] + ones_in_group, positions - ones_in_group)
+        split = np.empty_like(ranks)
+        split[target] = ranks
+        ranks = split
+    return total
+
+def count_cycles(perm):
+    """Number of cycles in a permutation of 0..n-1"""
+    perm = perm.tolist()
+    seen = bytearray(len(perm))
+    cycles = 0
+    for i in range(len(perm)):
+        if not seen[i]:
+            cycles += 1
+            j = i
+            while not seen[j]:
+                seen[j] = 1
+                j = perm[j]
+    return cycles
+
+def selection_sort_swaps(values):
+    """Swaps made by selection sort, or None for large inputs with repeated values"""
+    values = np.asarray(values)
+    n = len(values)
+    order = np.argsort(values, kind='stable')
+    sorted_values = values[order]
+    new_value = np.r_[True, sorted_values[1:] != sorted_values[:-1]] if n else np.ones(0, dtype=bool)
+    if new_value.all():
+        # Distinct values: each swap puts one value home and splits one cycle of the sorting permutation
+        return n - count_cycles(order)
+    if n > ANALYTIC_SIMULATION_LIMIT:
+        return None
+    # Equal values are picked in the order they sit when their turn comes,
+    # which depends on earlier swaps, so replay the swaps one value at a time
+    at = list(range(n))
+    where = list(range(n))
+    order = order.tolist()
+    bounds = np.flatnonzero(np.r_[new_value, True]).tolist()
+    swaps = 0
+    for first, end in zip(bounds, bounds[1:]):
+        for i, j in enumerate(sorted(where[e] for e in order[first:end]), first):
+            if i != j:
+                moved, placed = at[i], at[j]
+                at[i], at[j] = placed, moved
+                where[placed], where[moved] = i, j
+                swaps += 1
+    return swaps
+
+def merge_sort_costs(values):
+    """(comparisons, writes) of the top-down merge sort, one vectorized pass per recursion level"""
+    values = np.asarray(values)
+    n = len(values)
+    comparisons = writes = 0
+    if n < 2:
+        return comparisons, writes
+    integral = values.dtype.kind in 'iub'
+    if integral:
+        values = values.astype(np.int64)
+    lo = np.array([0])
+    hi = np.array([n - 1])
+    while True:
+        split = lo < hi
+        if not split.any():
+            return comparisons, writes
+        mid = (lo + hi) // 2
+        # Halves of this level become the next level's pieces; single values stay as they are
+        piece_lo = np.stack([lo, np.where(split, mid + 1, hi + 1)]).T.ravel()
+        piece_hi = np.stack([np.where(split, mid, hi), hi]).T.ravel()
+        valid = piece_lo <= piece_hi
+        index = np.cumsum(valid) - 1
+        left, right = index[0::2][split], index[1::2][split]
+        piece_lo, piece_hi = piece_lo[valid], piece_hi[valid]
+        maxima = np.maximum.reduceat(values, piece_lo)
+        max_left, max_right = maxima[left], maxima[right]
+        # The half holding the smaller maximum runs out first; what is left of the
+        # other half (values past that maximum) is copied without comparisons
+        left_first = max_left <= max_right
+        threshold = np.full(len(piece_lo), np.iinfo(np.int64).max if integral else np.inf, dtype=values.dtype)
+        threshold[right[left_first]] = max_left[left_first]
+        rest = max_right[~left_first]
+        threshold[left[~left_first]] = rest + 1 if integral else np.nextafter(rest, np.inf)
+        over = np.add.reduceat(values >= np.repeat(threshold, piece_hi - piece_lo + 1), piece_lo)
+        sizes = (hi - lo + 1)[split]
+        comparisons += int((sizes - np.where(left_first, over[right], over[left])).sum())
+        writes += int(sizes.sum())
+        lo, hi = piece_lo, piece_hi
+
+def quick_sort_costs(values, budget=None):
+    """(comparisons, swaps, finished) of the last-element-pivot quick sort, replayed without steps.
+
+    The replay stops early, unfinished, before its comparisons would pass budget.
+    """
+    arr = np.asarray(values).tolist()
+    comparisons = swaps = 0
+    ranges = [(0, len(arr) - 1)]
+    while ranges:
+        l, r = ranges.pop()
+        if l >= r:
+            continue
+        if budget is not None and comparisons + r - l > budget:
+            return comparisons, swaps, False
+        pivot = arr[r]
+        i = l
+        for j in range(l, r):
+            if arr[j] < pivot:
+                arr[i], arr[j] = arr[j], arr[i]
+                i += 1
+        arr[i], arr[r] = arr[r], arr[i]
+        comparisons += r - l
+        swaps += i - l + 1
+        ranges.append((i + 1, r))
+        ranges.append((l, i - 1))
+    return comparisons, swaps, True
+
+def lomuto_right_side(body, small):
+    """What the quick sort partition leaves right of the pivot, given body (the range
+    without its pivot) and which of its values are smaller than the pivot"""
+    large = ~small
+    # Larger values form a queue behind the smaller ones: each larger value joins
+    # its back, and each smaller value met after the first larger one sends the
+    # front to the back. Tape slot t holds the t-th value to join the back; the
+    # k-th of those moves copies slot k, so copies are resolved by pointer jumping.
+    active = large | (np.cumsum(large) > 0)
+    joins = large[active]
+    moves = int(np.count_nonzero(~joins))
+    parent = np.arange(len(joins))
+    parent[~joins] = np.arange(moves)
+    while True:
+        jumped = parent[parent]
+        if np.array_equal(jumped, parent):
+            break
+        parent = jumped
+    tape = np.empty(len(joins), dtype=body.dtype)
+    tape[joins] = body[large]
+    queue = tape[parent[moves:]]
+    # The pivot swaps with the front of the queue, which ends up in the last slot
+    return np.concatenate((queue[1:], queue[:1]))
+
+def quick_sort_probe(values, partitions=64, streak=4):
+    """(degenerate, comparisons) from following the larger side of the first quick sort partitions.
+
+    Degenerate when `streak` partitions in a row put at most 1/64 of their range on
+    the smaller side; comparisons is what those partitions made, a lower bound on the sort.
+    """
+    seg = np.asarray(values)
+    few = max(64, math.isqrt(len(seg)))
+    comparisons = peeled = 0
+    for _ in range(partitions):
+        if len(seg) <= few:
+            break
+        body = seg[:-1]
+        small = body < seg[-1]
+        left = int(np.count_nonzero(small))
+        comparisons += len(body)
+        if 2 * left >= len(body):
+            seg, other = body[small], len(body) - left
+        else:
+            seg, other = lomuto_right_side(body, small), left
+        peeled = peeled + 1 if 64 * other <= len(body) else 0
+        if peeled >= streak:
+            return True, comparisons
+    return False, comparisons
+
+def quick_sort_expected(n):
+    """Average comparisons and swaps of the quick sort over random orders of n distinct values"""
+    harmonic = float(np.sum(1.0 / np.arange(1, n + 2)))
+    comparisons = 2 * (n + 1) * (harmonic - 1 / (n + 1)) - 4 * n
+    swaps = (n + 1) * (harmonic - 4 / 3)
+    return [('expected comparisons (random order)', round(comparisons)), ('expected swaps (random order)', round(swaps))]
+
+def predict_sort_cost(name, values):
+    """Operation counts the SortingVisualizer sort `name` would make on values, as (label, count) pairs"""
+    values = np.asarray(values)
+    n = len(values)
+    pairs = n * (n - 1) // 2
+    if name == 'Bubble Sort':
+        return [('comparisons', pairs), ('swaps', count_inversions(values))]
+    if name == 'Selection Sort':
+        swaps = selection_sort_swaps(values)
+        if swaps is None:
+            return [('comparisons', pairs), ('swaps at most', max(0, n - 1))]
+        return [('comparisons', pairs), ('swaps', swaps)]
+    if name == 'Insertion Sort':
+        # Every shift undoes one inversion; each key also makes one failing comparison
+        # unless it is smaller than everything before it and slides to index 0
+        shifts = count_inversions(values)
+        new_minima = int(np.count_nonzero(values[1:] < np.minimum.accumulate(values)[:-1])) if n > 1 else 0
+        return [('comparisons', shifts + max(0, n - 1) - new_minima), ('shifts', shifts)]
+    if name == 'Merge Sort':
+        comparisons, writes = merge_sort_costs(values)
+        return [('comparisons', comparisons), ('writes', writes)]
+    if name == 'Quick Sort':
+        comparisons = 0
+        if n <= ANALYTIC_SIMULATION_LIMIT:
+            comparisons, swaps, finished = quick_sort_costs(values, QUICK_SORT_REPLAY_COMPARISONS)
+            if finished:
+                return [('comparisons', comparisons), ('swaps', swaps)]
+        # Partitioning reorders the larger side in a way with no closed form. Sorted,
+        # reversed and killer inputs show up as early partitions that peel off a few
+        # values at a time; k equal values always cost k(k-1)/2 comparisons, since
+        # none of them is smaller than another as pivot
+        degenerate, probed = quick_sort_probe(values)
+        counts = np.unique(values, return_counts=True)[1].astype(np.int64) if n else np.zeros(0, np.int64)
+        at_least = max(comparisons, probed, int((counts * (counts - 1) // 2).sum()))
+        expected = quick_sort_expected(n)
+        if degenerate or at_least > expected[0][1]:
+            # Worst case: a partition of k values compares k - 1 times and swaps at most k
+            return [('comparisons at least', at_least), ('comparisons at most', pairs), ('swaps at most', max(0, n * (n + 1) // 2 - 1))]
+        return expected
+    raise ValueError(f'Unknown sort: {name}')
+
+# --- Shortest paths ---
+INF = float('inf')
+# Example graph: adjacency list [(neighbor, weight), ...]
+EXAMPLE_GRAPH = [
+    [(1, 2), (2, 4)],    # 0
+    [(0, 2), (2, 1), (3, 7)], # 1
+    [(0, 4), (1, 1), (3, 3)], # 2
+    [(1, 7), (2, 3)]     # 3
+]
+EXAMPLE_POSITIONS = [(100, 300), (300, 100), (500, 300), (700, 100)]
+DIJKSTRA_VARIANTS = ['Binary heap (decrease-key)', 'Linear scan (O(V²))']
+# The O(V^2) scan is only timed on graphs it can finish in a few seconds
+LINEAR_DIJKSTRA_LIMIT = 5000
+
+class IndexedMinHeap:
+    """Binary min-heap of node ids keyed by distance, with O(log n) decrease-key"""
+    def __init__(self, capacity):
+        self.nodes = []
+        self.keys = []
+        # Heap slot of every node, -1 when it is not queued
+        self.slot = [-1] * capacity
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, node):
+        return self.slot[node] >= 0
+
+    def push(self, node, key):
+        self.nodes.append(node)
+        self.keys.append(key)
+        self._sift_up(len(self.nodes) - 1, node, key)
+
+    def decrease_key(self, node, key):
+        self._sift_up(self.slot[node], node, key)
+
+    def pop(self):
+        nodes, keys = self.nodes, self.keys
+        node, key = nodes[0], keys[0]
+        self.slot[node] = -1
+        last, last_key = nodes.pop(), keys.pop()
+        if nodes:
+            self._sift_down(0, last, last_key)
+        return node, key
+
+    def snapshot(self):
+        # (node, key) pairs in heap-array order
+        return list(zip(self.nodes, self.keys))
+
+    def _sift_up(self, i, node, key):
+        # Move the hole at i towards the root, then drop node into it
+        nodes, keys, slot = self.nodes, self.keys, self.slot
+        while i > 0:
+            parent = (i - 1) >> 1
+            if keys[parent] <= key:
+                break
+            nodes[i] = nodes[parent]
+            keys[i] = keys[parent]
+            slot[nodes[i]] = i
+            i = parent
+        nodes[i] = node
+        keys[i] = key
+        slot[node] = i
+
+    def _sift_down(self, i, node, key):
+        nodes, keys, slot = self.nodes, self.keys, self.slot
+        n = len(nodes)
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if child + 1 < n and keys[child + 1] < keys[child]:
+                child += 1
+            if keys[child] >= key:
+                break
+            nodes[i] = nodes[child]
+            keys[i] = keys[child]
+            slot[nodes[i]] = i
+            i = child
+        nodes[i] = node
+        keys[i] = key
+        slot[node] = i
+
+def dijkstra_linear(graph, start, steps=None):
+    """O(V^2) Dijkstra picking the closest unvisited node by scanning all of them.
+
+    Returns (dist, prev, stats); appends (dist, visited, node, edge, explanation)
+    tuples to steps when given.
+    """
+    n = len(graph)
+    dist = [INF] * n
+    visited = [False] * n
+    prev = [None] * n
+    stats = {'scanned': 0, 'relaxations': 0}
+    dist[start] = 0
+    if steps is not None:
+        steps.append((dist.copy(), visited.copy(), None, None, f"Start at node {start}. Set its distance to 0. All others are ∞ (infinity)."))
+    for _ in range(n):
+        # Find the unvisited node with the smallest distance
+        u = None
+        min_dist = INF
+        for i in range(n):
+            if not visited[i] and dist[i] < min_dist:
+                min_dist = dist[i]
+                u = i
+        stats['scanned'] += n
+        if u is None:
+            break
+        visited[u] = True
+        if steps is not None:
+            steps.append((dist.copy(), visited.copy(), u, None, f"Pick node {u} (smallest distance not visited). Mark as visited."))
+        for v, w in graph[u]:
+            if w < 0:
+                raise ValueError(f'Edge {u} -> {v} has negative weight {w}; Dijkstra needs non-negative weights.')
+            if not visited[v]:
+                stats['relaxations'] += 1
+                if dist[u] + w < dist[v]:
+                    old = dist[v]
+                    dist[v] = dist[u] + w
+                    prev[v] = u
+                    if steps is not None:
+                        steps.append((dist.copy(), visited.copy(), v, (u, v), f"Check neighbor {v} of node {u}. Update its distance from {'∞' if old == INF else old} to {dist[v]} (via {u})."))
+                elif steps is not None:
+                    steps.append((dist.copy(), visited.copy(), v, (u, v), f"Check neighbor {v} of node {u}. No update needed (current distance is shorter)."))
+    return dist, prev, stats
+
+def dijkstra_heap(graph, start, steps=None):
+    """O((V+E) log V) Dijkstra on an indexed binary heap with decrease-key.
+
+    Same results as dijkstra_linear; recorded steps carry the heap contents
+    as a sixth element.
+    """
+    n = len(graph)
+    dist = [INF] * n
+    visited = [False] * n
+    prev = [None] * n
+    stats = {'pushes': 1, 'pops': 0, 'decrease_keys': 0, 'relaxations': 0}
+    queue = IndexedMinHeap(n)
+    dist[start] = 0
+    queue.push(start, 0)
+    if steps is not None:
+        steps.append((dist.copy(), visited.copy(), None, None, f"Start at node {start}. Set its distance to 0 and push it on the heap. All others are ∞ (infinity).", queue.snapshot()))
+    while queue:
+        u, d = queue.pop()
+        visited[u] = True
+        stats['pops'] += 1
+        if steps is not None:
+            steps.append((dist.copy(), visited.copy(), u, None, f"Pop node {u} (distance {d}) from the top of the heap. Mark as visited.", queue.snapshot()))
+        for v, w in graph[u]:
+            if w < 0:
+                raise ValueError(f'Edge {u} -> {v} has negative weight {w}; Dijkstra needs non-negative weights.')
+            if visited[v]:
+                continue
+            stats['relaxations'] += 1
+            nd = d + w
+            if nd < dist[v]:
+                old = dist[v]
+                dist[v] = nd
+                prev[v] = u
+                if v in queue:
+                    queue.decrease_key(v, nd)
+                    stats['decrease_keys'] += 1
+                    action = 'decrease-key moves it up the heap'
+                else:
+                    queue.push(v, nd)
+                    stats['pushes'] += 1
+                    action = 'push it on the heap'
+                if steps is not None:
+                    steps.append((dist.copy(), visited.copy(), v, (u, v), f"Check neighbor {v} of node {u}. Update its distance from {'∞' if old == INF else old} to {nd} (via {u}); {action}.", queue.snapshot()))
+            elif steps is not None:
+                steps.append((dist.copy(), visited.copy(), v, (u, v), f"Check neighbor {v} of node {u}. No update needed (current distance is shorter).", queue.snapshot()))
+    return dist, prev, stats
+
+def random_weighted_graph(n, degree=4, max_weight=100, seed=None):
+    """Connected undirected graph with about n * degree / 2 edges as adjacency lists"""
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(n)
+    # A random tree keeps every node reachable; extra edges are uniform pairs
+    parents = order[(rng.random(max(0, n - 1)) * np.arange(1, n)).astype(np.int64)]
+    extra = max(0, n * degree // 2 - (n - 1))
+    u = np.concatenate([parents, rng.integers(0, n, extra)])
+    v = np.concatenate([order[1:], rng.integers(0, n, extra)])
+    keep = u != v
+    u, v = u[keep], v[keep]
+    w = rng.integers(1, max_weight + 1, len(u))
+    src = np.concatenate([u, v])
+    by_src = np.argsort(src, kind='stable')
+    targets = np.concatenate([v, u])[by_src].tolist()
+    weights = np.concatenate([w, w])[by_src].tolist()
+    offsets = np.r_[0, np.cumsum(np.bincount(src, minlength=n))].tolist()
+    return [list(zip(targets[a:b], weights[a:b])) for a, b in zip(offsets, offsets[1:])]
+
+# --- CSR graphs ---
+# Larger graphs are run and summarized instead of drawn step by step
+MAX_DRAWN_GRAPH = 60
+# Delay between the steps of the graph algorithms that mark edges as they go
+GRAPH_STEP_MS = 1000
+GRAPH_FILE_FILTER = 'Graphs (*.gr *.csv *.txt *.edges *.el);;All files (*)'
+
+class CSRGraph:
+    """Compressed sparse row graph: node u's arcs are targets/weights[offsets[u]:offsets[u + 1]].
+
+    Indexing yields (neighbor, weight) pairs like the adjacency lists, so the
+    shortest-path functions accept either. Arrays may be memory-mapped.
+    """
+    def __init__(self, offsets, targets, weights, positions=None, twins=None):
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        # Optional (n, 2) coordinates, e.g. from a DIMACS .co file
+        self.positions = positions
+        # For undirected graphs, the index of every arc's reverse arc
+        self.twins = twins
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, u):
+        lo, hi = int(self.offsets[u]), int(self.offsets[u + 1])
+        return zip(self.targets[lo:hi].tolist(), self.weights[lo:hi].tolist())
+
+    @property
+    def num_arcs(self):
+        return len(self.targets)
+
+    @classmethod
+    def from_edges(cls, src, dst, weights=None, n=None, directed=True, positions=None):
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        weights = np.ones(len(src), dtype=np.int64) if weights is None else np.asarray(weights)
+        if len(src) and min(src.min(), dst.min()) < 0:
+            raise ValueError('Node ids must be non-negative.')
+        n = int(max(src.max(), dst.max()) + 1 if len(src) else 0) if n is None else int(n)
+        twins = None
+        if not directed:
+            twins = np.r_[np.arange(len(src), 2 * len(src)), np.arange(len(src))]
+            src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+            weights = np.concatenate([weights, weights])
+        if weights.dtype.kind == 'f' and np.array_equal(weights, np.round(weights)):
+            weights = weights.astype(np.int64)
+        order = np.argsort(src, kind='stable')
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=offsets[1:])
+        index_type = np.int32 if n < 2**31 else np.int64
+        if twins is not None:
+            # Arc k of the input sits at rank[k] once sorted
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            twins = rank[twins[order]].astype(np.int32 if len(order) < 2**31 else np.int64)
+        return cls(offsets, dst[order].astype(index_type), weights[order], positions, twins)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in ('offsets', 'targets', 'weights'):
+            np.save(os.path.join(directory, name + '.npy'), getattr(self, name))
+        for name in ('positions', 'twins'):
+            if getattr(self, name) is not None:
+                np.save(os.path.join(directory, name + '.npy'), getattr(self, name))
+
+    @classmethod
+    def open(cls, directory):
+        # Memory-mapped: only the pages a search touches are read from disk
+        arrays = [np.load(os.path.join(directory, name + '.npy'), mmap_mode='r') for name in ('offsets', 'targets', 'weights')]
+        positions, twins = (os.path.join(directory, name + '.npy') for name in ('positions', 'twins'))
+        return cls(*arrays, np.load(positions) if os.path.exists(positions) else None,
+                   np.load(twins, mmap_mode='r') if os.path.exists(twins) else None)
+
+    @classmethod
+    def load(cls, path, directed=None):
+        """Reads a DIMACS .gr, CSV or whitespace edge list, caching the CSR arrays in path + '.csr/'"""
+        cache = path + '.csr'
+        key = f'{os.path.getsize(path)} {os.path.getmtime(path)} {directed}'
+        stamp = os.path.join(cache, 'source.txt')
+        if os.path.exists(stamp):
+            with open(stamp) as f:
+                if f.read() == key:
+                    return cls.open(cache)
+        if path.lower().endswith('.gr'):
+            graph = cls._read_dimacs(path, True if directed is None else directed)
+        else:
+            graph = cls._read_edge_list(path, False if directed is None else directed)
+        try:
+            graph.save(cache)
+            with open(stamp, 'w') as f:
+                f.write(key)
+        except OSError:
+            # Read-only location: the graph still works, it is just parsed again next time
+            pass
+        return graph
+
+    @staticmethod
+    def _numbers(lines, columns):
+        text = b' '.join(lines).replace(b',', b' ').decode()
+        values = np.fromstring(text, dtype=np.float64, sep=' ') if text.strip() else np.zeros(0)
+        if len(values) % columns:
+            raise ValueError(f'Expected {columns} numbers per line.')
+        return values.reshape(-1, columns)
+
+    @classmethod
+    def _read_dimacs(cls, path, directed):
+        # "p sp <nodes> <arcs>" header and "a <u> <v> <w>" arcs with 1-based ids
+        with open(path, 'rb') as f:
+            lines = f.read().split(b'\n')
+        header = [line.split() for line in lines if line[:2] == b'p ']
+        if not header or len(header[0]) < 4:
+            raise ValueError('Missing "p sp <nodes> <arcs>" line.')
+        n = int(header[0][2])
+        arcs = cls._numbers([line[2:] for line in lines if line[:2] == b'a '], 3)
+        positions = None
+        coordinates = os.path.splitext(path)[0] + '.co'
+        if os.path.exists(coordinates):
+            with open(coordinates, 'rb') as f:
+                points = cls._numbers([line[2:] for line in f.read().split(b'\n') if line[:2] == b'v '], 3)
+            positions = np.zeros((n, 2))
+            positions[points[:, 0].astype(np.int64) - 1] = points[:, 1:]
+        ids = arcs[:, :2].astype(np.int64) - 1
+        return cls.from_edges(ids[:, 0], ids[:, 1], arcs[:, 2], n, directed, positions)
+
+    @classmethod
+    def _read_edge_list(cls, path, directed):
+        # "u v [w]" per line, separated by commas or whitespace; # and % start comments
+        with open(path, 'rb') as f:
+            lines = [line for line in f.read().split(b'\n') if line.strip() and line.lstrip()[:1] not in (b'#', b'%')]
+        if lines and any(c.isalpha() for c in lines[0].decode(errors='replace')):
+            lines = lines[1:]
+        if not lines:
+            raise ValueError('No edges found.')
+        columns = len(lines[0].replace(b',', b' ').split())
+        if columns not in (2, 3):
+            raise ValueError('Each line needs "u v" or "u v weight".')
+        edges = cls._numbers(lines, columns)
+        ids = edges[:, :2]
+        if not np.array_equal(ids, np.round(ids)):
+            raise ValueError('Node ids must be integers.')
+        weights = edges[:, 2] if columns == 3 else None
+        return cls.from_edges(ids[:, 0], ids[:, 1], weights, directed=directed)
+
+def fit_positions(points, width=800, height=400, margin=40):
+    """Scales (n, 2) coordinates into the scene, y pointing down"""
+    points = np.asarray(points, dtype=np.float64)
+    lo = points.min(axis=0)
+    span = np.maximum(points.max(axis=0) - lo, 1e-12)
+    x = margin + (points[:, 0] - lo[0]) / span[0] * (width - 2 * margin)
+    y = height - margin - (points[:, 1] - lo[1]) / span[1] * (height - 2 * margin)
+    return list(zip(x.tolist(), y.tolist()))
+
+def circle_positions(n, width=800, height=400, margin=40):
+    angle = 2 * np.pi * np.arange(n) / max(1, n)
+    return fit_positions(np.stack([np.cos(angle), np.sin(angle)], axis=1), width, height, margin) if n > 1 else [(width / 2, height / 2)] * n
+
+# --- Graph generation ---
+GRAPH_MODELS = ['Grid', 'Erdős–Rényi', 'Random Geometric', 'Barabási–Albert', 'Road-like']
+MAX_GENERATED_GRAPH = 1_000_000
+
+class GraphGenerator:
+    """Seeded, vectorized weighted graphs for scaling studies, returned as CSRGraph with positions"""
+    def __init__(self, seed=None, max_weight=100):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.max_weight = max_weight
+
+    def generate(self, model, n, degree=4):
+        n = max(2, int(n))
+        if model == 'Grid':
+            return self.grid(n)
+        if model == 'Erdős–Rényi':
+            return self.erdos_renyi(n, degree)
+        if model == 'Random Geometric':
+            return self.random_geometric(n, degree)
+        if model == 'Barabási–Albert':
+            return self.barabasi_albert(n, max(1, degree // 2))
+        if model == 'Road-like':
+            return self.road_like(n)
+        raise ValueError(f'Unknown graph model: {model}')
+
+    def _weights(self, count):
+        return self.rng.integers(1, self.max_weight + 1, count)
+
+    def _graph(self, u, v, weights, n, positions):
+        # Drops self-loops and repeated pairs, then stores both directions
+        keep = u != v
+        u, v, weights = u[keep], v[keep], weights[keep]
+        lo, hi = np.minimum(u, v), np.maximum(u, v)
+        _, first = np.unique(lo * n + hi, return_index=True)
+        return CSRGraph.from_edges(lo[first], hi[first], weights[first], n, directed=False, positions=positions)
+
+    def _lattice(self, n):
+        cols = int(np.ceil(np.sqrt(n)))
+        ids = np.arange(n)
+        row, col = ids // cols, ids % cols
+        right = (col + 1 < cols) & (ids + 1 < n)
+        down = ids + cols < n
+        return cols, row, col, ids, right, down
+
+    def grid(self, n):
+        """Lattice with 4-neighbour edges, filled row by row"""
+        cols, row, col, ids, right, down = self._lattice(n)
+        u = np.concatenate([ids[right], ids[down]])
+        v = np.concatenate([ids[right] + 1, ids[down] + cols])
+        return self._graph(u, v, self._weights(len(u)), n, np.stack([col, row], axis=1).astype(np.float64))
+
+    def erdos_renyi(self, n, degree=4):
+        """G(n, p) with p = degree / (n - 1), sampling the edge count then the pairs"""
+        pairs = n * (n - 1) // 2
+        m = self.rng.binomial(pairs, min(1.0, degree / (n - 1)))
+        if pairs <= 4 * m:
+            # Dense (only tiny graphs): choose among all pairs directly
+            u, v = np.triu_indices(n, 1)
+            k = np.sort(self.rng.choice(pairs, m, replace=False))
+            u, v = u[k], v[k]
+        else:
+            # Sparse: oversample random pairs; the few repeats are dropped
+            u = self.rng.integers(0, n, int(m * 1.05) + 16)
+            v = self.rng.integers(0, n, len(u))
+            keep = u != v
+            lo, hi = np.minimum(u[keep], v[keep]), np.maximum(u[keep], v[keep])
+            _, first = np.unique(lo * n + hi, return_index=True)
+            first = np.sort(self.rng.permutation(first)[:m])
+            u, v = lo[first], hi[first]
+        return self._graph(u, v, self._weights(len(u)), n, self.rng.random((n, 2)))
+
+    def random_geometric(self, n, degree=4):
+        """Points in the unit square joined within the radius giving the requested mean degree.
+
+        Weights are the distances in thousandths, rounded up.
+        """
+        points = self.rng.random((n, 2))
+        radius = min(1.0, np.sqrt(degree / (np.pi * n)))
+        u, v = close_pairs(points, radius)
+        length = np.hypot(*(points[u] - points[v]).T)
+        return self._graph(u, v, np.ceil(length * 1000).astype(np.int64) + 1, n, points)
+
+    def barabasi_albert(self, n, m=2):
+        """Preferential attachment: each new node links to m earlier nodes chosen by degree.
+
+        Uses the Batagelj–Brandes edge-copy formulation; copies of copies are
+        resolved by pointer jumping instead of a loop over nodes.
+        """
+        slots = 2 * m * n
+        # Slot 2k holds edge k's new node, slot 2k+1 copies a uniformly chosen earlier slot
+        copy = (self.rng.random(slots // 2) * np.arange(0, slots, 2)).astype(np.int64)
+        target = copy.copy()
+        odd = (target & 1).astype(bool)
+        while odd.any():
+            target[odd] = copy[target[odd] >> 1]
+            odd = (target & 1).astype(bool)
+        u = np.arange(slots // 2) // m
+        v = (target >> 1) // m
+        return self._graph(u[m:], v[m:], self._weights(slots // 2 - m), n, self.rng.random((n, 2)))
+
+    def road_like(self, n):
+        """Planar road network: jittered lattice, gaps in the side streets, a few diagonals.
+
+        Every row stays connected and column 0 joins the rows, so the graph is
+        connected. Every eighth row and column is an arterial at half the cost.
+        """
+        cols, row, col, ids, right, down = self._lattice(n)
+        rng = self.rng
+        points = np.stack([col, row], axis=1) + rng.uniform(-0.3, 0.3, (n, 2))
+        down &= (col == 0) | (col % 8 == 0) | (rng.random(n) < 0.6)
+        # One diagonal in some cells keeps the graph planar
+        diagonal = right & (ids + cols + 1 < n) & (rng.random(n) < 0.15)
+        u = np.concatenate([ids[right], ids[down], ids[diagonal]])
+        v = np.concatenate([ids[right] + 1, ids[down] + cols, ids[diagonal] + cols + 1])
+        arterial = np.concatenate([row[right] % 8 == 0, col[down] % 8 == 0, np.zeros(diagonal.sum(), dtype=bool)])
+        length = np.hypot(*(points[u] - points[v]).T)
+        weights = np.ceil(length * np.where(arterial, 50, 100)).astype(np.int64)
+        return self._graph(u, v, weights, n, points)
+
+def grid_pairs(points, cells):
+    """Index pairs of points in the unit square sharing a cell or in touching cells of a cells x cells grid"""
+    cell = np.minimum((points * cells).astype(np.int64), cells - 1)
+    key = cell[:, 0] * cells + cell[:, 1]
+    order = np.argsort(key, kind='stable')
+    starts = np.searchsorted(key[order], np.arange(cells * cells + 1))
+    us, vs = [], []
+    # Own cell plus half of the neighbours, so every cell pair is visited once
+    for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+        a = np.arange(cells * cells)
+        ax, ay = a // cells, a % cells
+        bx, by = ax + dx, ay + dy
+        ok = (bx < cells) & (by >= 0) & (by < cells)
+        a, b = a[ok], (bx * cells + by)[ok]
+        count_a = starts[a + 1] - starts[a]
+        count_b = starts[b + 1] - starts[b]
+        total = count_a * count_b
+        a, b, count_b, total = a[total > 0], b[total > 0], count_b[total > 0], total[total > 0]
+        # Every (member of a, member of b) combination, flattened
+        first = np.repeat(np.cumsum(total) - total, total)
+        k = np.arange(int(total.sum())) - first
+        width = np.repeat(count_b, total)
+        i = order[np.repeat(starts[a], total) + k // width]
+        j = order[np.repeat(starts[b], total) + k % width]
+        if (dx, dy) == (0, 0):
+            i, j = i[i < j], j[i < j]
+        us.append(i)
+        vs.append(j)
+    return np.concatenate(us), np.concatenate(vs)
+
+def close_pairs(points, radius):
+    """Index pairs of 2D points in the unit square within radius of each other"""
+    i, j = grid_pairs(points, max(1, int(1 / radius)))
+    near = np.hypot(*(points[i] - points[j]).T) <= radius
+    return i[near], j[near]
+
+# --- Point-to-point shortest paths ---
+SHORTEST_PATH_ALGORITHMS = ['Dijkstra (stop at target)', 'A* (Euclidean)', 'A* (Manhattan)', 'Bidirectional Dijkstra', 'Bellman-Ford']
+
+def graph_arcs(graph):
+    """(source, target, weight) arrays of every arc of an adjacency-list or CSR graph"""
+    if isinstance(graph, CSRGraph):
+        return (np.repeat(np.arange(len(graph)), np.diff(graph.offsets)),
+                np.asarray(graph.targets, dtype=np.int64), np.asarray(graph.weights))
+    arcs = [(u, v, w) for u, adj in enumerate(graph) for v, w in adj]
+    if not arcs:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    u, v, w = zip(*arcs)
+    return np.array(u, dtype=np.int64), np.array(v, dtype=np.int64), np.array(w)
+
+def reverse_graph(graph):
+    """CSR graph with every arc flipped, for searching backwards from a target"""
+    src, dst, weights = graph_arcs(graph)
+    return CSRGraph.from_edges(dst, src, weights, len(graph))
+
+def position_heuristic(graph, positions, target, metric='Euclidean'):
+    """A* heuristic: Euclidean or Manhattan distance to target from node positions.
+
+    Distances are scaled by the smallest weight per unit of length over all
+    arcs, so by the triangle inequality the estimate never overestimates and
+    stays consistent whatever the units of the weights.
+    """
+    pos = np.asarray(positions, dtype=np.float64)
+    src, dst, weights = graph_arcs(graph)
+    if metric == 'Euclidean':
+        norm = lambda d: np.hypot(d[:, 0], d[:, 1])
+    else:
+        norm = lambda d: np.abs(d).sum(axis=1)
+    length = norm(pos[src] - pos[dst])
+    moving = length > 0
+    scale = float(np.min(weights[moving] / length[moving])) if moving.any() else 0.0
+    # Shaved a little so rounding cannot push an estimate past the true distance
+    estimate = max(0.0, scale) * (1 - 1e-9) * norm(pos - pos[target])
+    return estimate.tolist().__getitem__
+
+def trace_path(prev, source, target):
+    path = [target]
+    while path[-1] != source:
+        path.append(prev[path[-1]])
+    return path[::-1]
+
+def _rounded(queue):
+    # Heap keys of A* carry fractional estimates
+    return [(node, round(key, 1)) for node, key in queue.snapshot()]
+
+def astar(graph, source, target, heuristic=None, steps=None):
+    """A* search on the indexed heap; without a heuristic it is Dijkstra stopped at target.
+
+    heuristic(v) must be a consistent lower bound on the distance from v to
+    target. Returns (distance, path, stats); recorded steps carry the heap
+    contents (keys are distance + estimate) as a sixth element.
+    """
+    n = len(graph)
+    h = heuristic or (lambda v: 0)
+    dist = [INF] * n
+    prev = [None] * n
+    closed = [False] * n
+    stats = {'settled': 0, 'relaxations': 0, 'pushes': 1, 'pops': 0, 'decrease_keys': 0}
+    queue = IndexedMinHeap(n)
+    dist[source] = 0
+    queue.push(source, h(source))
+    if steps is not None:
+        steps.append((dist.copy(), closed.copy(), source, None, f'Start at node {source} with distance 0; its heap key is the estimate {h(source):.1f} to node {target}.', _rounded(queue)))
+    while queue:
+        u, _ = queue.pop()
+        closed[u] = True
+        stats['pops'] += 1
+        stats['settled'] += 1
+        if steps is not None:
+            steps.append((dist.copy(), closed.copy(), u, None, f'Pop node {u}: distance {dist[u]} plus estimate {h(u):.1f} is the smallest key. Settle it.', _rounded(queue)))
+        if u == target:
+            break
+        for v, w in graph[u]:
+            if w < 0:
+                raise ValueError(f'Edge {u} -> {v} has negative weight {w}; use Bellman-Ford.')
+            if closed[v]:
+                continue
+            stats['relaxations'] += 1
+            nd = dist[u] + w
+            if nd < dist[v]:
+                dist[v] = nd
+                prev[v] = u
+                if v in queue:
+                    queue.decrease_key(v, nd + h(v))
+                    stats['decrease_keys'] += 1
+                else:
+                    queue.push(v, nd + h(v))
+                    stats['pushes'] += 1
+                if steps is not None:
+                    steps.append((dist.copy(), closed.copy(), v, (u, v), f'Relax {u} -> {v}: distance {nd}, key {nd + h(v):.1f}.', _rounded(queue)))
+    if dist[target] == INF:
+        return INF, [], stats
+    return dist[target], trace_path(prev, source, target), stats
+
+def _merged(dist):
+    # One label per node for the scene: the smaller of the two searches' distances
+    return [min(a, b) for a, b in zip(*dist)]
+
+def bidirectional_dijkstra(graph, source, target, reverse=None, steps=None):
+    """Dijkstra from source on graph and from target on its reverse, expanding the lower heap top.
+
+    Stops once the two heap tops together reach the best source-target
+    distance seen through any scanned arc. Returns (distance, path, stats).
+    """
+    reverse = reverse_graph(graph) if reverse is None else reverse
+    n = len(graph)
+    graphs = (graph, reverse)
+    dist = ([INF] * n, [INF] * n)
+    prev = ([None] * n, [None] * n)
+    settled = ([False] * n, [False] * n)
+    queues = (IndexedMinHeap(n), IndexedMinHeap(n))
+    stats = {'settled': 0, 'relaxations': 0, 'pushes': 2, 'pops': 0, 'decrease_keys': 0}
+    dist[0][source] = dist[1][target] = 0
+    queues[0].push(source, 0)
+    queues[1].push(target, 0)
+    best, meet = (0, source) if source == target else (INF, None)
+    names = ('forward', 'backward')
+    while queues[0] and queues[1] and queues[0].keys[0] + queues[1].keys[0] < best:
+        side = 0 if queues[0].keys[0] <= queues[1].keys[0] else 1
+        ours, theirs = dist[side], dist[1 - side]
+        u, d = queues[side].pop()
+        settled[side][u] = True
+        stats['pops'] += 1
+        stats['settled'] += 1
+        if steps is not None:
+            both = [a or b for a, b in zip(*settled)]
+            steps.append((_merged(dist), both, u, None, f'The {names[side]} search settles node {u} at distance {d}.'))
+        for v, w in graphs[side][u]:
+            if w < 0:
+                raise ValueError(f'Edge with negative weight {w} at node {u}; use Bellman-Ford.')
+            if settled[side][v]:
+                continue
+            stats['relaxations'] += 1
+            nd = d + w
+            if nd < ours[v]:
+                ours[v] = nd
+                prev[side][v] = u
+                if v in queues[side]:
+                    queues[side].decrease_key(v, nd)
+                    stats['decrease_keys'] += 1
+                else:
+                    queues[side].push(v, nd)
+                    stats['pushes'] += 1
+            if nd + theirs[v] < best:
+                best, meet = nd + theirs[v], v
+            if steps is not None:
+                edge = (u, v) if side == 0 else (v, u)
+                met = f' Both searches reach it: best distance so far {best}.' if theirs[v] != INF else ''
+                steps.append((_merged(dist), [a or b for a, b in zip(*settled)], v, edge, f'The {names[side]} search relaxes {edge[0]} -> {edge[1]}: {names[side]} distance of {v} is {ours[v]}.{met}'))
+    if meet is None:
+        return INF, [], stats
+    path = trace_path(prev[0], source, meet)
+    v = meet
+    while v != target:
+        v = prev[1][v]
+        path.append(v)
+    return best, path, stats
+
+def bellman_ford(graph, source, steps=None):
+    """Bellman-Ford in vectorized rounds, relaxing only the arcs out of nodes that changed.
+
+    Returns (dist, prev, stats, cycle). After n rounds with changes left a
+    negative cycle is reachable from source; cycle then lists its nodes
+    (dist is not meaningful), otherwise cycle is None.
+    """
+    n = len(graph)
+    if not isinstance(graph, CSRGraph):
+        graph = CSRGraph.from_edges(*graph_arcs(graph), n)
+    offsets, targets, weights = graph.offsets, np.asarray(graph.targets, dtype=np.int64), np.asarray(graph.weights)
+    number = int if weights.dtype.kind in 'iu' else float
+    dist = np.full(n, np.inf)
+    prev = np.full(n, -1, dtype=np.int64)
+    dist[source] = 0
+    stats = {'rounds': 0, 'relaxations': 0, 'updates': 0}
+    changed = np.array([source])
+    cycle = None
+    if steps is not None:
+        steps.append(([0 if v == source else INF for v in range(n)], None, source, None, f'Start at node {source} with distance 0. Each round relaxes the arcs leaving nodes whose distance just changed.'))
+    while len(changed):
+        if stats['rounds'] == n:
+            cycle = _negative_cycle(prev, int(changed[0]), n)
+            break
+        stats['rounds'] += 1
+        # Every arc leaving a node whose distance changed last round
+        starts = offsets[changed]
+        counts = offsets[changed + 1] - starts
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        arcs = np.repeat(starts, counts) + np.arange(int(counts.sum())) - first
+        src = np.repeat(changed, counts)
+        dst = targets[arcs]
+        candidate = dist[src] + weights[arcs]
+        better = np.flatnonzero(candidate < dist[dst])
+        stats['relaxations'] += len(arcs)
+        # Best candidate per improved node
+        better = better[np.lexsort((candidate[better], dst[better]))]
+        better = better[np.r_[True, dst[better][1:] != dst[better][:-1]]] if len(better) else better
+        if steps is not None:
+            shown = [number(d) if d != np.inf else INF for d in dist.tolist()]
+            for k in better.tolist():
+                u, v = int(src[k]), int(dst[k])
+                old = shown[v]
+                shown[v] = number(candidate[k])
+                steps.append((shown.copy(), None, v, (u, v), f"Round {stats['rounds']}: relax {u} -> {v}, distance {'∞' if old == INF else old} becomes {shown[v]}."))
+        dist[dst[better]] = candidate[better]
+        prev[dst[better]] = src[better]
+        stats['updates'] += len(better)
+        changed = np.unique(dst[better])
+    dist = [number(d) if d != np.inf else INF for d in dist.tolist()]
+    return dist, [p if p >= 0 else None for p in prev.tolist()], stats, cycle
+
+def _negative_cycle(prev, v, n):
+    # n steps back along predecessors from a node still improving land on the cycle
+    for _ in range(n):
+        v = int(prev[v])
+    cycle = [v]
+    u = int(prev[v])
+    while u != v:
+        cycle.append(u)
+        u = int(prev[u])
+    return cycle[::-1]
+
+# --- All-pairs shortest paths ---
+APSP_METHODS = ['Auto', 'Repeated Dijkstra (process pool)', 'Floyd–Warshall (blocked)']
+APSP_QUERY = 'All-pairs cache lookup'
+MAX_APSP_NODES = 10_000
+# Floyd–Warshall does n³ work whatever the arc count
+MAX_FLOYD_WARSHALL_NODES = 3000
+# Auto uses Floyd–Warshall once this fraction of node pairs are arcs
+DENSE_GRAPH_FRACTION = 0.05
+FLOYD_WARSHALL_BLOCK = 64
+# Larger matrices stay memory-mapped on disk instead of being read into RAM
+APSP_MEMORY_LIMIT = 256 * 2**20
+
+def _dijkstra_row(offsets, targets, weights, source):
+    # Lazy-deletion heapq Dijkstra over CSR lists: the fastest pure-Python form for whole rows
+    dist = [INF] * (len(offsets) - 1)
+    pred = [-1] * (len(offsets) - 1)
+    dist[source] = 0
+    heap = [(0, source)]
+    pop, push = heapq.heappop, heapq.heappush
+    while heap:
+        d, u = pop(heap)
+        if d > dist[u]:
+            continue
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                pred[v] = u
+                push(heap, (nd, v))
+    return dist, pred
+
+def _apsp_rows_task(graph_specs, directory, lo, hi, unreachable):
+    # Fills rows lo..hi of the shared dist/pred memory maps, one Dijkstra per source
+    t0 = time.perf_counter()
+    shared = [SharedArray.attach(spec) for spec in graph_specs]
+    offsets, targets, weights = [s.array.tolist() for s in shared]
+    for s in shared:
+        s.close()
+    dist = np.load(os.path.join(directory, 'dist.npy'), mmap_mode='r+')
+    pred = np.load(os.path.join(directory, 'pred.npy'), mmap_mode='r+')
+    for source in range(lo, hi):
+        d, p = _dijkstra_row(offsets, targets, weights, source)
+        row = np.array(d, dtype=np.float64)
+        row[np.isinf(row)] = unreachable
+        dist[source] = row
+        pred[source] = p
+    dist.flush()
+    pred.flush()
+    return os.getpid(), time.perf_counter() - t0
+
+class APSPCache:
+    """Distance and predecessor matrices for every (source, target) pair.
+
+    dist[s, t] is int32 when every path length fits (int64 or float64
+    otherwise) and holds `unreachable` where there is no path; pred[s, t] is
+    the node before t on a shortest s-t path, or -1. Matrices above
+    APSP_MEMORY_LIMIT stay memory-mapped .npy files until close().
+    """
+    def __init__(self, graph, method='Auto', workers=1):
+        n = len(graph)
+        src, dst, weights = graph_arcs(graph)
+        negative = len(weights) and weights.min() < 0
+        if method == 'Auto':
+            dense = len(src) >= DENSE_GRAPH_FRACTION * n * n
+            method = APSP_METHODS[2] if (dense or negative) and n <= MAX_FLOYD_WARSHALL_NODES else APSP_METHODS[1]
+        if method == APSP_METHODS[1] and negative:
+            raise ValueError('Repeated Dijkstra needs non-negative weights; use Floyd–Warshall.')
+        if method == APSP_METHODS[2] and n > MAX_FLOYD_WARSHALL_NODES:
+            raise ValueError(f'Floyd–Warshall is limited to {MAX_FLOYD_WARSHALL_NODES:,} nodes.')
+        self.n = n
+        self.method = method
+        self.workers = workers if method == APSP_METHODS[1] else 1
+        if weights.dtype.kind == 'f':
+            dtype, self.unreachable = np.float64, INF
+        else:
+            # Half the dtype's range, so unreachable + unreachable still fits and
+            # anything above half of that is known to be unreachable
+            bound = n * int(np.abs(weights).max()) if len(weights) else 0
+            dtype = np.int32 if bound < 2**28 else np.int64
+            self.unreachable = int(np.iinfo(dtype).max // 2)
+        pred_type = np.int16 if n < 2**15 else np.int32
+        self.directory = tempfile.mkdtemp(prefix='apsp_')
+        self._cleanup = weakref.finalize(self, shutil.rmtree, self.directory, True)
+        t0 = time.perf_counter()
+        try:
+            self.dist = np.lib.format.open_memmap(os.path.join(self.directory, 'dist.npy'), 'w+', dtype, (n, n))
+            self.pred = np.lib.format.open_memmap(os.path.join(self.directory, 'pred.npy'), 'w+', pred_type, (n, n))
+            if method == APSP_METHODS[2]:
+                self._floyd_warshall(src, dst, weights)
+            else:
+                self._repeated_dijkstra(graph)
+        except BaseException:
+            self.close()
+            raise
+        self.in_memory = self.nbytes <= APSP_MEMORY_LIMIT
+        if self.in_memory:
+            self.dist, self.pred = np.array(self.dist), np.array(self.pred)
+            self._cleanup()
+            self.directory = None
+        self.elapsed = time.perf_counter() - t0
+
+    @property
+    def nbytes(self):
+        return self.dist.nbytes + self.pred.nbytes
+
+    def _repeated_dijkstra(self, graph):
+        if not isinstance(graph, CSRGraph):
+            src, dst, weights = graph_arcs(graph)
+            graph = CSRGraph.from_edges(src, dst, weights, self.n)
+        shared = [SharedArray.from_array(np.asarray(a)) for a in (graph.offsets, graph.targets, graph.weights)]
+        try:
+            specs = [s.spec() for s in shared]
+            # Several row bands per worker even out sources with larger reach
+            bounds = _even_bounds(0, self.n, self.workers * 4)
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = [pool.submit(_apsp_rows_task, specs, self.directory, lo, hi, self.unreachable)
+                           for lo, hi in zip(bounds, bounds[1:]) if lo < hi]
+                for future in futures:
+                    future.result()
+        finally:
+            for s in shared:
+                s.close()
+
+    def _floyd_warshall(self, src, dst, weights):
+        # Blocked: rows of pivot block K are finished first, then each band of
+        # rows relaxes through all of K while it is still in cache
+        n = self.n
+        dist, pred = self.dist, self.pred
+        unreachable = self.unreachable
+        for lo in range(0, n, FLOYD_WARSHALL_BLOCK):
+            hi = min(n, lo + FLOYD_WARSHALL_BLOCK)
+            dist[lo:hi] = unreachable
+            pred[lo:hi] = -1
+            rows = np.arange(lo, hi)
+            dist[rows, rows] = 0
+        # Parallel arcs keep their lightest weight
+        order = np.lexsort((weights, dst, src))
+        first = np.r_[True, (src[order][1:] != src[order][:-1]) | (dst[order][1:] != dst[order][:-1])] if len(order) else order
+        keep = order[first]
+        u, v, w = src[keep], dst[keep], weights[keep]
+        better = w < dist[u, v]
+        dist[u[better], v[better]] = w[better]
+        pred[u[better], v[better]] = u[better]
+        bands = [(lo, min(n, lo + FLOYD_WARSHALL_BLOCK)) for lo in range(0, n, FLOYD_WARSHALL_BLOCK)]
+        for k0, k1 in bands:
+            self._relax_band(k0, k1, k0, k1)
+            for lo, hi in bands:
+                if lo != k0:
+                    self._relax_band(lo, hi, k0, k1)
+        if unreachable != INF:
+            # Negative arcs can pull unreachable sums just below the sentinel
+            for lo, hi in bands:
+                band = dist[lo:hi]
+                lost = band > unreachable // 2
+                band[lost] = unreachable
+                pred[lo:hi][lost] = -1
+        cycle = np.flatnonzero(np.diagonal(dist) < 0)
+        if len(cycle):
+            raise ValueError(f'Negative cycle through node {int(cycle[0])}.')
+
+    def _relax_band(self, lo, hi, k0, k1):
+        # Rows lo..hi through pivots k0..k1; the pivot band reads its own rows as they improve
+        dist = np.array(self.dist[lo:hi])
+        pred = np.array(self.pred[lo:hi])
+        for k in range(k0, k1):
+            if lo == k0:
+                row, row_pred = dist[k - lo], pred[k - lo]
+            else:
+                row, row_pred = self.dist[k], self.pred[k]
+            through = dist[:, k, None] + row
+            better = through < dist
+            np.copyto(dist, through, where=better)
+            np.copyto(pred, row_pred, where=better)
+        self.dist[lo:hi] = dist
+        self.pred[lo:hi] = pred
+
+    def distance(self, source, target):
+        d = self.dist[source, target].item()
+        return INF if d >= self.unreachable else d
+
+    def path(self, source, target):
+        if self.distance(source, target) == INF:
+            return []
+        path = [target]
+        pred = self.pred[source]
+        while path[-1] != source:
+            path.append(int(pred[path[-1]]))
+        return path[::-1]
+
+    def row(self, source):
+        """(dist, prev) lists from source, in the form dijkstra_heap returns them"""
+        d = self.dist[source]
+        dist = d.tolist()
+        for t in np.flatnonzero(d >= self.unreachable).tolist():
+            dist[t] = INF
+        prev = [None if p < 0 else p for p in self.pred[source].tolist()]
+        return dist, prev
+
+    def close(self):
+        # Memory maps must be dropped before their files can be removed
+        self.dist = self.pred = None
+        self._cleanup()
+
+# --- Contraction hierarchies ---
+CH_QUERY = 'Contraction hierarchy'
+MAX_HIERARCHY_NODES = 100_000
+# Witness searches give up after settling this many nodes; an unneeded shortcut is the only cost
+WITNESS_SETTLE_LIMIT = 60
+# Contraction order drawn from blue (contracted first) to red (contracted last)
+LEVEL_COLORS = [QColor(60 + 195 * i // 7, 110 - 50 * i // 7, 230 - 150 * i // 7) for i in range(8)]
+
+class ContractionHierarchy:
+    """Nodes ranked by contraction order plus the shortcuts that preserve distances.
+
+    The next node contracted has the smallest edge difference (shortcuts it
+    needs minus arcs it removes, plus already contracted neighbors to spread
+    contraction evenly), re-evaluated lazily when it reaches the top of the
+    heap. Queries search only towards higher ranks, from both ends.
+    """
+    def __init__(self, graph):
+        t0 = time.perf_counter()
+        n = len(graph)
+        src, dst, weights = graph_arcs(graph)
+        if len(weights) and weights.min() < 0:
+            raise ValueError('Contraction hierarchies need non-negative weights.')
+        out = [{} for _ in range(n)]
+        inc = [{} for _ in range(n)]
+        for a, b, w in zip(src.tolist(), dst.tolist(), weights.tolist()):
+            if a != b and w < out[a].get(b, INF):
+                out[a][b] = w
+                inc[b][a] = w
+        self.n = n
+        self.num_arcs = sum(map(len, out))
+        # Shortcut (u, w) -> the contracted node it bypasses, for unpacking paths
+        self.middle = {}
+        self.rank = [0] * n
+        self.up = [None] * n
+        self.down = [None] * n
+        self.stats = {'witness_searches': 0, 'witness_settled': 0, 'lazy_updates': 0}
+        contracted_neighbors = [0] * n
+        heap = []
+        for v in range(n):
+            heap.append((self._priority(v, out, inc, contracted_neighbors, self._shortcuts(v, out, inc)), v))
+        heapq.heapify(heap)
+        order = 0
+        while heap:
+            _, v = heapq.heappop(heap)
+            shortcuts = self._shortcuts(v, out, inc)
+            priority = self._priority(v, out, inc, contracted_neighbors, shortcuts)
+            if heap and priority > heap[0][0]:
+                self.stats['lazy_updates'] += 1
+                heapq.heappush(heap, (priority, v))
+                continue
+            for u, w, d in shortcuts:
+                out[u][w] = d
+                inc[w][u] = d
+                self.middle[(u, w)] = v
+            # Every remaining neighbor outranks v: its arcs now are v's upward arcs
+            self.rank[v] = order
+            order += 1
+            self.up[v] = list(out[v].items())
+            self.down[v] = list(inc[v].items())
+            for u in inc[v]:
+                del out[u][v]
+                contracted_neighbors[u] += 1
+            for w in out[v]:
+                del inc[w][v]
+                contracted_neighbors[w] += 1
+        self.shortcut_count = len(self.middle)
+        self.elapsed = time.perf_counter() - t0
+
+    @staticmethod
+    def _priority(v, out, inc, contracted_neighbors, shortcuts):
+        return len(shortcuts) - len(out[v]) - len(inc[v]) + contracted_neighbors[v]
+
+    def _shortcuts(self, v, out, inc):
+        # (u, w, length) for each u -> v -> w with no witness path avoiding v that is as short
+        shortcuts = []
+        targets = out[v]
+        if not targets:
+            return shortcuts
+        longest_out = max(targets.values())
+        for u, wu in inc[v].items():
+            limit = wu + longest_out
+            dist = {u: 0}
+            heap = [(0, u)]
+            settled = 0
+            while heap and settled < WITNESS_SETTLE_LIMIT:
+                d, x = heapq.heappop(heap)
+                if d > dist[x]:
+                    continue
+                if d > limit:
+                    break
+                settled += 1
+                for y, wy in out[x].items():
+                    nd = d + wy
+                    if y != v and nd < dist.get(y, INF):
+                        dist[y] = nd
+                        heapq.heappush(heap, (nd, y))
+            self.stats['witness_searches'] += 1
+            self.stats['witness_settled'] += settled
+            for w, ww in targets.items():
+                if w != u and wu + ww < dist.get(w, INF):
+                    shortcuts.append((u, w, wu + ww))
+        return shortcuts
+
+    def query(self, source, target):
+        """(distance, path, stats) from two Dijkstra searches that only climb in rank"""
+        dist = ({source: 0}, {target: 0})
+        parent = ({source: None}, {target: None})
+        heaps = ([(0, source)], [(0, target)])
+        arcs = (self.up, self.down)
+        stats = {'settled': 0, 'relaxations': 0}
+        best, meet = (0, source) if source == target else (INF, None)
+        while heaps[0] or heaps[1]:
+            # Either side stops once its smallest key cannot improve the best meeting
+            side = 0 if heaps[0] and (not heaps[1] or heaps[0][0][0] <= heaps[1][0][0]) else 1
+            d, x = heapq.heappop(heaps[side])
+            if d >= best:
+                heaps[side].clear()
+                continue
+            if d > dist[side][x]:
+                continue
+            stats['settled'] += 1
+            other = dist[1 - side].get(x)
+            if other is not None and d + other < best:
+                best, meet = d + other, x
+            for y, w in arcs[side][x]:
+                stats['relaxations'] += 1
+                nd = d + w
+                if nd < dist[side].get(y, INF):
+                    dist[side][y] = nd
+                    parent[side][y] = x
+                    heapq.heappush(heaps[side], (nd, y))
+        if meet is None:
+            return INF, [], stats
+        forward = [meet]
+        while parent[0][forward[-1]] is not None:
+            forward.append(parent[0][forward[-1]])
+        backward = [meet]
+        while parent[1][backward[-1]] is not None:
+            backward.append(parent[1][backward[-1]])
+        return best, self.unpack(forward[::-1] + backward[1:]), stats
+
+    def unpack(self, path):
+        """Replaces every shortcut on a hierarchy path by the arcs it stands for"""
+        result = [path[0]]
+        stack = [(a, b) for a, b in zip(path[::-1][1:], path[::-1])]
+        while stack:
+            a, b = stack.pop()
+            v = self.middle.get((a, b))
+            if v is None:
+                result.append(b)
+            else:
+                stack.append((v, b))
+                stack.append((a, v))
+        return result
+
+    def shortcut_arcs(self):
+        """(u, w) arrays of the shortcuts"""
+        pairs = np.array(list(self.middle), dtype=np.int64).reshape(-1, 2)
+        return pairs[:, 0], pairs[:, 1]
+
+    def benchmark(self, graph, queries=100, seed=0):
+        """Average seconds per query for the hierarchy and for Dijkstra stopped at the target"""
+        rng = random.Random(seed)
+        pairs = [(rng.randrange(self.n), rng.randrange(self.n)) for _ in range(queries)]
+        settled = [0, 0]
+        t0 = time.perf_counter()
+        answers = []
+        for s, t in pairs:
+            d, _, stats = self.query(s, t)
+            answers.append(d)
+            settled[0] += stats['settled']
+        hierarchy = (time.perf_counter() - t0) / queries
+        t0 = time.perf_counter()
+        matched = 0
+        for (s, t), d in zip(pairs, answers):
+            expected, _, stats = astar(graph, s, t)
+            matched += expected == d
+            settled[1] += stats['settled']
+        dijkstra = (time.perf_counter() - t0) / queries
+        return hierarchy, dijkstra, settled[0] / queries, settled[1] / queries, matched
+
+# --- Minimum spanning trees ---
+MST_ALGORITHMS = ['Prim (lazy heap)', 'Prim (eager, indexed heap)', 'Kruskal (union-find)']
+MAX_MST_BENCHMARK_EDGES = 1_000_000
+
+class UnionFind:
+    """Disjoint sets with path compression and union by rank"""
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.rank = [0] * n
+        # Parent links followed by find, the cost compression keeps near constant
+        self.links = 0
+
+    def find(self, x):
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+            self.links += 1
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a, b):
+        """Merges the sets of a and b; False when they already share one"""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.rank[a] < self.rank[b]:
+            a, b = b, a
+        self.parent[b] = a
+        if self.rank[a] == self.rank[b]:
+            self.rank[a] += 1
+        return True
+
+def undirected_edges(graph):
+    """(u, v, w) arrays with every undirected edge once, the lightest of any parallel arcs"""
+    src, dst, weights = graph_arcs(graph)
+    lo, hi = np.minimum(src, dst), np.maximum(src, dst)
+    keep = lo != hi
+    lo, hi, weights = lo[keep], hi[keep], weights[keep]
+    order = np.lexsort((weights, hi, lo))
+    lo, hi, weights = lo[order], hi[order], weights[order]
+    first = np.r_[True, (lo[1:] != lo[:-1]) | (hi[1:] != hi[:-1])] if len(lo) else np.zeros(0, dtype=bool)
+    return lo[first], hi[first], weights[first]
+
+def _adjacency_lists(graph):
+    # Undirected CSR as Python lists, the fastest form for per-arc loops
+    u, v, w = undirected_edges(graph)
+    csr = CSRGraph.from_edges(u, v, w, len(graph), directed=False)
+    return csr.offsets.tolist(), csr.targets.tolist(), csr.weights.tolist()
+
+def prim_lazy(graph, steps=None):
+    """Prim with a binary heap of candidate edges; edges into the tree are skipped when popped.
+
+    Grows a minimum spanning forest, one tree per component, and returns
+    (edges, total weight, stats). Recorded steps are (node, edge, style,
+    explanation, queue) with the heap array as (edge, weight) rows.
+    """
+    offsets, targets, weights = _adjacency_lists(graph)
+    n = len(offsets) - 1
+    in_tree = [False] * n
+    tree, total = [], 0
+    stats = {'considered': 0, 'pushes': 0, 'pops': 0, 'stale': 0}
+    snapshot = lambda heap: [(f'{u}-{v}', w) for w, u, v in heap]
+    for root in range(n):
+        if in_tree[root]:
+            continue
+        in_tree[root] = True
+        heap = []
+        for k in range(offsets[root], offsets[root + 1]):
+            heapq.heappush(heap, (weights[k], root, targets[k]))
+        stats['pushes'] += len(heap)
+        if steps is not None:
+            steps.append((root, None, None, f'Start a tree at node {root} and queue its {len(heap)} edges.', snapshot(heap)))
+        while heap:
+            w, u, v = heapq.heappop(heap)
+            stats['pops'] += 1
+            stats['considered'] += 1
+            if in_tree[v]:
+                stats['stale'] += 1
+                if steps is not None:
+                    steps.append((None, (u, v), None, f'Edge {u}-{v} ({w}) is stale: node {v} is already in the tree.', snapshot(heap)))
+                continue
+            in_tree[v] = True
+            tree.append((u, v, w))
+            total += w
+            for k in range(offsets[v], offsets[v + 1]):
+                if not in_tree[targets[k]]:
+                    heapq.heappush(heap, (weights[k], v, targets[k]))
+                    stats['pushes'] += 1
+            if steps is not None:
+                steps.append((v, (u, v), EDGE_TREE, f'Lightest edge leaving the tree is {u}-{v} ({w}): node {v} joins.', snapshot(heap)))
+    return tree, total, stats
+
+def prim_eager(graph, steps=None):
+    """Prim keeping one heap entry per node, keyed by its lightest edge to the tree (decrease-key).
+
+    Same results as prim_lazy; recorded steps carry the heap as (node, key) rows.
+    """
+    offsets, targets, weights = _adjacency_lists(graph)
+    n = len(offsets) - 1
+    in_tree = [False] * n
+    best = [INF] * n
+    edge_to = [-1] * n
+    tree, total = [], 0
+    stats = {'considered': 0, 'pushes': 0, 'pops': 0, 'decrease_keys': 0}
+    queue = IndexedMinHeap(n)
+    for root in range(n):
+        if in_tree[root]:
+            continue
+        best[root] = 0
+        queue.push(root, 0)
+        stats['pushes'] += 1
+        while queue:
+            v, w = queue.pop()
+            stats['pops'] += 1
+            in_tree[v] = True
+            u = edge_to[v]
+            if u >= 0:
+                tree.append((u, v, w))
+                total += w
+            for k in range(offsets[v], offsets[v + 1]):
+                x, wx = targets[k], weights[k]
+                stats['considered'] += 1
+                if in_tree[x] or wx >= best[x]:
+                    continue
+                best[x] = wx
+                edge_to[x] = v
+                if x in queue:
+                    queue.decrease_key(x, wx)
+                    stats['decrease_keys'] += 1
+                else:
+                    queue.push(x, wx)
+                    stats['pushes'] += 1
+            if steps is not None:
+                if u < 0:
+                    steps.append((v, None, None, f'Start a tree at node {v}; its neighbors are keyed by their edge weights.', queue.snapshot()))
+                else:
+                    steps.append((v, (u, v), EDGE_TREE, f'Node {v} has the lightest edge to the tree, {u}-{v} ({w}); its neighbors\' keys are lowered.', queue.snapshot()))
+    return tree, total, stats
+
+def kruskal(graph, steps=None):
+    """Kruskal: edges by increasing weight, kept unless union-find shows a cycle.
+
+    Same results as prim_lazy; recorded steps have no queue.
+    """
+    u, v, w = undirected_edges(graph)
+    order = np.argsort(w, kind='stable')
+    sets = UnionFind(len(graph))
+    tree, total = [], 0
+    stats = {'considered': 0, 'unions': 0, 'links_followed': 0}
+    wanted = len(graph) - 1
+    for a, b, weight in zip(u[order].tolist(), v[order].tolist(), w[order].tolist()):
+        if len(tree) == wanted:
+            break
+        stats['considered'] += 1
+        if sets.union(a, b):
+            tree.append((a, b, weight))
+            total += weight
+            if steps is not None:
+                steps.append((None, (a, b), EDGE_TREE, f'Edge {a}-{b} ({weight}) joins two components: keep it.', None))
+        elif steps is not None:
+            steps.append((None, (a, b), None, f'Edge {a}-{b} ({weight}) would close a cycle: skip it.', None))
+    stats['unions'] = len(tree)
+    stats['links_followed'] = sets.links
+    return tree, total, stats
+
+MST_FUNCTIONS = dict(zip(MST_ALGORITHMS, (prim_lazy, prim_eager, kruskal)))
+
+# --- Graph traversal ---
+TRAVERSALS = ['BFS', 'DFS', 'Topological sort (Kahn)', 'SCC (Tarjan)', 'SCC (Kosaraju)']
+# Panel title, entry kind and key label of each traversal's queue or stack
+TRAVERSAL_PANELS = {
+    'BFS': ('Frontier (FIFO queue)', 'node', 'depth'),
+    'DFS': ('Stack (top first)', 'node', 'arc'),
+    'Topological sort (Kahn)': ('Ready (in-degree 0)', 'node', 'in'),
+    'SCC (Tarjan)': ('Tarjan stack (top first)', 'node', 'low'),
+    'SCC (Kosaraju)': ('DFS stack (top first)', 'node', 'arc'),
+}
+ORIENTATIONS = ['As loaded', 'Acyclic (lower id to higher id)', 'Random direction per edge']
+
+def csr_lists(graph):
+    """offsets and targets of a CSR or adjacency-list graph as Python lists"""
+    if not isinstance(graph, CSRGraph):
+        src, dst, weights = graph_arcs(graph)
+        graph = CSRGraph.from_edges(src, dst, weights, len(graph))
+    return graph.offsets.tolist(), graph.targets.tolist()
+
+def orient_edges(graph, orientation, seed=0):
+    """Directed copy keeping one arc per undirected edge, for topological sorts and SCCs"""
+    if orientation == ORIENTATIONS[0]:
+        return graph
+    u, v, w = undirected_edges(graph)
+    if orientation == ORIENTATIONS[2]:
+        flip = np.random.default_rng(seed).random(len(u)) < 0.5
+        u, v = np.where(flip, v, u), np.where(flip, u, v)
+    return CSRGraph.from_edges(u, v, w, len(graph), positions=getattr(graph, 'positions', None))
+
+def bfs(graph, source, steps=None):
+    """Breadth-first search; the visit order doubles as the FIFO queue.
+
+    Returns (order, parent, depth, stats) with depth -1 for unreached nodes.
+    Recorded steps are (node, edge, style, explanation, frontier).
+    """
+    offsets, targets = csr_lists(graph)
+    n = len(offsets) - 1
+    depth = [-1] * n
+    parent = [None] * n
+    depth[source] = 0
+    order = [source]
+    head = 0
+    arcs = 0
+    while head < len(order):
+        u = order[head]
+        head += 1
+        lo, hi = offsets[u], offsets[u + 1]
+        arcs += hi - lo
+        if steps is not None:
+            steps.append((u, None, None, f'Dequeue node {u} (depth {depth[u]}) and scan its {hi - lo} arcs.', [(x, depth[x]) for x in order[head:]]))
+        for k in range(lo, hi):
+            v = targets[k]
+            if depth[v] < 0:
+                depth[v] = depth[u] + 1
+                parent[v] = u
+                order.append(v)
+                if steps is not None:
+                    steps.append((v, (u, v), EDGE_TREE, f'Discover node {v} at depth {depth[v]} and enqueue it.', [(x, depth[x]) for x in order[head:]]))
+    return order, parent, depth, {'visited': len(order), 'arcs_scanned': arcs}
+
+def _stack_rows(stack, offsets):
+    # (node, arcs scanned/degree) rows of a DFS stack, top first
+    return [(u, f'{k - offsets[u]}/{offsets[u + 1] - offsets[u]}') for u, k in reversed(stack)]
+
+def dfs(graph, source, steps=None):
+    """Depth-first search on an explicit stack of [node, next arc] frames, so depth is not limited by recursion.
+
+    Returns (preorder, parent, stats).
+    """
+    offsets, targets = csr_lists(graph)
+    n = len(offsets) - 1
+    seen = [False] * n
+    parent = [None] * n
+    seen[source] = True
+    order = [source]
+    stack = [[source, offsets[source]]]
+    stats = {'visited': 1, 'arcs_scanned': 0, 'max_stack': 1}
+    if steps is not None:
+        steps.append((source, None, None, f'Push node {source}.', _stack_rows(stack, offsets)))
+    while stack:
+        frame = stack[-1]
+        u, k = frame
+        if k == offsets[u + 1]:
+            stack.pop()
+            if steps is not None:
+                steps.append((u, None, None, f'Node {u} has no arcs left: pop it.', _stack_rows(stack, offsets)))
+            continue
+        frame[1] = k + 1
+        stats['arcs_scanned'] += 1
+        v = targets[k]
+        if not seen[v]:
+            seen[v] = True
+            parent[v] = u
+            order.append(v)
+            stack.append([v, offsets[v]])
+            stats['max_stack'] = max(stats['max_stack'], len(stack))
+            if steps is not None:
+                steps.append((v, (u, v), EDGE_TREE, f'Follow {u}-{v} to unvisited node {v} and push it.', _stack_rows(stack, offsets)))
+    stats['visited'] = len(order)
+    return order, parent, stats
+
+def topological_sort(graph, steps=None):
+    """Kahn's algorithm: repeatedly output a node with no remaining incoming arcs.
+
+    Returns (order, stats); nodes missing from order lie on or behind a cycle.
+    """
+    offsets, targets = csr_lists(graph)
+    n = len(offsets) - 1
+    indegree = np.bincount(np.asarray(targets, dtype=np.int64), minlength=n).tolist()
+    order = [v for v in range(n) if indegree[v] == 0]
+    head = 0
+    arcs = 0
+    while head < len(order):
+        u = order[head]
+        head += 1
+        lo, hi = offsets[u], offsets[u + 1]
+        arcs += hi - lo
+        if steps is not None:
+            steps.append((u, None, None, f'Output node {u} as number {head} and remove its {hi - lo} arcs.', [(x, 0) for x in order[head:]]))
+        for k in range(lo, hi):
+            v = targets[k]
+            indegree[v] -= 1
+            if indegree[v] == 0:
+                order.append(v)
+                if steps is not None:
+                    steps.append((v, (u, v), EDGE_TREE, f'Arc {u}->{v} was the last one into node {v}: it is ready.', [(x, 0) for x in order[head:]]))
+    return order, {'ordered': len(order), 'arcs_scanned': arcs}
+
+def tarjan_scc(graph, steps=None):
+    """Tarjan's strongly connected components with explicit call and component stacks.
+
+    Returns (component of each node, number of components, stats);
+    components are numbered in reverse topological order of the condensation.
+    """
+    offsets, targets = csr_lists(graph)
+    n = len(offsets) - 1
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    component = [-1] * n
+    stack = []
+    counter = count = 0
+    stats = {'arcs_scanned': 0, 'max_stack': 0}
+    rows = lambda: [(x, low[x]) for x in reversed(stack)]
+    for root in range(n):
+        if index[root] >= 0:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        call = [[root, offsets[root]]]
+        if steps is not None:
+            steps.append((root, None, None, f'Start at node {root} with index {index[root]}.', rows()))
+        while call:
+            frame = call[-1]
+            u, k = frame
+            if k < offsets[u + 1]:
+                frame[1] = k + 1
+                stats['arcs_scanned'] += 1
+                v = targets[k]
+                if index[v] < 0:
+                    index[v] = low[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = True
+                    call.append([v, offsets[v]])
+                    stats['max_stack'] = max(stats['max_stack'], len(stack))
+                    if steps is not None:
+                        steps.append((v, (u, v), EDGE_TREE, f'Follow {u}->{v}: node {v} gets index {index[v]}.', rows()))
+                elif on_stack[v] and index[v] < low[u]:
+                    low[u] = index[v]
+                    if steps is not None:
+                        steps.append((u, (u, v), None, f'Arc {u}->{v} reaches back into the stack: low({u}) = {low[u]}.', rows()))
+                continue
+            call.pop()
+            if call:
+                p = call[-1][0]
+                low[p] = min(low[p], low[u])
+            if low[u] == index[u]:
+                size = 0
+                while True:
+                    x = stack.pop()
+                    on_stack[x] = False
+                    component[x] = count
+                    size += 1
+                    if x == u:
+                        break
+                if steps is not None:
+                    steps.append((u, None, None, f'low({u}) equals its index: pop {size} node(s) as component {count}.', rows()))
+                count += 1
+    return component, count, stats
+
+def kosaraju_scc(graph, steps=None):
+    """Kosaraju: finish order of a DFS on the graph, then DFS on the reversed graph in reverse finish order.
+
+    Same results as tarjan_scc, with components numbered in topological order.
+    """
+    offsets, targets = csr_lists(graph)
+    n = len(offsets) - 1
+    seen = [False] * n
+    finished = []
+    stats = {'arcs_scanned': 0, 'max_stack': 0}
+    for root in range(n):
+        if seen[root]:
+            continue
+        seen[root] = True
+        stack = [[root, offsets[root]]]
+        while stack:
+            frame = stack[-1]
+            u, k = frame
+            if k == offsets[u + 1]:
+                stack.pop()
+                finished.append(u)
+                if steps is not None:
+                    steps.append((u, None, None, f'Pass 1: node {u} finishes {len(finished)}th.', _stack_rows(stack, offsets)))
+                continue
+            frame[1] = k + 1
+            stats['arcs_scanned'] += 1
+            v = targets[k]
+            if not seen[v]:
+                seen[v] = True
+                stack.append([v, offsets[v]])
+                stats['max_stack'] = max(stats['max_stack'], len(stack))
+    offsets, targets = csr_lists(reverse_graph(graph))
+    component = [-1] * n
+    count = 0
+    for root in reversed(finished):
+        if component[root] >= 0:
+            continue
+        component[root] = count
+        stack = [[root, offsets[root]]]
+        if steps is not None:
+            steps.append((root, None, None, f'Pass 2: latest unfinished node {root} starts component {count} on the reversed graph.', _stack_rows(stack, offsets)))
+        while stack:
+            frame = stack[-1]
+            u, k = frame
+            if k == offsets[u + 1]:
+                stack.pop()
+                continue
+            frame[1] = k + 1
+            stats['arcs_scanned'] += 1
+            v = targets[k]
+            if component[v] < 0:
+                component[v] = count
+                stack.append([v, offsets[v]])
+                stats['max_stack'] = max(stats['max_stack'], len(stack))
+                if steps is not None:
+                    steps.append((v, (u, v), EDGE_TREE, f'Pass 2: arc {v}->{u} puts node {v} in component {count}.', _stack_rows(stack, offsets)))
+        count += 1
+    return component, count, stats
+
+# --- Parallel BFS ---
+# Frontier slices handed to one worker are at least this long (less on small
+# graphs); smaller levels use fewer workers
+MIN_FRONTIER_CHUNK = 2048
+
+def _bfs_expand_task(offsets_spec, targets_spec, owner_spec, frontier_spec, lo, hi, worker):
+    # Claims the unvisited neighbors of frontier[lo:hi] for worker in the shared owner array
+    t0 = time.perf_counter()
+    offsets, targets, owner, frontier = (SharedArray.attach(s) for s in (offsets_spec, targets_spec, owner_spec, frontier_spec))
+    nodes = frontier.array[lo:hi]
+    starts = offsets.array[nodes]
+    counts = offsets.array[nodes + 1] - starts
+    arcs = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(int(counts.sum()))
+    neighbors = targets.array[arcs]
+    claimed = np.unique(neighbors[owner.array[neighbors] < 0])
+    owner.array[claimed] = worker
+    for s in (offsets, targets, owner, frontier):
+        s.close()
+    return claimed, len(arcs), (os.getpid(), 'level', lo, hi, t0, time.perf_counter())
+
+class InlineExecutor:
+    """Runs submitted tasks right away in this process, so one kernel can be timed without a pool"""
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+def parallel_bfs(offsets, targets, owner, frontier, source, pool, workers, min_chunk=MIN_FRONTIER_CHUNK):
+    """Level-synchronous BFS over shared-memory CSR arrays.
+
+    Each level's frontier is split across the pool; a worker writes its id
+    into owner for every unvisited neighbor it finds. Two workers may claim
+    the same node in one level (the later write wins), so the next frontier
+    is deduplicated. Returns (depth, arcs scanned, levels, contended claims).
+    """
+    n = len(owner.array)
+    depth = np.full(n, -1, dtype=np.int64)
+    owner.array[:] = -1
+    owner.array[source] = 0
+    depth[source] = 0
+    frontier.array[0] = source
+    size, level, scanned, contended = 1, 0, 0, 0
+    specs = (offsets.spec(), targets.spec(), owner.spec(), frontier.spec())
+    while size:
+        parts = max(1, min(workers, size // min_chunk))
+        bounds = _even_bounds(0, size, parts)
+        futures = [pool.submit(_bfs_expand_task, *specs, lo, hi, w) for w, (lo, hi) in enumerate(zip(bounds, bounds[1:]))]
+        results = [f.result() for f in futures]
+        claimed = np.concatenate([r[0] for r in results])
+        scanned += sum(r[1] for r in results)
+        following = np.unique(claimed)
+        contended += len(claimed) - len(following)
+        level += 1
+        depth[following] = level
+        size = len(following)
+        frontier.array[:size] = following
+    return depth, scanned, level, contended
+
+def benchmark_parallel_bfs(graph, source, max_workers):
+    """Times parallel_bfs for 1..max_workers against the same kernel run in this process.
+
+    Depths are checked against the sequential bfs. Pool start-up and the copy
+    into shared memory are not timed. Returns (owner, depth, levels and
+    contended claims of the max_workers run, rows of (workers, seconds, TEPS,
+    speedup)) where workers 0 is the in-process run without a pool.
+    """
+    if not isinstance(graph, CSRGraph):
+        src, dst, weights = graph_arcs(graph)
+        graph = CSRGraph.from_edges(src, dst, weights, len(graph))
+    n = len(graph)
+    expected = np.array(bfs(graph, source)[2])
+    offsets = SharedArray.from_array(np.asarray(graph.offsets, dtype=np.int64))
+    targets = SharedArray.from_array(np.asarray(graph.targets))
+    owner = SharedArray(n, np.int16)
+    frontier = SharedArray(n, np.int64)
+    min_chunk = max(1, min(MIN_FRONTIER_CHUNK, n // 64))
+    try:
+        # Baseline: the same vectorized frontier expansion, one slice per level, no processes
+        t0 = time.perf_counter()
+        depth, scanned, levels, contended = parallel_bfs(offsets, targets, owner, frontier, source, InlineExecutor(), 1, min_chunk)
+        sequential = time.perf_counter() - t0
+        if not np.array_equal(depth, expected):
+            raise RuntimeError('Level-synchronous BFS found different depths')
+        rows = [(0, sequential, scanned / sequential, 1.0)]
+        for workers in range(1, max_workers + 1):
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(_noop_task, range(workers)))
+                t0 = time.perf_counter()
+                depth, scanned, levels, contended = parallel_bfs(offsets, targets, owner, frontier, source, pool, workers, min_chunk)
+                elapsed = time.perf_counter() - t0
+            if not np.array_equal(depth, expected):
+                raise RuntimeError(f'Parallel BFS with {workers} workers found different depths')
+            rows.append((workers, elapsed, scanned / elapsed, sequential / elapsed))
+        result = owner.array.copy()
+    finally:
+        for s in (offsets, targets, owner, frontier):
+            s.close()
+    return result, depth, levels, contended, rows
+
+# --- Maximum flow ---
+FLOW_ALGORITHMS = ['Edmonds–Karp', 'Dinic']
+
+class FlowNetwork:
+    """Residual network of a graph whose weights are capacities.
+
+    Arc e and its reverse e ^ 1 are stored side by side; arcs leaving u are
+    arcs[start[u]:start[u + 1]]. cap holds residual capacities, so the flow on
+    an original (even) arc e is capacity[e] - cap[e].
+    """
+    def __init__(self, graph):
+        src, dst, capacity = graph_arcs(graph)
+        keep = src != dst
+        src, dst, capacity = src[keep], dst[keep], capacity[keep]
+        if len(capacity) and capacity.min() < 0:
+            raise ValueError('Capacities must be non-negative.')
+        self.n = n = len(graph)
+        tails = np.empty(2 * len(src), dtype=np.int64)
+        heads = np.empty_like(tails)
+        tails[0::2], tails[1::2] = src, dst
+        heads[0::2], heads[1::2] = dst, src
+        full = np.zeros(2 * len(src), dtype=capacity.dtype)
+        full[0::2] = capacity
+        self.arcs = np.argsort(tails, kind='stable').tolist()
+        start = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tails, minlength=n), out=start[1:])
+        self.start = start.tolist()
+        self.to = heads.tolist()
+        self.capacity = full.tolist()
+        self.cap = list(self.capacity)
+
+    def reset(self):
+        self.cap = list(self.capacity)
+
+    def reachable(self, source):
+        """Nodes reachable from source through residual arcs: the source side of a minimum cut"""
+        seen = [False] * self.n
+        seen[source] = True
+        queue = [source]
+        for u in queue:
+            for i in range(self.start[u], self.start[u + 1]):
+                e = self.arcs[i]
+                if self.cap[e] > 0 and not seen[self.to[e]]:
+                    seen[self.to[e]] = True
+                    queue.append(self.to[e])
+        return seen
+
+    def edge_label(self, a, b):
+        # Net flow between a and b over every arc joining them, with the capacity in its direction
+        flow = forward = backward = 0
+        for i in range(self.start[a], self.start[a + 1]):
+            e = self.arcs[i]
+            if self.to[e] == b:
+                f = self.capacity[e & ~1] - self.cap[e & ~1]
+                if e & 1:
+                    flow -= f
+                    backward += self.capacity[e & ~1]
+                else:
+                    flow += f
+                    forward += self.capacity[e]
+        return f'{abs(flow)}/{forward if flow >= 0 else backward}'
+
+    def _augment(self, path, steps, text):
+        # Pushes the bottleneck along a path of arc ids; returns the amount
+        bottleneck = min(self.cap[e] for e in path)
+        for e in path:
+            self.cap[e] -= bottleneck
+            self.cap[e ^ 1] += bottleneck
+        if steps is not None:
+            pairs = [(self.to[e ^ 1], self.to[e]) for e in path]
+            nodes = [pairs[0][0]] + [b for _, b in pairs]
+            labels = {pair: self.edge_label(*pair) for pair in pairs}
+            steps.append((pairs, labels, None, f'{text} {" -> ".join(map(str, nodes))} carries {bottleneck}.', None))
+        return bottleneck
+
+def edmonds_karp(network, source, sink, steps=None):
+    """Ford–Fulkerson with shortest augmenting paths found by BFS: O(V E^2).
+
+    Returns (flow value, stats). Recorded steps are (path, labels, levels,
+    explanation, queue) with the arcs of each augmenting path and the new
+    flow/capacity labels of its edges.
+    """
+    start, arcs, to, cap = network.start, network.arcs, network.to, network.cap
+    total = 0
+    stats = {'augmentations': 0, 'arcs_scanned': 0}
+    while True:
+        parent = [-1] * network.n
+        parent[source] = -2
+        queue = [source]
+        for u in queue:
+            if parent[sink] != -1:
+                break
+            for i in range(start[u], start[u + 1]):
+                e = arcs[i]
+                stats['arcs_scanned'] += 1
+                if cap[e] > 0 and parent[to[e]] == -1:
+                    parent[to[e]] = e
+                    queue.append(to[e])
+        if parent[sink] == -1 or source == sink:
+            return total, stats
+        path = []
+        v = sink
+        while v != source:
+            path.append(parent[v])
+            v = to[parent[v] ^ 1]
+        stats['augmentations'] += 1
+        total += network._augment(path[::-1], steps, f'Augmenting path {stats["augmentations"]} (BFS, {len(path)} arcs):')
+
+def dinic(network, source, sink, steps=None):
+    """Dinic: a BFS level graph per phase, then a blocking flow along it with current-arc pointers.
+
+    At most V phases of O(V E) each. Same results as edmonds_karp; recorded
+    steps also mark the start of each phase with the BFS levels.
+    """
+    start, arcs, to, cap = network.start, network.arcs, network.to, network.cap
+    n = network.n
+    total = 0
+    stats = {'phases': 0, 'augmentations': 0, 'arcs_scanned': 0, 'dead_ends': 0}
+    if source == sink:
+        return total, stats
+    while True:
+        level = [-1] * n
+        level[source] = 0
+        queue = [source]
+        for u in queue:
+            for i in range(start[u], start[u + 1]):
+                e = arcs[i]
+                stats['arcs_scanned'] += 1
+                if cap[e] > 0 and level[to[e]] < 0:
+                    level[to[e]] = level[u] + 1
+                    queue.append(to[e])
+        if level[sink] < 0:
+            return total, stats
+        stats['phases'] += 1
+        if steps is not None:
+            steps.append(([], {}, list(level), f'Phase {stats["phases"]}: the level graph reaches the sink at level {level[sink]} ({len(queue)} nodes).', None))
+        # Current arc of every node: arcs before it are known to be useless this phase
+        current = list(start[:n])
+        path = []
+        u = source
+        while True:
+            if u == sink:
+                stats['augmentations'] += 1
+                total += network._augment(path, steps, f'Phase {stats["phases"]}, blocking-flow path:')
+                path, u = [], source
+                continue
+            end = start[u + 1]
+            i = current[u]
+            while i < end:
+                e = arcs[i]
+                stats['arcs_scanned'] += 1
+                if cap[e] > 0 and level[to[e]] == level[u] + 1:
+                    break
+                i += 1
+            current[u] = i
+            if i < end:
+                path.append(arcs[i])
+                u = to[arcs[i]]
+                continue
+            # Dead end: retreat and never enter u again this phase
+            stats['dead_ends'] += 1
+            if u == source:
+                break
+            level[u] = -1
+            e = path.pop()
+            u = to[e ^ 1]
+            current[u] += 1
+
+FLOW_FUNCTIONS = dict(zip(FLOW_ALGORITHMS, (edmonds_karp, dinic)))
+
+# --- Dynamic shortest paths ---
+WEIGHT_EDITS = ['Edit an arc weight', 'Benchmark random edits']
+
+def set_arc_weight(graph, u, i, weight):
+    """Give the i-th arc of node u a new weight in place; returns the old one"""
+    if isinstance(graph, CSRGraph):
+        if not graph.weights.flags.writeable:
+            # Memory-mapped from the cache: edits stay in memory
+            graph.weights = np.array(graph.weights)
+        k = int(graph.offsets[u]) + i
+        old, graph.weights[k] = graph.weights[k].item(), weight
+        return old
+    v, old = graph[u][i]
+    graph[u][i] = (v, weight)
+    return old
+
+def twin_arc(graph, u, i):
+    """Index among v's arcs of the reverse of u's i-th arc u -> v in an undirected graph, or None.
+
+    CSR graphs record each arc's twin when built. Adjacency lists store the arcs
+    between two nodes in the same order on both sides, so there the k-th u -> v
+    arc pairs with the k-th v -> u arc, parallel edges included.
+    """
+    if isinstance(graph, CSRGraph) and graph.twins is not None:
+        k = int(graph.offsets[u]) + i
+        return int(graph.twins[k]) - int(graph.offsets[graph.targets[k]])
+    arcs = list(graph[u])
+    v = arcs[i][0]
+    if v == u:
+        # Both arcs of a loop sit in u's own list and never shorten a path
+        return None
+    rank = sum(1 for x, _ in arcs[:i] if x == v)
+    back = [j for j, (x, _) in enumerate(graph[v]) if x == u]
+    return back[rank] if rank < len(back) else None
+
+class DynamicShortestPaths:
+    """Shortest-path tree from one source kept up to date as arc weights change.
+
+    Arc ids follow graph_arcs, so the i-th arc of u is start[u] + i. An
+    increase on a tree arc recomputes only the subtree hanging below it; a
+    decrease spreads from its head as far as distances improve (the
+    Ramalingam–Reps scheme on a tree). Both search with a lazy heapq heap,
+    so an edit costs nothing proportional to the graph size.
+    """
+    def __init__(self, graph, source):
+        src, dst, weights = graph_arcs(graph)
+        if len(weights) and weights.min() < 0:
+            raise ValueError('Dynamic shortest paths need non-negative weights.')
+        self.n = n = len(graph)
+        self.source = source
+        self.tail = src.tolist()
+        self.head = dst.tolist()
+        self.weight = weights.tolist()
+        start = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=start[1:])
+        self.start = start.tolist()
+        # Incoming arc ids of every node, for the best way back into a subtree
+        self.in_start = np.r_[0, np.cumsum(np.bincount(dst, minlength=n))].tolist()
+        self.in_arcs = np.argsort(dst, kind='stable').tolist()
+        self.dist = [INF] * n
+        self.parent = [-1] * n
+        self.dist[source] = 0
+        self._settle([(0, source)], None, {'touched': 0, 'arcs_scanned': 0, 'heap_pushes': 1})
+
+    def _settle(self, heap, inside, stats):
+        # Dijkstra from the seeded heap; inside, when set, limits it to those nodes
+        dist, parent, start, head, weight = self.dist, self.parent, self.start, self.head, self.weight
+        touched = set()
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            touched.add(u)
+            for e in range(start[u], start[u + 1]):
+                v = head[e]
+                stats['arcs_scanned'] += 1
+                if inside is not None and v not in inside:
+                    continue
+                if d + weight[e] < dist[v]:
+                    dist[v] = d + weight[e]
+                    parent[v] = e
+                    heapq.heappush(heap, (dist[v], v))
+                    stats['heap_pushes'] += 1
+        return touched
+
+    def subtree(self, v):
+        """Nodes whose tree path runs through v, found through parent arcs"""
+        nodes = [v]
+        for x in nodes:
+            for e in range(self.start[x], self.start[x + 1]):
+                if self.parent[self.head[e]] == e:
+                    nodes.append(self.head[e])
+        return nodes
+
+    def update(self, e, weight):
+        """Set arc e's weight and repair the tree; returns (sorted touched nodes, stats)"""
+        if weight < 0:
+            raise ValueError('Dynamic shortest paths need non-negative weights.')
+        old, self.weight[e] = self.weight[e], weight
+        u, v = self.tail[e], self.head[e]
+        stats = {'touched': 0, 'arcs_scanned': 0, 'heap_pushes': 0}
+        dist = self.dist
+        if weight < old and dist[u] + weight < dist[v]:
+            dist[v] = dist[u] + weight
+            self.parent[v] = e
+            stats['heap_pushes'] += 1
+            touched = self._settle([(dist[v], v)], None, stats)
+        elif weight > old and self.parent[v] == e:
+            affected = self.subtree(v)
+            inside = set(affected)
+            for x in affected:
+                dist[x] = INF
+                self.parent[x] = -1
+            # Each affected node first hears from its best neighbor outside the subtree
+            heap = []
+            for x in affected:
+                for i in range(self.in_start[x], self.in_start[x + 1]):
+                    a = self.in_arcs[i]
+                    stats['arcs_scanned'] += 1
+                    p = self.tail[a]
+                    if p not in inside and dist[p] + self.weight[a] < dist[x]:
+                        dist[x] = dist[p] + self.weight[a]
+                        self.parent[x] = a
+                if dist[x] != INF:
+                    heap.append((dist[x], x))
+            heapq.heapify(heap)
+            stats['heap_pushes'] += len(heap)
+            self._settle(heap, inside, stats)
+            touched = inside
+        else:
+            touched = set()
+        stats['touched'] = len(touched)
+        return sorted(touched), stats
+
+    def prev(self):
+        return [None if e < 0 else self.tail[e] for e in self.parent]
+
+    def graph(self):
+        """CSR graph with the current weights, for checking against a full recompute"""
+        return CSRGraph.from_edges(self.tail, self.head, self.weight, self.n)
+
+    def benchmark(self, edits, seed=0):
+        """Random arc reweightings (x0.5 to x2); returns per-edit touched counts, repair seconds and stats"""
+        rng = np.random.default_rng(seed)
+        arcs = rng.integers(0, len(self.weight), edits).tolist() if self.weight else []
+        factors = rng.uniform(0.5, 2, len(arcs)).tolist()
+        touched, totals = [], {'touched': 0, 'arcs_scanned': 0, 'heap_pushes': 0}
+        t0 = time.perf_counter()
+        for e, f in zip(arcs, factors):
+            w = self.weight[e] * f
+            nodes, stats = self.update(e, round(w) if isinstance(self.weight[e], int) else w)
+            touched.append(len(nodes))
+            for k, c in stats.items():
+                totals[k] += c
+        return touched, time.perf_counter() - t0, totals
+
+# --- Force-directed layout ---
+# Layouts run in the background up to this size
+MAX_LAYOUT_NODES = 100_000
+
+def graph_edges(graph):
+    """Distinct undirected edges of an adjacency-list or CSR graph as (u, v) arrays with u < v"""
+    u, v, _ = graph_arcs(graph)
+    lo, hi = np.minimum(u, v), np.maximum(u, v)
+    keep = lo != hi
+    key = np.unique(lo[keep] * max(1, len(graph)) + hi[keep])
+    return key // max(1, len(graph)), key % max(1, len(graph))
+
+def _far_cell_offsets():
+    # For each position of a cell inside its parent (x bit, y bit): offsets to the
+    # children of the parent's 3x3 neighbourhood that do not touch the cell
+    table = []
+    for bx in (0, 1):
+        for by in (0, 1):
+            pairs = [(dx - bx, dy - by) for dx in range(-2, 4) for dy in range(-2, 4)
+                     if max(abs(dx - bx), abs(dy - by)) > 1]
+            table.append((np.array([x for x, _ in pairs]), np.array([y for _, y in pairs])))
+    return table
+
+FAR_CELL_OFFSETS = _far_cell_offsets()
+
+class ForceLayout:
+    """Fruchterman–Reingold layout with Barnes–Hut repulsion on an implicit quadtree.
+
+    Level L of the tree is a 2^L x 2^L grid. A node feels each cell of its
+    parent's neighbourhood that does not touch its own cell as one mass at the
+    cell's centre of mass; only touching cells at the finest level are summed
+    pair by pair. That is O(n log n) per step with every level vectorized.
+    """
+    def __init__(self, graph, positions=None, seed=0, cooling=0.96, gravity=0.02):
+        self.n = len(graph)
+        self.u, self.v = graph_edges(graph)
+        rng = np.random.default_rng(seed)
+        side = np.sqrt(max(1, self.n))
+        # Ideal edge length is 1 in a side x side box
+        self.positions = rng.random((self.n, 2)) * side if positions is None else np.array(positions, dtype=np.float64)
+        self.temperature = side / 8
+        self.cooling = cooling
+        self.gravity = gravity
+
+    def step(self):
+        pos = self.positions
+        disp = self.repulsion(pos)
+        # Edges pull with d^2 / k, k = 1
+        delta = pos[self.v] - pos[self.u]
+        pull = delta * np.hypot(delta[:, 0], delta[:, 1])[:, None]
+        for axis in range(2):
+            disp[:, axis] += np.bincount(self.u, pull[:, axis], self.n) - np.bincount(self.v, pull[:, axis], self.n)
+        # A weak pull to the centre keeps separate components in view
+        disp -= self.gravity * (pos - pos.mean(axis=0))
+        length = np.maximum(np.hypot(disp[:, 0], disp[:, 1]), 1e-9)
+        pos += disp * (np.minimum(length, self.temperature) / length)[:, None]
+        self.temperature *= self.cooling
+        return pos
+
+    def repulsion(self, pos):
+        n = len(pos)
+        force = np.zeros((n, 2))
+        if n < 2:
+            return force
+        lo = pos.min(axis=0)
+        span = max(float((pos.max(axis=0) - lo).max()), 1e-9) * (1 + 1e-9)
+        unit = (pos - lo) / span
+        depth = max(2, int(np.ceil(np.log(max(n, 2) / 2) / np.log(4))))
+        for level in range(2, depth + 1):
+            size = 1 << level
+            cell = np.minimum((unit * size).astype(np.int64), size - 1)
+            cx, cy = cell[:, 0], cell[:, 1]
+            key = cx * size + cy
+            mass = np.bincount(key, minlength=size * size).astype(np.float64)
+            com_x = np.bincount(key, pos[:, 0], size * size) / np.maximum(mass, 1)
+            com_y = np.bincount(key, pos[:, 1], size * size) / np.maximum(mass, 1)
+            parity = (cx & 1) * 2 + (cy & 1)
+            for p, (ox, oy) in enumerate(FAR_CELL_OFFSETS):
+                nodes = np.flatnonzero(parity == p)
+                tx = cx[nodes, None] + ox
+                ty = cy[nodes, None] + oy
+                inside = (tx >= 0) & (tx < size) & (ty >= 0) & (ty < size)
+                tkey = np.where(inside, tx * size + ty, 0)
+                dx = pos[nodes, 0, None] - com_x[tkey]
+                dy = pos[nodes, 1, None] - com_y[tkey]
+                weight = np.where(inside, mass[tkey], 0) / np.maximum(dx * dx + dy * dy, 1e-9)
+                force[nodes, 0] += (dx * weight).sum(axis=1)
+                force[nodes, 1] += (dy * weight).sum(axis=1)
+        # Finest level: touching cells interact node by node
+        i, j = grid_pairs(unit, 1 << depth)
+        delta = pos[i] - pos[j]
+        push = delta / np.maximum((delta ** 2).sum(axis=1), 1e-9)[:, None]
+        for axis in range(2):
+            force[:, axis] += np.bincount(i, push[:, axis], n) - np.bincount(j, push[:, axis], n)
+        return force
+
+class LayoutThread(QThread):
+    """Runs a ForceLayout off the UI thread and emits positions while it settles"""
+    positions_ready = pyqtSignal(object, int)
+
+    def __init__(self, layout, iterations=150, interval=0.25, parent=None):
+        super().__init__(parent)
+        self.layout = layout
+        self.iterations = iterations
+        self.interval = interval
+
+    def run(self):
+        last = 0.0
+        for it in range(1, self.iterations + 1):
+            if self.isInterruptionRequested():
+                return
+            self.layout.step()
+            now = time.perf_counter()
+            if now - last >= self.interval or it == self.iterations:
+                last = now
+                self.positions_ready.emit(self.layout.positions.copy(), it)
+
+# --- Spatial index ---
+# Large graphs with coordinates are drawn through the quadtree up to this size
+MAX_PREVIEW_GRAPH = 250_000
+# Level of detail: edges drawn per frame before short ones are dropped
+PAINTED_EDGES = 100_000
+
+def _concat_ranges(ranges):
+    # Indices of a list of (start, end) runs, concatenated
+    if not ranges:
+        return np.zeros(0, dtype=np.int64)
+    starts, ends = np.array(ranges, dtype=np.int64).T
+    counts = ends - starts
+    first = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + np.arange(int(counts.sum())) - first
+
+class QuadTree:
+    """Region quadtree over 2D points, with segments stored MX-CIF style.
+
+    Each segment sits in the smallest cell containing its bounding box. Cells
+    are numbered in preorder, so the points and segments of a subtree are
+    contiguous runs of point_order and segment_order: a cell lying inside a
+    query is taken whole without visiting its descendants.
+    """
+    def __init__(self, points, segments=None, leaf_size=32, max_depth=20):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        n = len(self.points)
+        lo = self.points.min(axis=0) if n else np.zeros(2)
+        size = float(np.ptp(self.points, axis=0).max()) if n else 0.0
+        self.point_order = np.arange(n)
+        self.cells = []
+        parent, children = [], []
+        stack = [(float(lo[0]), float(lo[1]), max(size, 1e-9) * (1 + 1e-9), 0, n, 0, -1, 0)]
+        while stack:
+            x, y, cs, s, e, depth, p, q = stack.pop()
+            k = len(self.cells)
+            self.cells.append((x, y, cs, s, e))
+            parent.append(p)
+            children.append([-1, -1, -1, -1])
+            if p >= 0:
+                children[p][q] = k
+            if e - s <= leaf_size or depth == max_depth:
+                continue
+            # Sort the cell's points into quadrant runs, one per child
+            idx = self.point_order[s:e]
+            half = cs / 2
+            quadrant = (self.points[idx, 0] >= x + half) + 2 * (self.points[idx, 1] >= y + half)
+            self.point_order[s:e] = idx[np.argsort(quadrant, kind='stable')]
+            bounds = (s + np.concatenate([[0], np.cumsum(np.bincount(quadrant, minlength=4))])).tolist()
+            for q in (3, 2, 1, 0):
+                if bounds[q + 1] > bounds[q]:
+                    stack.append((x + half * (q & 1), y + half * (q >> 1), half, bounds[q], bounds[q + 1], depth + 1, k, q))
+        self.child = np.array(children, dtype=np.int64).reshape(-1, 4)
+        self.children = [[c for c in kids if c >= 0] for kids in children]
+        # One past the last cell of each subtree
+        self.subtree_end = list(range(1, len(self.cells) + 1))
+        for k in range(len(self.cells) - 1, 0, -1):
+            self.subtree_end[parent[k]] = max(self.subtree_end[parent[k]], self.subtree_end[k])
+        self.set_segments(np.zeros((0, 4)) if segments is None else segments)
+
+    def set_segments(self, segments):
+        """Index (x1, y1, x2, y2) segments by their bounding boxes"""
+        self.segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+        self.segment_lo = np.minimum(self.segments[:, :2], self.segments[:, 2:])
+        self.segment_hi = np.maximum(self.segments[:, :2], self.segments[:, 2:])
+        cells = np.array(self.cells).reshape(-1, 5)
+        # Descend level by level while the box stays inside one existing child
+        cell = np.zeros(len(self.segments), dtype=np.int64)
+        active = np.arange(len(self.segments)) if len(cells) else np.zeros(0, dtype=np.int64)
+        while len(active):
+            k = cell[active]
+            mx = cells[k, 0] + cells[k, 2] / 2
+            my = cells[k, 1] + cells[k, 2] / 2
+            lo, hi = self.segment_lo[active], self.segment_hi[active]
+            right, top = lo[:, 0] >= mx, lo[:, 1] >= my
+            fits = (right == (hi[:, 0] >= mx)) & (top == (hi[:, 1] >= my))
+            target = self.child[k, right + 2 * top]
+            move = fits & (target >= 0)
+            cell[active[move]] = target[move]
+            active = active[move]
+        self.segment_order = np.argsort(cell, kind='stable')
+        self.segment_bounds = np.searchsorted(cell[self.segment_order], np.arange(len(cells) + 1)).tolist()
+
+    def query(self, x0, y0, x1, y1, segments=True):
+        """Ids of the points inside the rectangle and of the segments whose boxes meet it"""
+        whole, partial, whole_segments, partial_segments = [], [], [], []
+        bounds = self.segment_bounds
+        stack = [0] if self.cells else []
+        while stack:
+            k = stack.pop()
+            x, y, cs, s, e = self.cells[k]
+            if x > x1 or y > y1 or x + cs < x0 or y + cs < y0:
+                continue
+            if x0 <= x and y0 <= y and x + cs <= x1 and y + cs <= y1:
+                whole.append((s, e))
+                whole_segments.append((bounds[k], bounds[self.subtree_end[k]]))
+                continue
+            partial_segments.append((bounds[k], bounds[k + 1]))
+            if self.children[k]:
+                stack.extend(self.children[k])
+            else:
+                partial.append((s, e))
+        candidates = self.point_order[_concat_ranges(partial)]
+        p = self.points[candidates]
+        inside = (p[:, 0] >= x0) & (p[:, 0] <= x1) & (p[:, 1] >= y0) & (p[:, 1] <= y1)
+        points = np.concatenate([self.point_order[_concat_ranges(whole)], candidates[inside]])
+        if not segments:
+            return points, None
+        candidates = self.segment_order[_concat_ranges(partial_segments)]
+        lo, hi = self.segment_lo[candidates], self.segment_hi[candidates]
+        meets = (lo[:, 0] <= x1) & (hi[:, 0] >= x0) & (lo[:, 1] <= y1) & (hi[:, 1] >= y0)
+        return points, np.concatenate([self.segment_order[_concat_ranges(whole_segments)], candidates[meets]])
+
+    def within(self, x, y, radius):
+        """Ids of the points within radius of (x, y)"""
+        ids, _ = self.query(x - radius, y - radius, x + radius, y + radius, segments=False)
+        return ids[np.hypot(*(self.points[ids] - (x, y)).T) <= radius]
+
+    def nearest(self, x, y, radius):
+        """Closest point within radius of (x, y), or None"""
+        ids = self.within(x, y, radius)
+        if not len(ids):
+            return None
+        return int(ids[np.argmin(np.hypot(*(self.points[ids] - (x, y)).T))])
+
+# --- Batched graph rendering ---
+EDGE_NORMAL, EDGE_TREE, EDGE_PATH = 0, 1, 2
+
+def _vertex_buffer(kind, values, width):
+    # sip arrays of QPointF/QLineF are plain doubles, so NumPy fills them in one copy
+    values = np.asarray(values, dtype=np.float64).reshape(-1, width)
+    buffer = sip.array(kind, len(values))
+    if len(values):
+        np.frombuffer(buffer, dtype=np.float64).reshape(-1, width)[:] = values
+    return buffer
+
+def point_buffer(xy):
+    """Vertex buffer of QPointF from an (n, 2) array, without a Python object per point"""
+    return _vertex_buffer(QPointF, xy, 2)
+
+def line_buffer(segments):
+    """Vertex buffer of QLineF from an (m, 4) array of x1, y1, x2, y2"""
+    return _vertex_buffer(QLineF, segments, 4)
+
+class GraphItem(QGraphicsItem):
+    """Every edge and node of a graph painted by one item from arrays.
+
+    Edges are drawn from vertex buffers in one call per style (normal,
+    shortest-path tree, path) and nodes are colored from a per-node state
+    array (0 unvisited, 1 visited) or from per-node classes. Only what meets the exposed area is
+    painted, found through a QuadTree. Detailed items draw the labelled
+    40-pixel nodes of small graphs; otherwise nodes are dots.
+    """
+    def __init__(self, points, u, v, rect, weights=None, detailed=False):
+        super().__init__()
+        self.rect = rect
+        self.detailed = detailed
+        self.u = np.asarray(u, dtype=np.int64)
+        self.v = np.asarray(v, dtype=np.int64)
+        self.weights = None if weights is None else [str(w) for w in weights]
+        # Edge labels as built, for when a flow has relabelled some
+        self.weight_labels = self.weights
+        self.flow_edges = np.zeros(0, dtype=np.int64)
+        self.node_state = np.zeros(len(points), dtype=np.uint8)
+        self.edge_state = np.zeros(len(self.u), dtype=np.uint8)
+        self.parent_edge = np.full(len(points), -1, dtype=np.int64)
+        self.distances = None
+        self.highlight_node = None
+        self.highlight_edge = -1
+        self.selected = None
+        self.selected_edges = np.zeros(0, dtype=np.int64)
+        # Optional per-node classes that override the visited colors, and extra segments
+        self.node_classes = None
+        self.class_colors = []
+        self.overlay = np.zeros((0, 4))
+        # Sorted undirected keys map node pairs back to edge indices
+        n = max(1, len(points))
+        keys = np.minimum(self.u, self.v) * n + np.maximum(self.u, self.v)
+        self.key_order = np.argsort(keys, kind='stable')
+        self.sorted_keys = keys[self.key_order]
+        self.set_positions(points)
+        # Needed for option.exposedRect
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+        if detailed:
+            self.edge_pens = [QPen(QColor(120, 120, 120), 3), QPen(QColor(60, 110, 230), 4), QPen(QColor(255, 60, 80), 5)]
+            self.node_colors = [QColor(200, 240, 255), QColor(180, 255, 180), QColor(255, 215, 0)]
+            self.overlay_pen = QPen(QColor(170, 60, 200), 2)
+        else:
+            self.edge_pens = [QPen(QColor(150, 150, 170), 0), QPen(QColor(60, 110, 230), 0), QPen(QColor(255, 60, 80), 3)]
+            self.node_colors = [QColor(90, 90, 110), QColor(0, 170, 0), QColor(255, 215, 0)]
+            self.overlay_pen = QPen(QColor(170, 60, 200), 0)
+            for pen in self.edge_pens + [self.overlay_pen]:
+                pen.setCosmetic(True)
+        self.fonts = [QFont('Arial', 12, QFont.Bold), QFont('Arial', 16, QFont.Bold), QFont('Arial', 10)]
+
+    def boundingRect(self):
+        return self.rect
+
+    def set_positions(self, points):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.index = QuadTree(self.points, np.hstack([self.points[self.u], self.points[self.v]]))
+        self.update()
+
+    def edge_ids(self, a, b):
+        """Edge index of each node pair a[i]-b[i] in either direction, -1 where there is none"""
+        a, b = np.asarray(a, dtype=np.int64), np.asarray(b, dtype=np.int64)
+        if not len(self.sorted_keys):
+            return np.full(len(a), -1, dtype=np.int64)
+        key = np.minimum(a, b) * max(1, len(self.points)) + np.maximum(a, b)
+        at = np.minimum(np.searchsorted(self.sorted_keys, key), len(self.sorted_keys) - 1)
+        return np.where(self.sorted_keys[at] == key, self.key_order[at], -1)
+
+    def edge_id(self, edge):
+        return -1 if edge is None else int(self.edge_ids([edge[0]], [edge[1]])[0])
+
+    def node_rect(self, i):
+        x, y = self.points[i]
+        return QRectF(x - 30, y - 40, 100, 85) if self.detailed else self.rect
+
+    def edge_rect(self, k):
+        x1, y1, x2, y2 = self.index.segments[k]
+        return QRectF(min(x1, x2), min(y1, y2), abs(x2 - x1), abs(y2 - y1)).adjusted(-5, -5, 40, 25)
+
+    def show_state(self, distances, visited, node=None, edge=None):
+        """Replace the whole state, as after a jump to an arbitrary step"""
+        self.distances = distances
+        self.node_state[:] = 0 if visited is None else np.asarray(visited, dtype=np.uint8)
+        self.clear_classes()
+        self.weights = self.weight_labels
+        self.edge_state[:] = EDGE_NORMAL
+        self.parent_edge[:] = -1
+        self.highlight_node = node
+        self.highlight_edge = self.edge_id(edge)
+        self.update()
+
+    def show_step(self, distances, visited, node=None, edge=None):
+        """Apply one step, which changes at most its highlighted node: O(1) writes and repaints"""
+        nodes = [self.highlight_node, node]
+        edges = [self.highlight_edge]
+        previous = self.distances
+        self.distances = distances
+        k = self.edge_id(edge)
+        if node is not None:
+            self.node_state[node] = 1 if visited is not None and visited[node] else 0
+            if k >= 0 and previous is not None and distances is not None and distances[node] < previous[node]:
+                # The node now hangs off this edge in the shortest-path tree
+                if self.parent_edge[node] >= 0:
+                    self.edge_state[self.parent_edge[node]] = EDGE_NORMAL
+                    edges.append(int(self.parent_edge[node]))
+                self.edge_state[k] = EDGE_TREE
+                self.parent_edge[node] = k
+        self.highlight_node = node
+        self.highlight_edge = k
+        self.update_marks(nodes, edges + [k])
+
+    def show_mark(self, node=None, edge=None, style=None):
+        """Highlight node and edge, marking the node visited and giving the edge style if set: O(1)"""
+        nodes = [self.highlight_node, node]
+        edges = [self.highlight_edge]
+        k = self.edge_id(edge)
+        if node is not None:
+            self.node_state[node] = 1
+        if style is not None and k >= 0:
+            self.edge_state[k] = style
+        self.highlight_node = node
+        self.highlight_edge = k
+        self.update_marks(nodes, edges + [k])
+
+    def update_marks(self, nodes, edges):
+        # Repaints only around the given nodes and edges
+        for i in nodes:
+            if i is not None:
+                self.update(self.node_rect(i))
+        for k in edges:
+            if k >= 0:
+                self.update(self.edge_rect(k))
+
+    def show_tree(self, prev, dist):
+        """Mark reached nodes and the shortest-path tree given by predecessors"""
+        parent = np.array([-1 if p is None else p for p in prev], dtype=np.int64)
+        child = np.flatnonzero(parent >= 0)
+        ids = self.edge_ids(parent[child], child)
+        self.edge_state[:] = EDGE_NORMAL
+        self.edge_state[ids[ids >= 0]] = EDGE_TREE
+        self.node_state[:] = np.array([d != INF for d in dist], dtype=np.uint8)
+        self.clear_classes()
+        self.update()
+
+    def show_path(self, path):
+        self.show_edges(path[:-1], path[1:], EDGE_PATH)
+
+    def show_edges(self, a, b, style):
+        """Give edges a[i]-b[i] the style and every other edge the normal one"""
+        ids = self.edge_ids(a, b)
+        self.edge_state[:] = EDGE_NORMAL
+        self.edge_state[ids[ids >= 0]] = style
+        self.update()
+
+    def show_flow(self, path, labels):
+        """Mark the (a, b) pairs of an augmenting path and relabel the edges in labels: O(path)"""
+        old = self.flow_edges
+        self.edge_state[old] = EDGE_NORMAL
+        ids = self.edge_ids([a for a, _ in path], [b for _, b in path])
+        self.flow_edges = ids[ids >= 0]
+        self.edge_state[self.flow_edges] = EDGE_PATH
+        if labels and self.weights is not None:
+            if self.weights is self.weight_labels:
+                self.weights = list(self.weights)
+            for edge, text in labels.items():
+                k = self.edge_id(edge)
+                if k >= 0:
+                    self.weights[k] = text
+        self.update_marks([], old.tolist() + self.flow_edges.tolist())
+
+    def set_weight(self, edge, weight):
+        # Relabels the edge a-b after its weight was edited
+        k = self.edge_id(edge)
+        if k >= 0 and self.weight_labels is not None:
+            self.weight_labels[k] = str(weight)
+            if self.weights is not self.weight_labels:
+                self.weights[k] = str(weight)
+            self.update(self.edge_rect(k))
+
+    def show_classes(self, classes, colors, overlay=None):
+        """Color node i by colors[classes[i]] and draw the (k, 4) overlay segments over the edges"""
+        self.node_classes = np.asarray(classes, dtype=np.int64)
+        self.class_colors = colors
+        self.overlay = np.zeros((0, 4)) if overlay is None else np.asarray(overlay, dtype=np.float64).reshape(-1, 4)
+        self.update()
+
+    def clear_classes(self):
+        self.node_classes = None
+        self.overlay = np.zeros((0, 4))
+
+    def select(self, node):
+        self.selected = node
+        self.selected_edges = np.flatnonzero((self.u == node) | (self.v == node)) if node is not None else np.zeros(0, dtype=np.int64)
+        self.update()
+
+    def paint(self, painter, option, widget=None):
+        r = option.exposedRect
+        scale = option.levelOfDetailFromTransform(painter.worldTransform())
+        # Node discs and labels reach past their anchor points
+        pad = 60 if self.detailed else 3 / scale
+        nodes, edges = self.index.query(r.left() - pad, r.top() - pad, r.right() + pad, r.bottom() + pad)
+        state = self.edge_state[edges]
+        groups = [edges[state == style] for style in (EDGE_NORMAL, EDGE_TREE, EDGE_PATH)]
+        if not self.detailed:
+            groups[0] = self.level_of_detail(groups[0], scale)
+            groups[1] = self.level_of_detail(groups[1], scale)
+            # Antialiasing costs several times more per line than the lines themselves
+            if sum(map(len, groups)) > PAINTED_EDGES:
+                painter.setRenderHint(QPainter.Antialiasing, False)
+        for style, ids in enumerate(groups):
+            if style == EDGE_PATH and len(self.overlay):
+                # Overlay segments go above the graph but under a path
+                self.paint_overlay(painter, r)
+            painter.setPen(self.edge_pens[style])
+            painter.drawLines(line_buffer(self.index.segments[ids]))
+        if self.highlight_edge >= 0:
+            painter.setPen(self.edge_pens[EDGE_PATH])
+            painter.drawLines(line_buffer(self.index.segments[[self.highlight_edge]]))
+        if self.detailed:
+            self.paint_labelled(painter, edges, nodes)
+        else:
+            self.paint_dots(painter, nodes, scale)
+        if self.selected is not None:
+            pen = QPen(QColor(255, 170, 0), 2)
+            pen.setCosmetic(True)
+            painter.setPen(pen)
+            painter.drawLines(line_buffer(self.index.segments[self.selected_edges]))
+            pen.setWidth(9)
+            pen.setCapStyle(Qt.RoundCap)
+            painter.setPen(pen)
+            painter.drawPoint(QPointF(*self.points[self.selected]))
+
+    def paint_overlay(self, painter, r):
+        # Few enough segments to cull by bounding box without the quadtree
+        s = self.overlay
+        visible = ((np.maximum(s[:, 0], s[:, 2]) >= r.left()) & (np.minimum(s[:, 0], s[:, 2]) <= r.right())
+                   & (np.maximum(s[:, 1], s[:, 3]) >= r.top()) & (np.minimum(s[:, 1], s[:, 3]) <= r.bottom()))
+        s = s[visible]
+        if len(s) > PAINTED_EDGES:
+            length = np.abs(s[:, 2] - s[:, 0]) + np.abs(s[:, 3] - s[:, 1])
+            s = s[np.argpartition(length, len(s) - PAINTED_EDGES)[len(s) - PAINTED_EDGES:]]
+        painter.setPen(self.overlay_pen)
+        painter.drawLines(line_buffer(s))
+
+    def level_of_detail(self, edges, scale):
+        # Edges shorter than a pixel vanish under the node dots anyway; zoomed
+        # out, only the longest PAINTED_EDGES are drawn
+        segments = self.index.segments[edges]
+        length = np.abs(segments[:, 2] - segments[:, 0]) + np.abs(segments[:, 3] - segments[:, 1])
+        shortest = 1 / scale
+        if len(length) > PAINTED_EDGES:
+            shortest = max(shortest, np.partition(length, len(length) - PAINTED_EDGES)[len(length) - PAINTED_EDGES])
+        return edges[length >= shortest]
+
+    def paint_dots(self, painter, nodes, scale):
+        if len(nodes) > PAINTED_EDGES:
+            # One dot per 3x3 device pixels, the size of a dot; visited nodes
+            # (or higher classes) win
+            cell = np.floor(self.points[nodes] * (scale / 3)).astype(np.int64)
+            key = cell[:, 0] * (1 << 32) + cell[:, 1]
+            state = self.node_state if self.node_classes is None else self.node_classes
+            order = np.lexsort((-state[nodes].astype(np.int64), key))
+            nodes = nodes[order][np.r_[True, key[order][1:] != key[order][:-1]]]
+        if self.node_classes is None:
+            state, colors = self.node_state[nodes], self.node_colors[:2]
+        else:
+            state, colors = self.node_classes[nodes], self.class_colors
+        for s, color in enumerate(colors):
+            pen = QPen(color, 3)
+            pen.setCosmetic(True)
+            painter.setPen(pen)
+            painter.drawPoints(point_buffer(self.points[nodes[state == s]]))
+        if self.highlight_node is not None:
+            pen = QPen(self.node_colors[2], 7)
+            pen.setCosmetic(True)
+            painter.setPen(pen)
+            painter.drawPoint(QPointF(*self.points[self.highlight_node]))
+
+    def paint_labelled(self, painter, edges, nodes):
+        if self.weights is not None:
+            painter.setFont(self.fonts[0])
+            painter.setPen(QColor(80, 80, 80))
+            for k in edges.tolist():
+                x1, y1, x2, y2 = self.index.segments[k]
+                painter.drawText(QRectF((x1 + x2) / 2, (y1 + y2) / 2, 60, 20), Qt.AlignLeft | Qt.AlignTop, self.weights[k])
+        for i in sorted(nodes.tolist()):
+            x, y = self.points[i]
+            if i == self.highlight_node:
+                color = self.node_colors[2]
+            elif self.node_classes is not None:
+                color = self.class_colors[self.node_classes[i]]
+            else:
+                color = self.node_colors[self.node_state[i]]
+            painter.setPen(QPen(Qt.black, 2))
+            painter.setBrush(QBrush(color))
+            painter.drawEllipse(QPointF(x, y), 20, 20)
+            painter.setFont(self.fonts[1])
+            painter.drawText(QRectF(x - 20, y - 20, 40, 40), Qt.AlignCenter, str(i))
+            painter.setFont(self.fonts[2])
+            if self.distances:
+                d = self.distances[i]
+                painter.setPen(QColor(80, 80, 255))
+                painter.drawText(QRectF(x - 20, y + 22, 100, 16), Qt.AlignLeft | Qt.AlignTop, f'dist: {"∞" if d == INF else d}')
+            if self.node_state[i]:
+                painter.setPen(QColor(0, 180, 0))
+                painter.drawText(QRectF(x + 10, y - 30, 60, 16), Qt.AlignLeft | Qt.AlignTop, 'visited')
+
+class QueuePanelItem(QGraphicsItem):
+    """Heap array of a priority queue, one row per slot; the root is the next node to pop"""
+    ROWS = 12
+
+    def __init__(self, x, y):
+        super().__init__()
+        self.setPos(x, y)
+        self.queue = []
+        self.title, self.kind, self.key = 'Priority queue (heap)', 'node', 'd'
+
+    def boundingRect(self):
+        return QRectF(0, 0, 190, 28 * (self.ROWS + 2))
+
+    def set_queue(self, queue, title='Priority queue (heap)', kind='node', key='d'):
+        # Other algorithms show their frontier or stack as (entry, key) rows too
+        self.setVisible(queue is not None)
+        self.queue = queue or []
+        self.title, self.kind, self.key = title, kind, key
+        self.update()
+
+    def paint(self, painter, option, widget=None):
+        painter.setFont(QFont('Arial', 11, QFont.Bold))
+        painter.drawText(QRectF(0, 0, 190, 24), Qt.AlignLeft | Qt.AlignTop, self.title)
+        painter.setFont(QFont('Arial', 10))
+        if not self.queue:
+            painter.drawText(QRectF(0, 30, 190, 20), Qt.AlignLeft | Qt.AlignTop, 'empty')
+        for slot, (node, key) in enumerate(self.queue[:self.ROWS]):
+            painter.setPen(QPen(Qt.black, 1))
+            painter.setBrush(QBrush(QColor(255, 215, 0) if slot == 0 else QColor(235, 235, 250)))
+            painter.drawRect(QRectF(0, 28 + slot * 28, 180, 24))
+            painter.drawText(QRectF(8, 28 + slot * 28, 172, 24), Qt.AlignLeft | Qt.AlignVCenter, f'[{slot}] {self.kind} {node}   {self.key} = {key}')
+        if len(self.queue) > self.ROWS:
+            painter.drawText(QRectF(0, 28 + self.ROWS * 28, 190, 20), Qt.AlignLeft | Qt.AlignTop, f'... {len(self.queue) - self.ROWS} more')
+
+class GraphView(QGraphicsView):
+    """Graph view that zooms with the wheel, pans by dragging and reports clicks"""
+    clicked = pyqtSignal(QPointF, float)
+
+    def __init__(self, scene):
+        super().__init__(scene)
+        self.setDragMode(QGraphicsView.ScrollHandDrag)
+        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+        self.press = None
+
+    def wheelEvent(self, event):
+        factor = 1.25 if event.angleDelta().y() > 0 else 0.8
+        if 0.5 <= self.transform().m11() * factor <= 1000:
+            self.scale(factor, factor)
+
+    def mousePressEvent(self, event):
+        self.press = event.pos()
+        super().mousePressEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+        # A click, not a drag: pass the scene point and an 8-pixel pick radius
+        if self.press is not None and (event.pos() - self.press).manhattanLength() < 4:
+            self.clicked.emit(self.mapToScene(event.pos()), 8 / self.transform().m11())
+        self.press = None
+
 # --- Sorting Visualizer ---
 class SortingVisualizer(QWidget):
     def __init__(self):
@@ -2962,11 +7825,42 @@ class SortingVisualizer(QWidget):
         self.btn_next_step.clicked.connect(self.next_step)
         # Dijkstra
         self.dijkstra_scene = DijkstraGraphScene()
-        self.dijkstra_view = QGraphicsView(self.dijkstra_scene)
+        self.dijkstra_view = GraphView(self.dijkstra_scene)
+        self.dijkstra_view.clicked.connect(self.pick_node)
         self.dijkstra_view.setRenderHint(QPainter.Antialiasing)
         self.dijkstra_view.setStyleSheet('background: #f8f8ff; border: none;')
         self.dijkstra_view.setFixedHeight(400)
         self.dijkstra_view.setVisible(False)
+        self.graph = EXAMPLE_GRAPH
+        self.graph_pos = EXAMPLE_POSITIONS
+        # Loaded graphs may be directed; the example and generated ones never are
+        self.graph_directed = False
+        self.layout_thread = None
+        self.apsp = None
+        self.hierarchy = None
+        self.dynamic = None
+        # Parallel sort worker lanes
+        self.lane_scene = WorkerLaneScene()
+        self.lane_view = QGraphicsView(self.lane_scene)
+        self.lane_view.setRenderHint(QPainter.Antialiasing)
+        self.lane_view.setStyleSheet('background: #f8f8ff; border: none;')
+        self.lane_view.setFixedHeight(400)
+        self.lane_view.setVisible(False)
+        # External sort runs and merge passes
+        self.external_scene = ExternalSortScene()
+        self.external_view = QGraphicsView(self.external_scene)
+        self.external_view.setRenderHint(QPainter.Antialiasing)
+        self.external_view.setStyleSheet('background: #f8f8ff; border: none;')
+        self.external_view.setFixedHeight(400)
+        self.external_view.setVisible(False)
+        # Cache simulator heatmap
+        self.cache_scene = CacheHeatmapScene()
+        self.cache_view = QGraphicsView(self.cache_scene)
+        self.cache_view.setRenderHint(QPainter.Antialiasing)
+        self.cache_view.setStyleSheet('background: #f8f8ff; border: none;')
+        self.cache_view.setFixedHeight(400)
+        self.cache_view.setVisible(False)
+        self.panels = [self.view, self.dijkstra_view, self.lane_view, self.external_view, self.cache_view]
         self.init_ui()
 
     def init_ui(self):
@@ -2976,6 +7870,9 @@ class SortingVisualizer(QWidget):
         main_layout.addWidget(title)
         main_layout.addWidget(self.view)
         main_layout.addWidget(self.dijkstra_view)
+        main_layout.addWidget(self.lane_view)
+        main_layout.addWidget(self.external_view)
+        main_layout.addWidget(self.cache_view)
         main_layout.addWidget(self.feedback)
         main_layout.addWidget(self.step_explanation)
         main_layout.addWidget(self.btn_next_step)
@@ -2995,6 +7892,10 @@ class SortingVisualizer(QWidget):
         self.btn_create.setStyleSheet(button_style)
         self.btn_create.clicked.connect(self.create_own_array)
         btn_layout.addWidget(self.btn_create)
+        self.btn_workload = QPushButton('Workload')
+        self.btn_workload.setStyleSheet(button_style)
+        self.btn_workload.clicked.connect(self.generate_workload)
+        btn_layout.addWidget(self.btn_workload)
         self.btn_bubble = QPushButton('Bubble Sort')
         self.btn_bubble.setStyleSheet(button_style)
         self.btn_bubble.clicked.connect(self.bubble_sort)
@@ -3020,6 +7921,72 @@ class SortingVisualizer(QWidget):
         self.btn_dijkstra.clicked.connect(self.dijkstra_algorithm)
         btn_layout.addWidget(self.btn_dijkstra)
         main_layout.addLayout(btn_layout)
+        # Performance tools
+        perf_layout = QHBoxLayout()
+        perf_layout.setSpacing(32)
+        self.btn_parallel = QPushButton('Parallel Sort')
+        self.btn_parallel.setStyleSheet(button_style)
+        self.btn_parallel.clicked.connect(self.parallel_sort)
+        perf_layout.addWidget(self.btn_parallel)
+        self.btn_external = QPushButton('External Sort')
+        self.btn_external.setStyleSheet(button_style)
+        self.btn_external.clicked.connect(self.external_sort)
+        perf_layout.addWidget(self.btn_external)
+        self.btn_cache = QPushButton('Cache Simulator')
+        self.btn_cache.setStyleSheet(button_style)
+        self.btn_cache.clicked.connect(self.cache_simulation)
+        perf_layout.addWidget(self.btn_cache)
+        perf_layout.addStretch(1)
+        main_layout.addLayout(perf_layout)
+        # Graph tools
+        graph_layout = QHBoxLayout()
+        graph_layout.setSpacing(32)
+        self.btn_load_graph = QPushButton('Load Graph')
+        self.btn_load_graph.setStyleSheet(button_style)
+        self.btn_load_graph.clicked.connect(self.load_graph)
+        graph_layout.addWidget(self.btn_load_graph)
+        self.btn_generate_graph = QPushButton('Generate Graph')
+        self.btn_generate_graph.setStyleSheet(button_style)
+        self.btn_generate_graph.clicked.connect(self.generate_graph)
+        graph_layout.addWidget(self.btn_generate_graph)
+        self.btn_layout_graph = QPushButton('Layout')
+        self.btn_layout_graph.setStyleSheet(button_style)
+        self.btn_layout_graph.clicked.connect(self.layout_graph)
+        graph_layout.addWidget(self.btn_layout_graph)
+        self.btn_shortest_path = QPushButton('Shortest Path')
+        self.btn_shortest_path.setStyleSheet(button_style)
+        self.btn_shortest_path.clicked.connect(self.shortest_path)
+        graph_layout.addWidget(self.btn_shortest_path)
+        self.btn_all_pairs = QPushButton('All Pairs')
+        self.btn_all_pairs.setStyleSheet(button_style)
+        self.btn_all_pairs.clicked.connect(self.all_pairs)
+        graph_layout.addWidget(self.btn_all_pairs)
+        self.btn_hierarchy = QPushButton('Hierarchy')
+        self.btn_hierarchy.setStyleSheet(button_style)
+        self.btn_hierarchy.clicked.connect(self.contraction_hierarchy)
+        graph_layout.addWidget(self.btn_hierarchy)
+        self.btn_mst = QPushButton('Spanning Tree')
+        self.btn_mst.setStyleSheet(button_style)
+        self.btn_mst.clicked.connect(self.minimum_spanning_tree)
+        graph_layout.addWidget(self.btn_mst)
+        self.btn_traversal = QPushButton('Traversal')
+        self.btn_traversal.setStyleSheet(button_style)
+        self.btn_traversal.clicked.connect(self.traverse)
+        graph_layout.addWidget(self.btn_traversal)
+        self.btn_parallel_bfs = QPushButton('Parallel BFS')
+        self.btn_parallel_bfs.setStyleSheet(button_style)
+        self.btn_parallel_bfs.clicked.connect(self.parallel_bfs)
+        graph_layout.addWidget(self.btn_parallel_bfs)
+        self.btn_max_flow = QPushButton('Max Flow')
+        self.btn_max_flow.setStyleSheet(button_style)
+        self.btn_max_flow.clicked.connect(self.max_flow)
+        graph_layout.addWidget(self.btn_max_flow)
+        self.btn_edit_weight = QPushButton('Edit Weight')
+        self.btn_edit_weight.setStyleSheet(button_style)
+        self.btn_edit_weight.clicked.connect(self.edit_weight)
+        graph_layout.addWidget(self.btn_edit_weight)
+        graph_layout.addStretch(1)
+        main_layout.addLayout(graph_layout)
         self.setLayout(main_layout)
         self.setMinimumHeight(400)
         self.setMinimumWidth(900)
@@ -3030,11 +7997,45 @@ class SortingVisualizer(QWidget):
         self.feedback.setText(text)
         QTimer.singleShot(1200, lambda: self.feedback.setText(''))
 
+    def show_panel(self, panel):
+        # Only one drawing area is visible at a time
+        for view in self.panels:
+            view.setVisible(view is panel)
+
+    def show_array(self, animate=True):
+        # Large workloads only draw a preview; the sorts still run on the full array
+        self.show_panel(self.view)
+        self.scene.set_values(self.array[:SORT_PREVIEW_LIMIT], animate=animate)
+        if len(self.array) > SORT_PREVIEW_LIMIT:
+            self.step_explanation.setText(f'Showing the first {SORT_PREVIEW_LIMIT} of {len(self.array)} values.')
+
+    def can_animate(self, n):
+        # Step traces are only built for arrays small enough to draw
+        return self.animations_enabled and n <= MAX_DRAWN_WORKLOAD
+
+    def sort_instantly(self, name):
+        # Without animation, report what the algorithm would have done instead of a trace
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            t0 = time.perf_counter()
+            costs = predict_sort_cost(name, self.array)
+            elapsed = time.perf_counter() - t0
+            self.array = np.sort(np.asarray(self.array), kind='stable').tolist()
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.show_array(animate=False)
+        counts = ', '.join(f'{count:,} {label}' for label, count in costs)
+        # Labels carrying 'at most', 'at least' or 'expected' are bounds or averages, not exact counts
+        how = 'estimated' if any(' ' in label for label, _ in costs) else 'counted'
+        self.step_explanation.setText(f'{name} on {len(self.array):,} values: {counts} ({how} in {elapsed:.2f} s without running it).')
+        self.show_feedback(f'{name} complete.')
+
     def play_steps(self, steps, finalize_callback=None):
         self._stopped = False
         self.steps = steps
         self.current_step = 0
         self.animating = True
+        self.show_panel(self.view)
         self._play_next_step(finalize_callback)
 
     def _play_next_step(self, finalize_callback=None):
@@ -3070,21 +8071,26 @@ class SortingVisualizer(QWidget):
             try:
                 nums = [int(x.strip()) for x in text.split(',') if x.strip()]
                 self.array = nums
-                self.scene.set_values(self.array)
+                self.show_array()
                 self.show_feedback('Custom array created.')
                 self.step_explanation.setText('')
             except ValueError:
                 QMessageBox.warning(self, 'Invalid Input', 'Please enter only numbers separated by commas.')
 
+    def generate_workload(self):
+        values = ask_workload(self, max_size=MAX_SORT_WORKLOAD, default_size=1000)
+        if values is None:
+            return
+        self.array = values
+        self.step_explanation.setText('')
+        self.show_array()
+        self.show_feedback(f'Workload of {len(values)} values generated.')
+
     def bubble_sort(self):
         arr = self.array.copy()
         n = len(arr)
-        if not self.animations_enabled:
-            arr.sort()
-            self.array = arr
-            self.scene.set_values(self.array, animate=False)
-            self.show_feedback('Bubble Sort complete.')
-            self.step_explanation.setText('')
+        if not self.can_animate(len(arr)):
+            self.sort_instantly('Bubble Sort')
             return
         steps = [(arr.copy(), [], 'Bubble Sort: We will repeatedly compare and swap adjacent elements if they are in the wrong order. The largest value "bubbles" to the end each round.')]
         for i in range(n):
@@ -3097,19 +8103,15 @@ class SortingVisualizer(QWidget):
         steps.append((arr.copy(), [], 'Bubble Sort is finished! The array is now sorted from smallest to largest.'))
         def finalize():
             self.array = arr
-            self.scene.set_values(self.array)
+            self.show_array()
             self.show_feedback('Bubble Sort complete.')
         self.play_steps(steps, finalize)
 
     def selection_sort(self):
         arr = self.array.copy()
         n = len(arr)
-        if not self.animations_enabled:
-            arr.sort()
-            self.array = arr
-            self.scene.set_values(self.array, animate=False)
-            self.show_feedback('Selection Sort complete.')
-            self.step_explanation.setText('')
+        if not self.can_animate(len(arr)):
+            self.sort_instantly('Selection Sort')
             return
         steps = [(arr.copy(), [], 'Selection Sort: We repeatedly find the smallest value in the unsorted part and move it to its correct place.')]
         for i in range(n):
@@ -3127,19 +8129,15 @@ class SortingVisualizer(QWidget):
         steps.append((arr.copy(), [], 'Selection Sort is finished! The array is sorted.'))
         def finalize():
             self.array = arr
-            self.scene.set_values(self.array)
+            self.show_array()
             self.show_feedback('Selection Sort complete.')
         self.play_steps(steps, finalize)
 
     def insertion_sort(self):
         arr = self.array.copy()
         n = len(arr)
-        if not self.animations_enabled:
-            arr.sort()
-            self.array = arr
-            self.scene.set_values(self.array, animate=False)
-            self.show_feedback('Insertion Sort complete.')
-            self.step_explanation.setText('')
+        if not self.can_animate(len(arr)):
+            self.sort_instantly('Insertion Sort')
             return
         steps = [(arr.copy(), [], 'Insertion Sort: We build the sorted array one value at a time by inserting each value into its correct position.')]
         for i in range(1, n):
@@ -3156,18 +8154,14 @@ class SortingVisualizer(QWidget):
         steps.append((arr.copy(), [], 'Insertion Sort is finished! The array is sorted.'))
         def finalize():
             self.array = arr
-            self.scene.set_values(self.array)
+            self.show_array()
             self.show_feedback('Insertion Sort complete.')
         self.play_steps(steps, finalize)
 
     def merge_sort(self):
         arr = self.array.copy()
-        if not self.animations_enabled:
-            arr.sort()
-            self.array = arr
-            self.scene.set_values(self.array, animate=False)
-            self.show_feedback('Merge Sort complete.')
-            self.step_explanation.setText('')
+        if not self.can_animate(len(arr)):
+            self.sort_instantly('Merge Sort')
             return
         steps = [(arr.copy(), [], 'Merge Sort: We divide the array into halves, sort each half, and then merge them back together in order.')]
         def merge_sort_rec(l, r):
@@ -3205,18 +8199,14 @@ class SortingVisualizer(QWidget):
         steps.append((arr.copy(), [], 'Merge Sort is finished! The array is sorted.'))
         def finalize():
             self.array = arr
-            self.scene.set_values(self.array)
+            self.show_array()
             self.show_feedback('Merge Sort complete.')
         self.play_steps(steps, finalize)
 
     def quick_sort(self):
         arr = self.array.copy()
-        if not self.animations_enabled:
-            arr.sort()
-            self.array = arr
-            self.scene.set_values(self.array, animate=False)
-            self.show_feedback('Quick Sort complete.')
-            self.step_explanation.setText('')
+        if not self.can_animate(len(arr)):
+            self.sort_instantly('Quick Sort')
             return
         steps = [(arr.copy(), [], 'Quick Sort: We pick a pivot value and move all smaller values to the left and larger to the right, then sort each part recursively.')]
         def quick_sort_rec(l, r):
@@ -3239,72 +8229,915 @@ class SortingVisualizer(QWidget):
         steps.append((arr.copy(), [], 'Quick Sort is finished! The array is sorted.'))
         def finalize():
             self.array = arr
-            self.scene.set_values(self.array)
+            self.show_array()
             self.show_feedback('Quick Sort complete.')
         self.play_steps(steps, finalize)
 
+    def parallel_sort(self):
+        if len(self.array) < 2:
+            QMessageBox.warning(self, 'Too Small', 'Generate a larger array first (try Workload).')
+            return
+        algorithm, ok = QInputDialog.getItem(self, 'Parallel Sort', 'Algorithm:', list(PARALLEL_SORTS), 0, False)
+        if not ok:
+            return
+        cpus = os.cpu_count() or 1
+        max_workers, ok = QInputDialog.getInt(self, 'Parallel Sort', f'Maximum workers (1 to {cpus}):', min(cpus, len(WORKER_COLORS)), 1, cpus)
+        if not ok:
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            result, timeline, rows = benchmark_parallel_sort(self.array, algorithm, max_workers)
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.array = result.tolist()
+        self.lane_scene.show_timeline(timeline, len(self.array), f'{algorithm}, {max_workers} workers, n = {len(self.array)}')
+        self.show_panel(self.lane_view)
+        sequential = rows[0][1]
+        speedups = ', '.join(f'{w}w: {1000 * s:.1f} ms ({sp:.2f}x)' for w, s, sp in rows[1:])
+        self.step_explanation.setText(f'Sequential np.sort: {1000 * sequential:.1f} ms. {speedups}')
+        self.show_feedback(f'{algorithm} complete.')
+
+    def external_sort(self):
+        source, ok = QInputDialog.getItem(self, 'External Sort', 'Input:', ['Current array', 'File (.bin, .npy, .csv)'], 0, False)
+        if not ok:
+            return
+        spilled = None
+        if source == 'Current array':
+            if not self.array:
+                QMessageBox.warning(self, 'Empty Array', 'Generate an array first (try Workload).')
+                return
+            fd, spilled = tempfile.mkstemp(suffix='.bin')
+            os.close(fd)
+            np.asarray(self.array, dtype=np.int64).tofile(spilled)
+            path = spilled
+        else:
+            path, _ = QFileDialog.getOpenFileName(self, 'External Sort', '', 'Data files (*.bin *.npy *.csv *.txt);;All files (*)')
+            if not path:
+                return
+        budget, ok = QInputDialog.getInt(self, 'External Sort', 'Memory budget in KiB:', 1024, 16, 4 * 1024 * 1024)
+        if not ok:
+            if spilled:
+                os.remove(spilled)
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            t0 = time.perf_counter()
+            sorter = ExternalMergeSort(path, budget * 1024).run()
+            elapsed = time.perf_counter() - t0
+        finally:
+            QApplication.restoreOverrideCursor()
+        if spilled:
+            self.array = np.fromfile(sorter.out_path, dtype=sorter.dtype).tolist()
+            os.remove(spilled)
+            os.remove(sorter.out_path)
+            where = ''
+        else:
+            where = f' Output: {sorter.out_path}.'
+        self.external_summary = (
+            f'{sorter.n} values, {budget} KiB budget: {sorter.runs} runs, fan-in {sorter.fan_in}, '
+            f'{sorter.passes} passes, read {sorter.bytes_read / 2**20:.1f} MiB, wrote {sorter.bytes_written / 2**20:.1f} MiB '
+            f'in {elapsed:.2f} s.{where}'
+        )
+        self.external_sorter = sorter
+        self.external_current_step = 0
+        self._stopped = False
+        self.show_panel(self.external_view)
+        if self.animations_enabled and len(sorter.events) <= MAX_DRAWN_WORKLOAD:
+            self.play_external_steps()
+        else:
+            self.external_scene.show_events(sorter.events, sorter.n)
+            self.step_explanation.setText(self.external_summary)
+
+    def play_external_steps(self):
+        sorter = self.external_sorter
+        if self.external_current_step >= len(sorter.events):
+            self.step_explanation.setText(self.external_summary)
+            return
+        kind, p, index, lo, hi, inputs = sorter.events[self.external_current_step]
+        self.external_current_step += 1
+        self.external_scene.show_events(sorter.events, sorter.n, upto=self.external_current_step)
+        if kind == 'run':
+            explanation = f'Run {index}: read values {lo} to {hi - 1} into memory, sort them and spill the run to disk.'
+        elif kind == 'carry':
+            explanation = f'Merge pass {p}: the last run has no partner, so it moves on to the next pass untouched.'
+        else:
+            explanation = f'Merge pass {p}: heap-merge {inputs} runs into one run of {hi - lo} values, reading each run through a memory map.'
+        self.step_explanation.setText(explanation)
+        QTimer.singleShot(900, lambda: (not getattr(self, '_stopped', True) and not sip.isdeleted(self) and self.play_external_steps(), None)[-1])
+
+    def cache_simulation(self):
+        if len(self.array) < 2:
+            QMessageBox.warning(self, 'Too Small', 'Generate a larger array first (try Workload).')
+            return
+        spec, ok = QInputDialog.getText(self, 'Cache Simulator', 'Cache levels as size/ways (L1, L2, ...):', text=DEFAULT_CACHE_SPEC)
+        if not ok:
+            return
+        try:
+            levels = parse_cache_levels(spec)
+        except ValueError:
+            QMessageBox.warning(self, 'Invalid Input', 'Use sizes like 32K/8, 256K/8, 8M/16.')
+            return
+        line_size, ok = QInputDialog.getInt(self, 'Cache Simulator', 'Line size in bytes:', 64, 8, 4096)
+        if not ok:
+            return
+        n, ok = QInputDialog.getInt(self, 'Cache Simulator', f'Values to trace (each sort stops after {CACHE_TRACE_BUDGET:,} accesses):', min(len(self.array), 20000), 2, len(self.array))
+        if not ok:
+            return
+        values = self.array[:n]
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            results = [simulate_sort_cache(name, values, levels, line_size) for name in CACHE_TRACE_SORTS]
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.cache_scene.show_results(results, n)
+        self.show_panel(self.cache_view)
+        ranking = sorted(results, key=lambda r: r['levels'][0][2] / max(1, r['accesses']))
+        self.step_explanation.setText('L1 miss rate, best first: ' + ', '.join(
+            f"{r['name']} {100 * r['levels'][0][2] / max(1, r['accesses']):.2f}%{'' if r['complete'] else ' (partial trace)'}" for r in ranking))
+
     # --- Dijkstra's Algorithm ---
     def dijkstra_algorithm(self):
-        # Example graph: adjacency list [(neighbor, weight), ...]
-        graph = [
-            [(1, 2), (2, 4)],    # 0
-            [(0, 2), (2, 1), (3, 7)], # 1
-            [(0, 4), (1, 1), (3, 3)], # 2
-            [(1, 7), (2, 3)]     # 3
-        ]
-        pos = [(100, 300), (300, 100), (500, 300), (700, 100)]
-        n = len(graph)
-        dist = [999] * n
-        visited = [False] * n
-        prev = [None] * n
+        variant, ok = QInputDialog.getItem(self, "Dijkstra's Algorithm", 'Priority queue:', DIJKSTRA_VARIANTS + ['Benchmark on a random graph'], 0, False)
+        if not ok:
+            return
+        if variant not in DIJKSTRA_VARIANTS:
+            self.benchmark_dijkstra()
+            return
+        source, ok = QInputDialog.getInt(self, "Dijkstra's Algorithm", 'Source node:', 0, 0, len(self.graph) - 1)
+        if not ok:
+            return
+        if self.graph_pos is None:
+            self.run_dijkstra_summary(variant, source)
+            return
         steps = []
-        start = 0
-        dist[start] = 0
-        steps.append((dist.copy(), visited.copy(), None, None, f"Start at node {start}. Set its distance to 0. All others are ∞ (infinity)."))
-        for _ in range(n):
-            # Find the unvisited node with the smallest distance
-            u = None
-            min_dist = 999
-            for i in range(n):
-                if not visited[i] and dist[i] < min_dist:
-                    min_dist = dist[i]
-                    u = i
-            if u is None:
-                break
-            visited[u] = True
-            steps.append((dist.copy(), visited.copy(), u, None, f"Pick node {u} (smallest distance not visited). Mark as visited."))
-            for v, w in graph[u]:
-                if not visited[v]:
-                    if dist[u] + w < dist[v]:
-                        old = dist[v]
-                        dist[v] = dist[u] + w
-                        prev[v] = u
-                        steps.append((dist.copy(), visited.copy(), v, (u, v), f"Check neighbor {v} of node {u}. Update its distance from {old} to {dist[v]} (via {u})."))
-                    else:
-                        steps.append((dist.copy(), visited.copy(), v, (u, v), f"Check neighbor {v} of node {u}. No update needed (current distance is shorter)."))
-        steps.append((dist.copy(), visited.copy(), None, None, "All nodes visited. Shortest distances from start node are shown."))
+        try:
+            if variant == DIJKSTRA_VARIANTS[0]:
+                dijkstra_heap(self.graph, source, steps)
+            else:
+                dijkstra_linear(self.graph, source, steps)
+        except ValueError as e:
+            QMessageBox.warning(self, 'Invalid Graph', f'{e}\nPick Bellman-Ford in Shortest Path for graphs with negative weights.')
+            return
+        steps.append((steps[-1][0], steps[-1][1], None, None, f"All nodes visited. Shortest distances from node {source} are shown.") + steps[-1][5:])
         self.dijkstra_steps = steps
         self.dijkstra_current_step = 0
-        self.view.setVisible(False)
-        self.dijkstra_view.setVisible(True)
+        self.show_panel(self.dijkstra_view)
         self.play_dijkstra_steps()
 
+    def run_dijkstra_summary(self, variant, source=0):
+        # Graphs too large to draw are searched once and summarized
+        n = len(self.graph)
+        if variant != DIJKSTRA_VARIANTS[0] and n > LINEAR_DIJKSTRA_LIMIT:
+            QMessageBox.warning(self, 'Graph Too Large', f'The linear scan is limited to {LINEAR_DIJKSTRA_LIMIT} nodes; use the binary heap.')
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            t0 = time.perf_counter()
+            dist, prev, stats = (dijkstra_heap if variant == DIJKSTRA_VARIANTS[0] else dijkstra_linear)(self.graph, source)
+            elapsed = time.perf_counter() - t0
+        except ValueError as e:
+            QMessageBox.warning(self, 'Invalid Graph', f'{e}\nPick Bellman-Ford in Shortest Path for graphs with negative weights.')
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        if self.dijkstra_scene.graph_item is not None:
+            self.dijkstra_scene.graph_item.show_tree(prev, dist)
+        reached = [d for d in dist if d != INF]
+        counters = ', '.join(f'{v:,} {k.replace("_", "-")}' for k, v in stats.items())
+        self.step_explanation.setText(
+            f'From node {source}: reached {len(reached):,} of {n:,} nodes, farthest at distance {max(reached)} '
+            f'in {1000 * elapsed:.0f} ms ({counters}).')
+        self.show_feedback("Dijkstra's Algorithm complete.")
+
+    def set_graph(self, graph, positions=None, directed=False):
+        # Small graphs are drawn; larger ones are only searched and summarized
+        self.stop_layout()
+        self.close_apsp()
+        self.hierarchy = None
+        self.dynamic = None
+        self.graph = graph
+        self.graph_directed = directed
+        self.graph_pos = None
+        self.dijkstra_view.resetTransform()
+        if positions is None:
+            positions = getattr(graph, 'positions', None)
+        if len(graph) <= MAX_DRAWN_GRAPH:
+            self.graph_pos = fit_positions(positions) if positions is not None and len(graph) > 1 else circle_positions(len(graph))
+            self.dijkstra_scene.draw_graph(self.graph, self.graph_pos)
+            self.show_panel(self.dijkstra_view)
+        elif positions is not None and len(graph) <= MAX_PREVIEW_GRAPH:
+            # Too many nodes for items: one culled item, explored by zooming and clicking
+            self.dijkstra_scene.draw_preview(fit_positions(positions), *graph_edges(graph))
+            self.show_panel(self.dijkstra_view)
+        else:
+            self.dijkstra_scene.clear_scene()
+
+    def load_graph(self):
+        path, _ = QFileDialog.getOpenFileName(self, 'Load Graph', '', GRAPH_FILE_FILTER)
+        if not path:
+            return
+        # DIMACS arcs are directed; edge lists ask
+        directed = True
+        if not path.lower().endswith('.gr'):
+            kind, ok = QInputDialog.getItem(self, 'Load Graph', 'Edges are:', ['Undirected', 'Directed'], 0, False)
+            if not ok:
+                return
+            directed = kind == 'Directed'
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            t0 = time.perf_counter()
+            graph = CSRGraph.load(path, directed)
+            elapsed = time.perf_counter() - t0
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, 'Load Failed', str(e))
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        if len(graph) == 0:
+            QMessageBox.warning(self, 'Load Failed', 'The graph has no nodes.')
+            return
+        self.set_graph(graph, directed=directed)
+        self.step_explanation.setText(f'{os.path.basename(path)}: {len(graph):,} nodes, {graph.num_arcs:,} arcs, loaded in {elapsed:.2f} s.')
+        self.show_feedback('Graph loaded.')
+
+    def generate_graph(self):
+        model, ok = QInputDialog.getItem(self, 'Generate Graph', 'Model:', GRAPH_MODELS, 0, False)
+        if not ok:
+            return
+        n, ok = QInputDialog.getInt(self, 'Generate Graph', f'Number of nodes (drawn up to {MAX_DRAWN_GRAPH}):', 30, 10, MAX_GENERATED_GRAPH)
+        if not ok:
+            return
+        degree = 4
+        if model not in ('Grid', 'Road-like'):
+            degree, ok = QInputDialog.getInt(self, 'Generate Graph', 'Average degree:', 4, 1, 32)
+            if not ok:
+                return
+        seed, ok = QInputDialog.getInt(self, 'Generate Graph', 'Seed:', 0, 0, 2**31 - 1)
+        if not ok:
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            t0 = time.perf_counter()
+            graph = GraphGenerator(seed).generate(model, n, degree)
+            elapsed = time.perf_counter() - t0
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.set_graph(graph)
+        self.step_explanation.setText(f'{model} graph (seed {seed}): {len(graph):,} nodes, {graph.num_arcs // 2:,} edges, generated in {elapsed:.2f} s.')
+        self.show_feedback('Graph generated.')
+
+    def layout_graph(self):
+        if len(self.graph) > MAX_LAYOUT_NODES:
+            QMessageBox.warning(self, 'Graph Too Large', f'Layouts are limited to {MAX_LAYOUT_NODES:,} nodes.')
+            return
+        self.stop_layout()
+        self._stopped = False
+        self.layout_thread = LayoutThread(ForceLayout(self.graph))
+        self.layout_thread.positions_ready.connect(self.show_layout)
+        self.layout_thread.start()
+        self.show_panel(self.dijkstra_view)
+
+    def show_layout(self, positions, iteration):
+        thread = self.layout_thread
+        # Frames from a cancelled layout may still be queued
+        if self.sender() is not thread or sip.isdeleted(self):
+            return
+        points = fit_positions(positions)
+        if len(self.graph) <= MAX_DRAWN_GRAPH:
+            self.graph_pos = points
+            self.dijkstra_scene.draw_graph(self.graph, points)
+        else:
+            self.dijkstra_scene.draw_preview(points, thread.layout.u, thread.layout.v)
+        self.step_explanation.setText(f'Force-directed layout of {len(self.graph):,} nodes: iteration {iteration} of {thread.iterations}.')
+        if iteration == thread.iterations:
+            if isinstance(self.graph, CSRGraph):
+                self.graph.positions = positions
+            self.show_feedback('Layout complete.')
+
+    def pick_node(self, point, radius):
+        item = self.dijkstra_scene.graph_item
+        if item is None:
+            return
+        if item.detailed:
+            radius = max(radius, 20)
+        node = item.index.nearest(point.x(), point.y(), radius)
+        item.select(node)
+        if node is None:
+            return
+        nearby = len(item.index.within(point.x(), point.y(), 5 * radius))
+        neighbors = sorted(self.graph[node])
+        shown = ', '.join(f'{v} ({w})' for v, w in neighbors[:8]) + (', ...' if len(neighbors) > 8 else '')
+        text = f'Node {node}: {len(neighbors)} arcs to {shown or "no nodes"}. {nearby:,} nodes within 5x the click radius.'
+        if self.apsp is not None:
+            # The clicked node becomes the source without searching again
+            t0 = time.perf_counter()
+            dist, prev = self.apsp.row(node)
+            elapsed = time.perf_counter() - t0
+            item.show_tree(prev, dist)
+            item.distances = dist
+            reached = [d for d in dist if d != INF]
+            text += f'\nAs source (all-pairs row read in {1000 * elapsed:.1f} ms): reaches {len(reached):,} nodes, farthest at distance {max(reached)}.'
+        self.step_explanation.setText(text)
+
+    def all_pairs(self):
+        n = len(self.graph)
+        if n > MAX_APSP_NODES:
+            QMessageBox.warning(self, 'Graph Too Large', f'All-pairs caches are limited to {MAX_APSP_NODES:,} nodes ({n:,} would need {n * n:,} entries).')
+            return
+        method, ok = QInputDialog.getItem(self, 'All Pairs', 'Method:', APSP_METHODS, 0, False)
+        if not ok:
+            return
+        workers = 1
+        if method != APSP_METHODS[2]:
+            cpus = os.cpu_count() or 1
+            workers, ok = QInputDialog.getInt(self, 'All Pairs', f'Dijkstra workers (1 to {cpus}):', cpus, 1, cpus)
+            if not ok:
+                return
+        self.close_apsp()
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            self.apsp = APSPCache(self.graph, method, workers)
+        except ValueError as e:
+            QMessageBox.warning(self, 'Invalid Graph', str(e))
+            return
+        except OSError as e:
+            QMessageBox.warning(self, 'All Pairs Failed', str(e))
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        cache = self.apsp
+        where = 'in memory' if cache.in_memory else f'memory-mapped in {cache.directory}'
+        self.step_explanation.setText(
+            f'{cache.method} on {n:,} nodes with {cache.workers} worker(s) in {cache.elapsed:.2f} s: '
+            f'{cache.nbytes / 2**20:.1f} MB of {cache.dist.dtype} distances and {cache.pred.dtype} predecessors, {where}.\n'
+            f'Click a node to make it the source, or pick "{APSP_QUERY}" in Shortest Path.')
+        self.show_feedback('All-pairs shortest paths cached.')
+
+    def contraction_hierarchy(self):
+        n = len(self.graph)
+        if n > MAX_HIERARCHY_NODES:
+            QMessageBox.warning(self, 'Graph Too Large', f'Contraction hierarchies are limited to {MAX_HIERARCHY_NODES:,} nodes.')
+            return
+        queries, ok = QInputDialog.getInt(self, 'Contraction Hierarchy', 'Random queries to compare with Dijkstra:', 100, 1, 10000)
+        if not ok:
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            hierarchy = ContractionHierarchy(self.graph)
+            query_time, dijkstra_time, settled, dijkstra_settled, matched = hierarchy.benchmark(self.graph, queries)
+        except ValueError as e:
+            QMessageBox.warning(self, 'Invalid Graph', str(e))
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.hierarchy = hierarchy
+        self.show_hierarchy()
+        counters = ', '.join(f'{v:,} {k.replace("_", "-")}' for k, v in hierarchy.stats.items())
+        text = (f'Contraction hierarchy of {n:,} nodes in {hierarchy.elapsed:.2f} s: {hierarchy.shortcut_count:,} shortcuts '
+                f'added to {hierarchy.num_arcs:,} arcs ({counters}).\n'
+                f'{queries} random queries: {1000 * query_time:.2f} ms each against {1000 * dijkstra_time:.2f} ms for Dijkstra '
+                f'({dijkstra_time / query_time if query_time else INF:.1f}x), {settled:.0f} against {dijkstra_settled:.0f} nodes settled, '
+                f'{matched} of {queries} distances equal.')
+        if self.dijkstra_scene.graph_item is not None:
+            text += '\nNodes run from blue (contracted first) to red (contracted last); shortcuts are purple.'
+        if n <= MAX_DRAWN_GRAPH:
+            text += ' Order: ' + ' '.join(map(str, sorted(range(n), key=hierarchy.rank.__getitem__)))
+        self.step_explanation.setText(text)
+        self.show_feedback(f'Contraction hierarchy ready; pick "{CH_QUERY}" in Shortest Path.')
+
+    def show_hierarchy(self):
+        item = self.dijkstra_scene.graph_item
+        if item is None:
+            return
+        levels = np.array(self.hierarchy.rank, dtype=np.int64) * len(LEVEL_COLORS) // max(1, self.hierarchy.n)
+        u, v = self.hierarchy.shortcut_arcs()
+        item.show_classes(levels, LEVEL_COLORS, np.hstack([item.points[u], item.points[v]]))
+        self.show_panel(self.dijkstra_view)
+
+    def minimum_spanning_tree(self):
+        name, ok = QInputDialog.getItem(self, 'Minimum Spanning Tree', 'Algorithm:', MST_ALGORITHMS + ['Benchmark on a random graph'], 0, False)
+        if not ok:
+            return
+        if name not in MST_ALGORITHMS:
+            self.benchmark_mst()
+            return
+        if self.graph_pos is not None:
+            steps = []
+            tree, total, stats = MST_FUNCTIONS[name](self.graph, steps)
+            counters = ', '.join(f'{v:,} {k.replace("_", "-")}' for k, v in stats.items())
+            steps.append((None, None, None, f'{name}: {len(tree)} tree edges with total weight {total} ({counters}).', None))
+            if name == MST_ALGORITHMS[0]:
+                panel = ('Candidate edges (heap)', 'edge', 'w')
+            else:
+                panel = ('Priority queue (heap)', 'node', 'key')
+            self.play_graph_steps(steps, panel)
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            t0 = time.perf_counter()
+            tree, total, stats = MST_FUNCTIONS[name](self.graph)
+            elapsed = time.perf_counter() - t0
+        finally:
+            QApplication.restoreOverrideCursor()
+        if self.dijkstra_scene.graph_item is not None and tree:
+            a, b, _ = zip(*tree)
+            self.dijkstra_scene.graph_item.show_edges(a, b, EDGE_TREE)
+        n = len(self.graph)
+        counters = ', '.join(f'{v:,} {k.replace("_", "-")}' for k, v in stats.items())
+        self.step_explanation.setText(
+            f'{name} on {n:,} nodes: {len(tree):,} tree edges in {n - len(tree):,} component(s), '
+            f'total weight {total}, in {1000 * elapsed:.0f} ms ({counters}).')
+        self.show_feedback('Minimum spanning tree complete.')
+
+    def benchmark_mst(self):
+        m, ok = QInputDialog.getInt(self, 'MST Benchmark', 'Number of edges:', 100000, 1000, MAX_MST_BENCHMARK_EDGES)
+        if not ok:
+            return
+        degree, ok = QInputDialog.getInt(self, 'MST Benchmark', 'Average degree:', 8, 2, 32)
+        if not ok:
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            graph = GraphGenerator(m).generate('Erdős–Rényi', max(10, 2 * m // degree), degree)
+            edges = len(undirected_edges(graph)[0])
+            lines, totals = [], set()
+            for name in MST_ALGORITHMS:
+                t0 = time.perf_counter()
+                tree, total, stats = MST_FUNCTIONS[name](graph)
+                elapsed = time.perf_counter() - t0
+                totals.add(total)
+                counters = ', '.join(f'{v:,} {k.replace("_", "-")}' for k, v in stats.items())
+                lines.append(f'{name}: {1000 * elapsed:.0f} ms, {edges / elapsed / 1e6:.2f} M edges/s ({counters})')
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.step_explanation.setText(
+            f'Erdős–Rényi graph, {len(graph):,} nodes and {edges:,} edges; total weight {", ".join(map(str, totals))} '
+            f'({"all equal" if len(totals) == 1 else "MISMATCH"}):\n' + '\n'.join(lines))
+        self.show_feedback('MST benchmark complete.')
+
+    def traverse(self):
+        name, ok = QInputDialog.getItem(self, 'Traversal', 'Algorithm:', TRAVERSALS, 0, False)
+        if not ok:
+            return
+        n = len(self.graph)
+        graph, source = self.graph, 0
+        if name in ('BFS', 'DFS'):
+            source, ok = QInputDialog.getInt(self, 'Traversal', 'Source node:', 0, 0, n - 1)
+        else:
+            orientation, ok = QInputDialog.getItem(self, 'Traversal', 'Arcs:', ORIENTATIONS, 0, False)
+            if ok:
+                graph = orient_edges(self.graph, orientation)
+        if not ok:
+            return
+        steps = [] if self.graph_pos is not None else None
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            t0 = time.perf_counter()
+            if name == 'BFS':
+                order, parent, depth, stats = bfs(graph, source, steps)
+            elif name == 'DFS':
+                order, parent, stats = dfs(graph, source, steps)
+            elif name == 'Topological sort (Kahn)':
+                order, stats = topological_sort(graph, steps)
+            else:
+                component, count, stats = (tarjan_scc if name == 'SCC (Tarjan)' else kosaraju_scc)(graph, steps)
+            elapsed = time.perf_counter() - t0
+        finally:
+            QApplication.restoreOverrideCursor()
+        if name in ('BFS', 'DFS'):
+            reached = [INF] * n
+            for v in order:
+                reached[v] = depth[v] if name == 'BFS' else 0
+            result = f'{name} from node {source} reached {len(order):,} of {n:,} nodes'
+            if name == 'BFS':
+                result += f' in {max(depth) + 1} levels'
+            finish = lambda item: item.show_tree(parent, reached)
+        elif name == 'Topological sort (Kahn)':
+            result = f'Kahn ordered {len(order):,} of {n:,} nodes'
+            if len(order) < n:
+                result += f'; the other {n - len(order):,} lie on or behind cycles (gray)'
+            if n <= MAX_DRAWN_GRAPH and order:
+                result += ': ' + ' '.join(map(str, order))
+            # Position in the order from blue to red; unordered nodes gray
+            classes = np.full(n, len(LEVEL_COLORS), dtype=np.int64)
+            classes[order] = np.arange(len(order)) * len(LEVEL_COLORS) // max(1, len(order))
+            finish = lambda item: item.show_classes(classes, LEVEL_COLORS + [QColor(150, 150, 170)])
+        else:
+            sizes = np.bincount(component, minlength=count)
+            result = f'{name}: {count:,} strongly connected components, the largest with {int(sizes.max()):,} of {n:,} nodes'
+            finish = lambda item: item.show_classes(np.asarray(component) % len(WORKER_COLORS), WORKER_COLORS)
+        counters = ', '.join(f'{v:,} {k.replace("_", "-")}' for k, v in stats.items())
+        text = f'{result} ({counters}).'
+        if steps is not None:
+            steps.append((None, None, None, text, None))
+            self.play_graph_steps(steps, TRAVERSAL_PANELS[name], finish)
+            return
+        if self.dijkstra_scene.graph_item is not None:
+            finish(self.dijkstra_scene.graph_item)
+        visited = len(order) if name in TRAVERSALS[:3] else n
+        elapsed = max(elapsed, 1e-9)
+        self.step_explanation.setText(
+            f'{text}\n{1000 * elapsed:.0f} ms: {visited / elapsed / 1e6:.2f} M nodes/s, '
+            f'{stats["arcs_scanned"] / elapsed / 1e6:.2f} M arcs/s.')
+        self.show_feedback(f'{name} complete.')
+
+    def parallel_bfs(self):
+        n = len(self.graph)
+        source, ok = QInputDialog.getInt(self, 'Parallel BFS', 'Source node:', 0, 0, n - 1)
+        if not ok:
+            return
+        cpus = os.cpu_count() or 1
+        max_workers, ok = QInputDialog.getInt(self, 'Parallel BFS', f'Maximum workers (1 to {cpus}):', min(cpus, len(WORKER_COLORS)), 1, cpus)
+        if not ok:
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            owner, depth, levels, contended, rows = benchmark_parallel_bfs(self.graph, source, max_workers)
+        finally:
+            QApplication.restoreOverrideCursor()
+        item = self.dijkstra_scene.graph_item
+        if item is not None:
+            # Unreached nodes get the extra gray class
+            item.show_classes(np.where(owner < 0, len(WORKER_COLORS), owner % len(WORKER_COLORS)), WORKER_COLORS + [QColor(150, 150, 170)])
+            self.show_panel(self.dijkstra_view)
+        claims = np.bincount(owner[owner >= 0], minlength=max_workers)
+        shares = ', '.join(f'w{w}: {c:,}' for w, c in enumerate(claims.tolist()))
+        timings = '\n'.join(f'{w} worker(s): {1000 * s:.0f} ms, {teps / 1e6:.2f} M TEPS ({sp:.2f}x)' for w, s, teps, sp in rows[1:])
+        self.step_explanation.setText(
+            f'Level-synchronous BFS from node {source}: {int((depth >= 0).sum()):,} of {n:,} nodes in {levels} levels, '
+            f'{contended:,} nodes claimed by two workers in the same level. Nodes claimed per worker: {shares}.\n'
+            f'Same kernel in this process, no pool: {1000 * rows[0][1]:.0f} ms, {rows[0][2] / 1e6:.2f} M TEPS\n{timings}')
+        self.show_feedback('Parallel BFS complete.')
+
+    def max_flow(self):
+        name, ok = QInputDialog.getItem(self, 'Max Flow', 'Algorithm (weights are capacities):', FLOW_ALGORITHMS + ['Benchmark on random networks'], 0, False)
+        if not ok:
+            return
+        if name not in FLOW_ALGORITHMS:
+            self.benchmark_max_flow()
+            return
+        n = len(self.graph)
+        source, ok = QInputDialog.getInt(self, 'Max Flow', 'Source node:', 0, 0, n - 1)
+        if not ok:
+            return
+        sink, ok = QInputDialog.getInt(self, 'Max Flow', 'Sink node:', n - 1, 0, n - 1)
+        if not ok:
+            return
+        try:
+            network = FlowNetwork(self.graph)
+        except ValueError as e:
+            QMessageBox.warning(self, 'Invalid Graph', str(e))
+            return
+        steps = [] if self.graph_pos is not None else None
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            t0 = time.perf_counter()
+            value, stats = FLOW_FUNCTIONS[name](network, source, sink, steps)
+            elapsed = time.perf_counter() - t0
+        finally:
+            QApplication.restoreOverrideCursor()
+        side = network.reachable(source)
+        cut = sum(1 for u in range(n) if side[u] for i in range(network.start[u], network.start[u + 1])
+                  if not network.arcs[i] & 1 and not side[network.to[network.arcs[i]]])
+        counters = ', '.join(f'{v:,} {k.replace("_", "-")}' for k, v in stats.items())
+        text = (f'{name}: maximum flow {value} from node {source} to node {sink} ({counters}). '
+                f'The minimum cut has {cut:,} arcs and {sum(side):,} nodes on the source side (green).')
+        # Source side of the minimum cut green, sink side gray
+        finish = lambda item: item.show_classes(np.where(side, 0, 1), [QColor(120, 220, 120), QColor(150, 150, 170)])
+        if steps is not None:
+            steps.append(([], {}, None, text, None))
+            self.play_graph_steps(steps, finish=finish, apply=self.show_flow_step)
+            return
+        if self.dijkstra_scene.graph_item is not None:
+            finish(self.dijkstra_scene.graph_item)
+        self.step_explanation.setText(f'{text}\n{1000 * elapsed:.0f} ms.')
+        self.show_feedback('Maximum flow complete.')
+
+    def show_flow_step(self, item, step):
+        path, labels, levels = step[:3]
+        item.show_flow(path, labels)
+        if levels is not None:
+            # Dinic phase: nodes colored by BFS level, unreachable ones gray
+            classes = np.array([min(d, len(LEVEL_COLORS) - 1) if d >= 0 else len(LEVEL_COLORS) for d in levels])
+            item.show_classes(classes, LEVEL_COLORS + [QColor(150, 150, 170)])
+
+    def benchmark_max_flow(self):
+        n, ok = QInputDialog.getInt(self, 'Max Flow Benchmark', 'Number of nodes:', 2000, 10, 200000)
+        if not ok:
+            return
+        degree, ok = QInputDialog.getInt(self, 'Max Flow Benchmark', 'Average degree:', 8, 2, 32)
+        if not ok:
+            return
+        lines = []
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            for model in ('Erdős–Rényi', 'Random Geometric', 'Grid'):
+                graph = GraphGenerator(n).generate(model, n, degree)
+                network = FlowNetwork(graph)
+                results = []
+                for name in FLOW_ALGORITHMS:
+                    network.reset()
+                    t0 = time.perf_counter()
+                    value, stats = FLOW_FUNCTIONS[name](network, 0, n - 1)
+                    elapsed = time.perf_counter() - t0
+                    counters = ', '.join(f'{v:,} {k.replace("_", "-")}' for k, v in stats.items())
+                    results.append((value, elapsed, f'{name} {1000 * elapsed:.0f} ms ({counters})'))
+                same = 'same value' if results[0][0] == results[1][0] else 'VALUES DIFFER'
+                speedup = results[0][1] / results[1][1] if results[1][1] else INF
+                lines.append(f'{model}, flow {results[1][0]} ({same}, Dinic {speedup:.1f}x): ' + '; '.join(r[2] for r in results))
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.step_explanation.setText(f'Node 0 to node {n - 1} on {n:,}-node networks:\n' + '\n'.join(lines))
+        self.show_feedback('Max flow benchmark complete.')
+
+    def edit_weight(self):
+        mode, ok = QInputDialog.getItem(self, 'Edit Weight', 'Action:', WEIGHT_EDITS, 0, False)
+        if not ok:
+            return
+        n = len(self.graph)
+        if mode != WEIGHT_EDITS[0]:
+            self.benchmark_weight_edits()
+            return
+        if self.dynamic is None:
+            source, ok = QInputDialog.getInt(self, 'Edit Weight', 'Source of the shortest-path tree kept up to date:', 0, 0, n - 1)
+            if not ok:
+                return
+            try:
+                self.dynamic = DynamicShortestPaths(self.graph, source)
+            except ValueError as e:
+                QMessageBox.warning(self, 'Invalid Graph', str(e))
+                return
+        item = self.dijkstra_scene.graph_item
+        selected = item.selected if item is not None and item.selected is not None else self.dynamic.source
+        u, ok = QInputDialog.getInt(self, 'Edit Weight', 'Tail node of the arc:', selected, 0, n - 1)
+        if not ok:
+            return
+        arcs = list(self.graph[u])
+        if not arcs:
+            QMessageBox.warning(self, 'No Arcs', f'Node {u} has no outgoing arcs.')
+            return
+        choice, ok = QInputDialog.getItem(self, 'Edit Weight', 'Arc:', [f'{u} -> {v} (weight {w})' for v, w in arcs], 0, False)
+        if not ok:
+            return
+        i = [f'{u} -> {v} (weight {w})' for v, w in arcs].index(choice)
+        v, old = arcs[i]
+        weight, ok = QInputDialog.getInt(self, 'Edit Weight', f'New weight of {u} -> {v}:', int(old), 0, 10**9)
+        if not ok or weight == old:
+            return
+        if self.graph is EXAMPLE_GRAPH:
+            # Never edit the shared example itself
+            self.graph = [list(adj) for adj in EXAMPLE_GRAPH]
+            self.dijkstra_scene.graph = self.graph
+        # The reverse arc of an undirected edge changes with it
+        edits = [(u, i)]
+        twin = None if self.graph_directed else twin_arc(self.graph, u, i)
+        if twin is not None:
+            edits.append((v, twin))
+        touched, totals = set(), {}
+        t0 = time.perf_counter()
+        for a, j in edits:
+            set_arc_weight(self.graph, a, j, weight)
+            nodes, stats = self.dynamic.update(self.dynamic.start[a] + j, weight)
+            touched.update(nodes)
+            for k, c in stats.items():
+                totals[k] = totals.get(k, 0) + c
+        elapsed = time.perf_counter() - t0
+        totals['touched'] = len(touched)
+        # Caches built on the old weights no longer hold
+        self.close_apsp()
+        self.hierarchy = None
+        t0 = time.perf_counter()
+        dist, _, full = dijkstra_heap(self.graph, self.dynamic.source)
+        full_time = time.perf_counter() - t0
+        same = 'matches' if dist == self.dynamic.dist else 'DIFFERS FROM'
+        if item is not None:
+            item.set_weight((u, v), weight)
+            item.show_tree(self.dynamic.prev(), self.dynamic.dist)
+            item.distances = self.dynamic.dist
+            # Touched nodes stand out; the rest keep the visited colors
+            item.show_classes(np.where(np.isin(np.arange(n), list(touched)), 0, np.where(np.array(self.dynamic.dist) != INF, 1, 2)),
+                              [QColor(255, 140, 0), item.node_colors[1], item.node_colors[0]])
+            item.show_mark(None, (u, v), EDGE_PATH)
+            self.show_panel(self.dijkstra_view)
+        counters = ', '.join(f'{c:,} {k.replace("_", "-")}' for k, c in totals.items())
+        shown = ', '.join(map(str, sorted(touched)[:10])) + (', ...' if len(touched) > 10 else '')
+        self.step_explanation.setText(
+            f'{u} -> {v}{" (both directions)" if len(edits) > 1 else ""}: weight {old} -> {weight}. '
+            f'Repair from source {self.dynamic.source} in {1000 * elapsed:.2f} ms ({counters}){": " + shown if touched else ""}.\n'
+            f'A full recompute settles {full["pops"]:,} of {n:,} nodes with {full["relaxations"]:,} relaxations in {1000 * full_time:.1f} ms '
+            f'and {same} the repaired distances.')
+        self.show_feedback('Weight updated.')
+
+    def benchmark_weight_edits(self):
+        n = len(self.graph)
+        source, ok = QInputDialog.getInt(self, 'Weight Edit Benchmark', 'Source node:', 0, 0, n - 1)
+        if not ok:
+            return
+        edits, ok = QInputDialog.getInt(self, 'Weight Edit Benchmark', 'Random edits (weights scaled x0.5 to x2):', 1000, 1, 10**6)
+        if not ok:
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            t0 = time.perf_counter()
+            dynamic = DynamicShortestPaths(self.graph, source)
+            build = time.perf_counter() - t0
+            touched, elapsed, totals = dynamic.benchmark(edits)
+            t0 = time.perf_counter()
+            dist, _, full = dijkstra_heap(dynamic.graph(), source)
+            full_time = time.perf_counter() - t0
+        except ValueError as e:
+            QMessageBox.warning(self, 'Invalid Graph', str(e))
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        # The edits ran on a copy of the weights; the graph itself is unchanged
+        per_edit = elapsed / max(1, len(touched))
+        changed = sum(1 for t in touched if t)
+        self.step_explanation.setText(
+            f'{len(touched):,} random edits from node {source} on {n:,} nodes (initial tree in {1000 * build:.0f} ms): '
+            f'{changed:,} changed the tree, touching {np.mean(touched) if touched else 0:.1f} nodes on average and {max(touched, default=0):,} at most '
+            f'({totals["arcs_scanned"]:,} arcs scanned in all).\n'
+            f'Repair: {1000 * per_edit:.3f} ms per edit. Full recompute: {full["pops"]:,} nodes settled in {1000 * full_time:.1f} ms '
+            f'({full_time / per_edit if per_edit else INF:.0f}x); final distances {"match" if dist == dynamic.dist else "DIFFER"}.')
+        self.show_feedback('Weight edit benchmark complete.')
+
+    def play_graph_steps(self, steps, panel=(), finish=None, apply=None):
+        # Steps are (node, edge, style, explanation, queue), each applied in O(1)
+        # unless apply(item, step) handles another layout; finish(item) runs
+        # after the last one
+        self.graph_steps = steps
+        self.graph_panel = panel
+        self.graph_finish = finish
+        self.graph_apply = apply or (lambda item, step: item.show_mark(*step[:3]))
+        self.graph_current_step = 0
+        self._stopped = False
+        self.dijkstra_scene.draw_graph(self.graph, self.graph_pos)
+        self.graph_steps_item = self.dijkstra_scene.graph_item
+        self.show_panel(self.dijkstra_view)
+        self.play_next_graph_step()
+
+    def play_next_graph_step(self):
+        # A graph loaded meanwhile ends the playback
+        if self.dijkstra_scene.graph_item is not self.graph_steps_item:
+            return
+        if self.graph_current_step >= len(self.graph_steps):
+            if self.graph_finish is not None:
+                self.graph_finish(self.graph_steps_item)
+                self.graph_finish = None
+            return
+        step = self.graph_steps[self.graph_current_step]
+        explanation, queue = step[3], step[4]
+        self.graph_apply(self.graph_steps_item, step)
+        self.dijkstra_scene.show_queue(queue, *self.graph_panel)
+        self.step_explanation.setText(explanation)
+        self.feedback.setText('')
+        self.graph_current_step += 1
+        QTimer.singleShot(GRAPH_STEP_MS, lambda: (not getattr(self, '_stopped', True) and not sip.isdeleted(self) and self.play_next_graph_step(), None)[-1])
+
+    def close_apsp(self):
+        if self.apsp is not None:
+            self.apsp.close()
+            self.apsp = None
+
+    def stop_layout(self):
+        if self.layout_thread is not None:
+            self.layout_thread.requestInterruption()
+            self.layout_thread.wait()
+            self.layout_thread = None
+
+    def shortest_path(self):
+        algorithms = SHORTEST_PATH_ALGORITHMS + ([APSP_QUERY] if self.apsp is not None else []) + ([CH_QUERY] if self.hierarchy is not None else [])
+        name, ok = QInputDialog.getItem(self, 'Shortest Path', 'Algorithm:', algorithms + ['Compare all'], 0, False)
+        if not ok:
+            return
+        n = len(self.graph)
+        source, ok = QInputDialog.getInt(self, 'Shortest Path', 'Source node:', 0, 0, n - 1)
+        if not ok:
+            return
+        target, ok = QInputDialog.getInt(self, 'Shortest Path', 'Target node:', n - 1, 0, n - 1)
+        if not ok:
+            return
+        positions = getattr(self.graph, 'positions', None)
+        if positions is None:
+            positions = self.graph_pos
+        if name.startswith('A*') and positions is None:
+            QMessageBox.warning(self, 'No Positions', 'A* needs node positions; run Layout first.')
+            return
+        if name in algorithms and self.graph_pos is not None:
+            self.play_shortest_path(name, source, target, positions)
+            return
+        names = [name] if name in algorithms else [a for a in algorithms if positions is not None or not a.startswith('A*')]
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            results = [self.run_shortest_path(a, source, target, positions) for a in names]
+        except ValueError as e:
+            QMessageBox.warning(self, 'Invalid Graph', str(e))
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        if self.dijkstra_scene.graph_item is not None:
+            self.dijkstra_scene.graph_item.show_path(results[0][1])
+        self.step_explanation.setText(f'Node {source} to node {target} on {n:,} nodes:\n' + '\n'.join(line for line, _ in results))
+        self.show_feedback('Shortest path complete.')
+
+    def search(self, name, source, target, positions, steps=None):
+        # (distance, path, stats, negative cycle) of one algorithm on the current graph
+        if name == APSP_QUERY:
+            path = self.apsp.path(source, target)
+            return self.apsp.distance(source, target), path, {'predecessor_lookups': max(0, len(path) - 1)}, None
+        if name == CH_QUERY:
+            return self.hierarchy.query(source, target) + (None,)
+        if name == 'Bellman-Ford':
+            dist, prev, stats, cycle = bellman_ford(self.graph, source, steps)
+            if cycle is not None or dist[target] == INF:
+                return dist[target], [], stats, cycle
+            return dist[target], trace_path(prev, source, target), stats, None
+        if name == 'Bidirectional Dijkstra':
+            return bidirectional_dijkstra(self.graph, source, target, steps=steps) + (None,)
+        heuristic = None
+        if name.startswith('A*'):
+            heuristic = position_heuristic(self.graph, positions, target, name[4:-1])
+        return astar(self.graph, source, target, heuristic, steps) + (None,)
+
+    def run_shortest_path(self, name, source, target, positions):
+        t0 = time.perf_counter()
+        distance, path, stats, cycle = self.search(name, source, target, positions)
+        elapsed = time.perf_counter() - t0
+        counters = ', '.join(f'{v:,} {k.replace("_", "-")}' for k, v in stats.items())
+        if cycle is not None:
+            result = f'negative cycle through {len(cycle)} nodes'
+        elif distance == INF:
+            result = 'unreachable'
+        else:
+            result = f'distance {distance}, {len(path) - 1} hops'
+        return f'{name}: {result} in {1000 * elapsed:.0f} ms ({counters})', path
+
+    def play_shortest_path(self, name, source, target, positions):
+        steps = []
+        try:
+            distance, path, stats, cycle = self.search(name, source, target, positions, steps)
+        except ValueError as e:
+            QMessageBox.warning(self, 'Invalid Graph', str(e))
+            return
+        counters = ', '.join(f'{v:,} {k.replace("_", "-")}' for k, v in stats.items())
+        if cycle is not None:
+            result = f'Negative cycle found: {" -> ".join(map(str, cycle))}.'
+        elif distance == INF:
+            result = f'Node {target} is unreachable from node {source}.'
+        else:
+            result = f'Shortest path {" -> ".join(map(str, path))} with distance {distance}.'
+        if not steps:
+            steps.append((None, None, None, None, ''))
+        last = steps[-1]
+        steps.append((last[0], last[1], target, None, f'{result} {name}: {counters}.') + last[5:])
+        self.dijkstra_steps = steps
+        self.dijkstra_current_step = 0
+        self._stopped = False
+        self.show_panel(self.dijkstra_view)
+        self.play_dijkstra_steps()
+
+    def benchmark_dijkstra(self):
+        n, ok = QInputDialog.getInt(self, 'Dijkstra Benchmark', 'Number of nodes:', 100000, 10, 1000000)
+        if not ok:
+            return
+        degree, ok = QInputDialog.getInt(self, 'Dijkstra Benchmark', 'Average degree:', 4, 1, 32)
+        if not ok:
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            graph = random_weighted_graph(n, degree, seed=n)
+            t0 = time.perf_counter()
+            dist, _, stats = dijkstra_heap(graph, 0)
+            heap_time = time.perf_counter() - t0
+            if n <= LINEAR_DIJKSTRA_LIMIT:
+                t0 = time.perf_counter()
+                linear_dist, _, _ = dijkstra_linear(graph, 0)
+                linear = f'linear scan {1000 * (time.perf_counter() - t0):.0f} ms (same distances: {linear_dist == dist})'
+            else:
+                linear = f'linear scan skipped above {LINEAR_DIJKSTRA_LIMIT} nodes (it would check {n * n:,} node slots)'
+        finally:
+            QApplication.restoreOverrideCursor()
+        edges = sum(len(adj) for adj in graph) // 2
+        self.step_explanation.setText(
+            f'{n:,} nodes, {edges:,} edges: binary heap {1000 * heap_time:.0f} ms '
+            f"({stats['pops']:,} pops, {stats['pushes']:,} pushes, {stats['decrease_keys']:,} decrease-keys); {linear}.")
+        self.show_feedback('Dijkstra benchmark complete.')
+
     def play_dijkstra_steps(self):
         if self.dijkstra_current_step >= len(self.dijkstra_steps):
-            self.dijkstra_view.setVisible(False)
-            self.view.setVisible(True)
+            self.show_panel(self.view)
             if hasattr(self, 'step_explanation') and self.step_explanation and not sip.isdeleted(self.step_explanation):
                 self.step_explanation.setText('Dijkstra\'s Algorithm complete!')
             return
-        dist, visited, highlight_node, highlight_edge, explanation = self.dijkstra_steps[self.dijkstra_current_step]
-        graph = [
-            [(1, 2), (2, 4)],
-            [(0, 2), (2, 1), (3, 7)],
-            [(0, 4), (1, 1), (3, 3)],
-            [(1, 7), (2, 3)]
-        ]
-        pos = [(100, 300), (300, 100), (500, 300), (700, 100)]
-        self.dijkstra_scene.draw_graph(graph, pos, distances=dist, visited=visited, highlight_node=highlight_node, highlight_edge=highlight_edge)
+        step = self.dijkstra_steps[self.dijkstra_current_step]
+        dist, visited, highlight_node, highlight_edge, explanation = step[:5]
+        # Heap runs carry the queue contents as a sixth element
+        queue = step[5] if len(step) > 5 else None
+        if self.dijkstra_current_step == 0:
+            self.dijkstra_scene.draw_graph(self.graph, self.graph_pos, distances=dist, visited=visited, highlight_node=highlight_node, highlight_edge=highlight_edge, queue=queue)
+        else:
+            # Later steps only touch the nodes and edge they highlight
+            self.dijkstra_scene.show_step(dist, visited, highlight_node, highlight_edge, queue)
         if hasattr(self, 'step_explanation') and self.step_explanation and not sip.isdeleted(self.step_explanation):
             self.step_explanation.setText(explanation)
         self.feedback.setText('')
@@ -3332,6 +9165,7 @@ class SortingVisualizer(QWidget):
             for anim in self.scene.animations:
                 anim.stop()
             self.scene.animations.clear()
+        self.stop_layout()
         # Dijkstra
         if hasattr(self, 'dijkstra_scene') and hasattr(self.dijkstra_scene, 'animations'):
             for anim in self.dijkstra_scene.animations:
@@ -3346,71 +9180,67 @@ class DijkstraGraphScene(QGraphicsScene):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setSceneRect(0, 0, 800, 400)
-        self.nodes = []
-        self.edges = []
-        self.node_items = []
-        self.edge_items = []
+        self.graph = None
+        self.pos = None
+        # One item paints the whole graph from arrays; steps edit its state in place
+        self.graph_item = None
+        self.queue_panel = None
         self.animations = []
-        self.dist_labels = []
-        self.visited_labels = []
 
     def clear_scene(self):
-        for item in self.node_items + self.edge_items + self.dist_labels + self.visited_labels:
-            self.removeItem(item)
-        self.node_items = []
-        self.edge_items = []
-        self.dist_labels = []
-        self.visited_labels = []
         self.clear()
+        self.graph = None
+        self.pos = None
+        self.graph_item = None
+        self.queue_panel = None
 
-    def draw_graph(self, graph, pos, distances=None, visited=None, highlight_node=None, highlight_edge=None):
+    def build_graph(self, graph, pos):
         self.clear_scene()
-        n = len(graph)
-        # Draw edges
-        for u in range(n):
-            for v, w in graph[u]:
-                x1, y1 = pos[u]
-                x2, y2 = pos[v]
-                pen = QPen(QColor(120,120,120), 3)
-                if highlight_edge and (u, v) == highlight_edge:
-                    pen = QPen(QColor(255, 60, 80), 5)
-                line = self.addLine(x1, y1, x2, y2, pen)
-                self.edge_items.append(line)
-                # Draw weight
-                wx, wy = (x1 + x2) / 2, (y1 + y2) / 2
-                label = QGraphicsSimpleTextItem(str(w))
-                label.setFont(QFont('Arial', 12, QFont.Bold))
-                label.setBrush(QBrush(QColor(80, 80, 80)))
-                label.setPos(wx, wy)
-                self.edge_items.append(label)
-        # Draw nodes
-        for i, (x, y) in enumerate(pos):
-            color = QColor(200, 240, 255) if not visited or not visited[i] else QColor(180, 255, 180)
-            if highlight_node == i:
-                color = QColor(255, 215, 0)
-            ellipse = self.addEllipse(x-20, y-20, 40, 40, QPen(Qt.black, 2), QBrush(color))
-            self.node_items.append(ellipse)
-            label = QGraphicsSimpleTextItem(str(i))
-            label.setFont(QFont('Arial', 16, QFont.Bold))
-            label.setPos(x-8, y-16)
-            self.node_items.append(label)
-            # Distance label
-            if distances:
-                d = distances[i]
-                dist_label = QGraphicsSimpleTextItem(f'dist: {d if d < 999 else "∞"}')
-                dist_label.setFont(QFont('Arial', 10))
-                dist_label.setBrush(QBrush(QColor(80, 80, 255)))
-                dist_label.setPos(x-20, y+22)
-                self.dist_labels.append(dist_label)
-                self.addItem(dist_label)
-            # Visited label
-            if visited and visited[i]:
-                vlabel = QGraphicsSimpleTextItem('visited')
-                vlabel.setFont(QFont('Arial', 10))
-                vlabel.setBrush(QBrush(QColor(0, 180, 0)))
-                vlabel.setPos(x+10, y-30)
-                self.visited_labels.append(vlabel)
-                self.addItem(vlabel)
+        self.graph = graph
+        self.pos = pos
+        # One edge per arc; the reverse arc of an undirected edge shares it
+        weight_of = {}
+        for a in range(len(graph)):
+            for b, w in graph[a]:
+                if weight_of.get((b, a)) != w:
+                    weight_of[(a, b)] = w
+        u = [a for a, _ in weight_of]
+        v = [b for _, b in weight_of]
+        self.graph_item = GraphItem(pos, u, v, QRectF(0, 0, 800, 400), list(weight_of.values()), detailed=True)
+        self.addItem(self.graph_item)
+        self.queue_panel = QueuePanelItem(800, 20)
+        self.addItem(self.queue_panel)
+        self.show_queue(None)
+
+    def draw_graph(self, graph, pos, distances=None, visited=None, highlight_node=None, highlight_edge=None, queue=None):
+        # Rebuilds the item only for a new graph; otherwise its state is replaced
+        if graph is not self.graph or self.graph_item is None or not self.graph_item.detailed:
+            self.build_graph(graph, pos)
+        elif pos is not self.pos:
+            self.pos = pos
+            self.graph_item.set_positions(pos)
+        self.graph_item.show_state(distances, visited, highlight_node, highlight_edge)
+        self.show_queue(queue)
+
+    def show_step(self, distances, visited, highlight_node=None, highlight_edge=None, queue=None):
+        """Apply one Dijkstra step, which changes at most its highlighted node"""
+        self.graph_item.show_step(distances, visited, highlight_node, highlight_edge)
+        self.show_queue(queue)
+
+    def draw_preview(self, points, u, v):
+        # Large graphs: dots only, and layout frames just move them
+        if self.graph_item is not None and not self.graph_item.detailed and self.graph_item.u is u:
+            self.graph_item.set_positions(points)
+            return
+        self.clear_scene()
+        self.setSceneRect(0, 0, 800, 400)
+        self.graph_item = GraphItem(points, u, v, QRectF(0, 0, 800, 400))
+        self.addItem(self.graph_item)
+
+    def show_queue(self, queue, *panel):
+        self.setSceneRect(0, 0, 800 if queue is None else 1000, 400)
+        if self.queue_panel is not None:
+            self.queue_panel.set_queue(queue, *panel)
 
 class TutorialWidget(QWidget):
     def __init__(self, on_exit=None):
@@ -3590,6 +9420,10 @@ class TreeVisualizer(QWidget):
         btn_custom.setStyleSheet(f"padding:12px 24px; font-size:16px; border-radius:8px; background:{ACCENT}; color:{TEXT_COLOR};")
         btn_custom.clicked.connect(self.create_own_tree)
         controls.addWidget(btn_custom)
+        btn_workload = QPushButton('Workload')
+        btn_workload.setStyleSheet(f"padding:12px 24px; font-size:16px; border-radius:8px; background:{ACCENT}; color:{TEXT_COLOR};")
+        btn_workload.clicked.connect(self.generate_workload)
+        controls.addWidget(btn_workload)
         btn_add = QPushButton('Add Value')
         btn_add.setStyleSheet(f"padding:12px 24px; font-size:16px; border-radius:8px; background:{ACCENT}; color:{TEXT_COLOR};")
         btn_add.clicked.connect(self.add_value)
@@ -3695,6 +9529,27 @@ class TreeVisualizer(QWidget):
             except ValueError:
                 QMessageBox.warning(self, 'Invalid Input', 'Please enter only numbers separated by commas.')
 
+    def generate_workload(self):
+        values = ask_workload(self)
+        if values is None:
+            return
+        if self.tree_type == 'BST':
+            self.root = None
+            for v in values:
+                self.root = self._bst_insert(self.root, v)
+        elif self.tree_type == 'RBT':
+            self.root = None
+            for v in values:
+                self.root = self._rbt_insert(self.root, v)
+            self._fix_rbt_colors(self.root)
+        elif self.tree_type in ('MinHeap', 'MaxHeap'):
+            values = values[:]
+            self._heapify(values, min_heap=self.tree_type == 'MinHeap')
+            self.root = self._array_to_tree(values)
+        else:
+            self.root = None
+        self._play_steps([(self._tree_snapshot(self.root), [], f"Workload tree created: {values}")])
+
     # --- Red-Black Tree logic (simplified for visualization) ---
     def _rbt_insert(self, root, value):
         def insert(node, value):